@@ -0,0 +1,56 @@
+"""
+Benchmark do ContextCodec vs json.dumps (formato antigo do RedisRepository).
+
+Uso:
+    python -m benchmarks.bench_context_codec
+"""
+import json
+import time
+
+from src.Domain import ConversationContext
+from src.Infrastructure import ContextCodec
+from tests.fixtures import build_context
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def materialized(decoded: dict) -> dict:
+    """Registros posicionais do codec reconstruídos, para comparar com o to_dict original"""
+    context = ConversationContext.from_dict(decoded)
+    list(context.messages)
+    list(context.decision_history)
+    return context.to_dict()
+
+
+def main():
+    codec = ContextCodec()
+    print(f"{'turnos':>7} | {'formato':>7} | {'bytes':>9} | {'encode ms':>9} | {'decode ms':>9}")
+
+    for turns in (10, 100, 1000):
+        data = build_context(turns).to_dict()
+        repeat = max(5, 2000 // turns)
+
+        legacy = json.dumps(data)
+        binary = codec.encode(data)
+        assert materialized(codec.decode(binary)) == data
+        assert codec.decode(legacy.encode()) == data
+
+        rows = [
+            ("json", len(legacy.encode()),
+             measure(lambda: json.dumps(data), repeat),
+             measure(lambda: json.loads(legacy), repeat)),
+            ("codec", len(binary),
+             measure(lambda: codec.encode(data), repeat),
+             measure(lambda: codec.decode(binary), repeat)),
+        ]
+        for name, size, enc, dec in rows:
+            print(f"{turns:>7} | {name:>7} | {size:>9} | {enc:>9.3f} | {dec:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark do caminho de carga do contexto: bytes do Redis -> ConversationContext.
+
+Cada modo mede decode + from_dict + acesso, como no ConversationService:
+
+"json"        -> json.loads + from_dict + todos os registros (formato antigo)
+"codec lazy"  -> ContextCodec.decode + from_dict + acesso do orchestrator (20 mensagens, 5 decisões)
+"codec eager" -> ContextCodec.decode + from_dict + todos os registros materializados
+
+Uso:
+    python -m benchmarks.bench_context_entities
+"""
+import json
+import time
+import tracemalloc
+
+from src.Domain import ConversationContext
+from src.Infrastructure import ContextCodec
+from tests.fixtures import build_context
+
+
+def orchestrator_access(context: ConversationContext):
+    context.get_recent_messages(limit=20)
+    context.get_recent_decisions(limit=5)
+
+
+def full_access(context: ConversationContext):
+    list(context.messages)
+    list(context.decision_history)
+
+
+def load(decode, raw: bytes, access) -> ConversationContext:
+    context = ConversationContext.from_dict(decode(raw))
+    access(context)
+    return context
+
+
+def measure_time(decode, raw: bytes, access, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        load(decode, raw, access)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure_memory(decode, raw: bytes, access) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    context = load(decode, raw, access)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del context
+    return after - before
+
+
+def main():
+    codec = ContextCodec()
+    print(f"{'turnos':>7} | {'modo':>11} | {'carga ms':>9} | {'memória KiB':>11}")
+
+    for turns in (10, 100, 1000, 5000):
+        data = build_context(turns).to_dict()
+        json_raw = json.dumps(data).encode()
+        codec_raw = codec.encode(data)
+        repeat = max(5, 2000 // turns)
+
+        for name, decode, raw, access in (
+            ("json", json.loads, json_raw, full_access),
+            ("codec lazy", codec.decode, codec_raw, orchestrator_access),
+            ("codec eager", codec.decode, codec_raw, full_access),
+        ):
+            elapsed = measure_time(decode, raw, access, repeat)
+            memory = measure_memory(decode, raw, access) / 1024
+            print(f"{turns:>7} | {name:>11} | {elapsed:>9.3f} | {memory:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
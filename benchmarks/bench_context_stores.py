@@ -0,0 +1,57 @@
+"""
+Desempenho dos backends de contexto (IContextStore). O contrato está em
+tests/test_context_stores.py.
+
+Roda o mesmo roteiro contra cada backend pedido; redis e postgres usam
+REDIS_URL / DATABASE_URL do .env.
+
+Uso:
+    python -m benchmarks.bench_context_stores memory redis postgres
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+from src.Domain import IContextStore
+from src.Infrastructure import (
+    InMemoryContextStore,
+    RedisContextStore,
+    RedisRepository,
+    PostgresContextStore
+)
+from tests.fixtures import build_context
+
+
+BACKENDS = {
+    "memory": lambda: InMemoryContextStore(),
+    "redis": lambda: RedisContextStore(RedisRepository()),
+    "postgres": lambda: PostgresContextStore(),
+}
+
+
+async def measure(store: IContextStore, turns: int, operations: int):
+    key = f"bench:{uuid.uuid4().hex}"
+    data = build_context(turns).to_dict()
+    version = 0
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        _, version = await store.load(key)
+        _, version = await store.compare_and_set(key, data, version, ttl_seconds=60)
+    elapsed = time.perf_counter() - start
+
+    await store.delete(key)
+    return elapsed / operations * 1000
+
+
+async def main(names):
+    print(f"{'backend':>9} | {'turnos':>6} | {'load+CAS ms':>11}")
+    for name in names:
+        store = BACKENDS[name]()
+        for turns in (10, 100, 1000):
+            print(f"{name:>9} | {turns:>6} | {await measure(store, turns, 50):>11.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:] or ["memory"]))
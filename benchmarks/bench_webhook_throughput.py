@@ -0,0 +1,146 @@
+"""
+Throughput do caminho de banco de um webhook com remetentes concorrentes.
+
+Cada "webhook" faz o que o ConversationService faz no PostgreSQL
+(conversa ativa ou criação, histórico recente, 2 mensagens) e espera
+--llm-ms simulando a chamada ao modelo.
+
+"asyncpg"  -> repositórios atuais (pool asyncpg)
+"psycopg2" -> mesmas queries com psycopg2 bloqueante dentro de `async def`
+              (comportamento antigo; requer psycopg2 instalado)
+
+Também mede o maior atraso do event loop (uma tarefa que acorda a cada 10ms).
+
+Uso:
+    python -m benchmarks.bench_webhook_throughput asyncpg psycopg2 --senders 50 --webhooks 500
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from src.config import settings
+from src.Domain import ConversationEntity, MessageEntity
+from src.Infrastructure import ConversationRepository, MessageRepository, PostgresContext
+
+
+class AsyncpgPath:
+
+    def __init__(self):
+        self.conversations = ConversationRepository()
+        self.messages = MessageRepository()
+
+    async def handle(self, sender_id: str):
+        conversation = await self.conversations.get_active_conversation(sender_id, "bench", "whatsapp")
+        if not conversation:
+            conversation = await self.conversations.create(
+                ConversationEntity(sender_id=sender_id, instance="bench", channel="whatsapp")
+            )
+        else:
+            await self.conversations.touch(conversation.id)
+        await self.messages.list_recent(conversation.id, limit=20)
+        for role in ("user", "assistant"):
+            await self.messages.create(
+                MessageEntity(conversation_id=conversation.id, role=role, content="bench")
+            )
+
+    async def close(self):
+        await PostgresContext.close()
+
+
+class Psycopg2Path:
+
+    def __init__(self):
+        from psycopg2 import pool as pg_pool
+        self.pool = pg_pool.ThreadedConnectionPool(2, 20, dsn=settings.postgres_dsn)
+
+    async def handle(self, sender_id: str):
+        connection = self.pool.getconn()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT id FROM conversations
+                WHERE sender_id = %s AND instance = 'bench' AND channel = 'whatsapp' AND status = 'active'
+                LIMIT 1
+            """, (sender_id,))
+            row = cursor.fetchone()
+            if row:
+                conversation_id = row[0]
+                cursor.execute("UPDATE conversations SET last_message_at = %s WHERE id = %s",
+                               (datetime.utcnow(), conversation_id))
+            else:
+                cursor.execute("""
+                    INSERT INTO conversations (sender_id, instance, channel, started_at, status)
+                    VALUES (%s, 'bench', 'whatsapp', %s, 'active') RETURNING id
+                """, (sender_id, datetime.utcnow()))
+                conversation_id = cursor.fetchone()[0]
+            connection.commit()
+            cursor.execute("""
+                SELECT id, role, content, created_at FROM messages
+                WHERE conversation_id = %s ORDER BY created_at DESC LIMIT 20
+            """, (conversation_id,))
+            cursor.fetchall()
+            for role in ("user", "assistant"):
+                cursor.execute("""
+                    INSERT INTO messages (conversation_id, role, content, created_at)
+                    VALUES (%s, %s, 'bench', %s) RETURNING id
+                """, (conversation_id, role, datetime.utcnow()))
+                connection.commit()
+        finally:
+            self.pool.putconn(connection)
+
+    async def close(self):
+        self.pool.closeall()
+
+
+PATHS = {"asyncpg": AsyncpgPath, "psycopg2": Psycopg2Path}
+
+
+async def loop_lag_probe(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def run(name: str, senders: int, webhooks: int, llm_ms: float):
+    path = PATHS[name]()
+    sender_ids = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(senders)]
+    queue = asyncio.Queue()
+    for i in range(webhooks):
+        queue.put_nowait(sender_ids[i % senders])
+
+    async def worker():
+        while not queue.empty():
+            sender_id = queue.get_nowait()
+            await path.handle(sender_id)
+            await asyncio.sleep(llm_ms / 1000)
+
+    stop, lag = asyncio.Event(), []
+    probe = asyncio.create_task(loop_lag_probe(stop, lag))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(senders)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    await path.close()
+    return webhooks / elapsed, max(lag, default=0) * 1000
+
+
+async def main(args):
+    print(f"{'driver':>9} | {'remetentes':>10} | {'webhooks/s':>10} | {'lag máx ms':>10}")
+    for name in args.drivers:
+        throughput, lag = await run(name, args.senders, args.webhooks, args.llm_ms)
+        print(f"{name:>9} | {args.senders:>10} | {throughput:>10.1f} | {lag:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("drivers", nargs="*", default=["asyncpg"])
+    parser.add_argument("--senders", type=int, default=50)
+    parser.add_argument("--webhooks", type=int, default=500)
+    parser.add_argument("--llm-ms", type=float, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -1,7 +1,10 @@
 from .routes.agentRoute import router as agentRoute
 from .routes.agentConfigRoute import router as agentConfigRoute
+from .routes.metricsRoute import router as metricsRoute
+from .routes.conversationRoute import router as conversationRoute
+from .routes.healthRoute import router as healthRoute
 
-__all__ = ['agentRoute', 'agentConfigRoute']
+__all__ = ['agentRoute', 'agentConfigRoute', 'metricsRoute', 'conversationRoute', 'healthRoute']
 
 
 from .mapper.whatsappMessageMapper import map_webhook_to_incoming_message
\ No newline at end of file
@@ -1,5 +1,7 @@
 from dependency_injector import containers,providers
 
+from src.config import settings
+
 from src.Domain import (
                            #SERVICES
                            IWhatsAppOrchestratorService,
@@ -11,11 +13,19 @@ from src.Domain import (
                            IConversationRepository,
                            IMessageRepository,
                            IRedisRepository,
-                           IAgentConfigRepository
+                           IAgentConfigRepository,
+                           IContextSnapshotRepository,
+                           IConversationArchiveRepository,
+                           IContextStore
                         )
 from src.Services import (
                            ConversationService,
-                           WhatsAppOrchestratorService
+                           WhatsAppOrchestratorService,
+                           ContextTieringService,
+                           PostTurnPipeline,
+                           ConversationSweeperService,
+                           ConversationArchiveService,
+                           WarmupService
                          )
 from src.Services.agentConfigService import AgentConfigService
 from src.Orchestrator.agentOrchestrator import AgentOrchestrator
@@ -23,7 +33,15 @@ from src.Orchestrator.agentOrchestrator import AgentOrchestrator
 from src.Infrastructure import (
                                  ConversationRepository,
                                  MessageRepository,
+                                 MessageWriteBuffer,
                                  RedisRepository,
+                                 RedisContext,
+                                 ContextCache,
+                                 ContextSnapshotRepository,
+                                 ConversationArchiveRepository,
+                                 InMemoryContextStore,
+                                 RedisContextStore,
+                                 PostgresContextStore,
                                  OpenAIClient,
                                  AgentPrompts
                                )
@@ -47,25 +65,145 @@ class Dependecie(containers.DeclarativeContainer):
    agentConfigRepository: providers.Singleton[IAgentConfigRepository] = \
    providers.Singleton(AgentConfigRepository)
    
+   contextSnapshotRepository: providers.Singleton[IContextSnapshotRepository] = \
+   providers.Singleton(ContextSnapshotRepository)
+   
+   conversationArchiveRepository: providers.Singleton[IConversationArchiveRepository] = \
+   providers.Singleton(ConversationArchiveRepository)
+   
+   # Backend de contexto escolhido por CONTEXT_STORE_BACKEND (memory | redis | postgres)
+   contextStore: providers.Selector[IContextStore] = \
+   providers.Selector(
+       providers.Callable(lambda: settings.context_store_backend),
+       memory=providers.Singleton(
+           InMemoryContextStore,
+           max_entries=settings.CONTEXT_STORE_MEMORY_MAX_ENTRIES
+       ),
+       redis=providers.Singleton(RedisContextStore, redis=redisRepository),
+       postgres=providers.Singleton(PostgresContextStore)
+   )
+   
+   # Cache L1 de contextos (em processo) na frente do Redis
+   contextCache: providers.Singleton[ContextCache] = \
+   providers.Singleton(
+       ContextCache,
+       client=providers.Callable(RedisContext.get_client),
+       max_entries=settings.CONTEXT_CACHE_MAX_ENTRIES,
+       ttl_seconds=settings.CONTEXT_CACHE_TTL_SECONDS
+   )
+   
+   # Write-behind de mensagens (MESSAGE_WRITE_BEHIND)
+   messageWriteBuffer: providers.Singleton[MessageWriteBuffer] = \
+   providers.Singleton(
+       MessageWriteBuffer,
+       message_repo=messageRepository,
+       flush_interval_ms=settings.MESSAGE_FLUSH_INTERVAL_MS,
+       flush_max_rows=settings.MESSAGE_FLUSH_MAX_ROWS,
+       max_buffered_rows=settings.MESSAGE_BUFFER_MAX_ROWS
+   )
+   
    # ========== SERVICES ==========
    
-   # Agent Config Service
+   # Agent Config Service (cache L1 em processo + L2 no Redis, quando configurado)
    agentConfigService: providers.Singleton[AgentConfigService] = \
    providers.Singleton(
        AgentConfigService,
-       agent_config_repo=agentConfigRepository
+       agent_config_repo=agentConfigRepository,
+       redis=providers.Selector(
+           providers.Callable(lambda: "on" if (settings.REDIS_URL or settings.REDIS_SHARD_URLS) else "off"),
+           on=redisRepository,
+           off=providers.Object(None)
+       ),
+       ttl_seconds=settings.AGENT_CONFIG_CACHE_TTL_SECONDS,
+       negative_ttl_seconds=settings.AGENT_CONFIG_NEGATIVE_TTL_SECONDS,
+       redis_ttl_seconds=settings.AGENT_CONFIG_REDIS_TTL_SECONDS
+   )
+   
+   # Camadas quente (Redis) / fria (PostgreSQL) de contextos
+   contextTieringService: providers.Singleton[ContextTieringService] = \
+   providers.Singleton(
+       ContextTieringService,
+       redis=redisRepository,
+       snapshot_repo=contextSnapshotRepository,
+       context_cache=contextCache
+   )
+   
+   # Persistência pós-turno em background (POST_TURN_PIPELINE)
+   postTurnPipeline: providers.Singleton[PostTurnPipeline] = \
+   providers.Singleton(
+       PostTurnPipeline,
+       max_retries=settings.POST_TURN_MAX_RETRIES,
+       retry_backoff_ms=settings.POST_TURN_RETRY_BACKOFF_MS,
+       max_pending=settings.POST_TURN_MAX_PENDING
+   )
+   
+   # Encerramento de conversas ociosas (índice de atividade no Redis)
+   conversationSweeperService: providers.Singleton[ConversationSweeperService] = \
+   providers.Singleton(
+       ConversationSweeperService,
+       redis=redisRepository,
+       conversation_repo=conversationRepository,
+       agent_config_repo=agentConfigRepository,
+       context_store=contextStore,
+       context_cache=contextCache,
+       context_tiering=contextTieringService
+   )
+   
+   # Arquivamento de conversas encerradas antigas (CONVERSATION_ARCHIVE_AFTER_DAYS)
+   conversationArchiveService: providers.Singleton[ConversationArchiveService] = \
+   providers.Singleton(
+       ConversationArchiveService,
+       archive_repo=conversationArchiveRepository,
+       retention_days=settings.CONVERSATION_ARCHIVE_AFTER_DAYS
    )
    
    # WhatsApp Orchestrator Service
    whatsAppOrchestratorService: providers.Singleton[IWhatsAppOrchestratorService] = \
    providers.Singleton(WhatsAppOrchestratorService)   
    
-   # Conversation Service (agora com AgentConfigService)
+   # Conversation Service (agentes resolvidos pelo cache do AgentConfigService)
    conversationService: providers.Singleton[IConversationService] = \
    providers.Singleton(
        ConversationService,
        conversation_repo=conversationRepository,
        message_repo=messageRepository,
-       redis=redisRepository,
-       agent_config_service=agentConfigRepository
+       context_store=contextStore,
+       agent_config_service=agentConfigService,
+       context_cache=contextCache,
+       # Offload para o PostgreSQL só faz sentido com o Redis como camada quente
+       context_tiering=providers.Selector(
+           providers.Callable(lambda: settings.context_store_backend),
+           memory=providers.Object(None),
+           redis=contextTieringService,
+           postgres=providers.Object(None)
+       ),
+       message_writer=providers.Selector(
+           providers.Callable(lambda: "on" if settings.MESSAGE_WRITE_BEHIND else "off"),
+           on=messageWriteBuffer,
+           off=providers.Object(None)
+       ),
+       post_turn=providers.Selector(
+           providers.Callable(lambda: "on" if settings.POST_TURN_PIPELINE else "off"),
+           on=postTurnPipeline,
+           off=providers.Object(None)
+       ),
+       conversation_sweeper=providers.Selector(
+           providers.Callable(lambda: settings.context_store_backend),
+           memory=providers.Object(None),
+           redis=conversationSweeperService,
+           postgres=providers.Object(None)
+       )
+   )
+   
+   # Warm-up do worker (pools, agentes, orchestrators) e readiness
+   warmupService: providers.Singleton[WarmupService] = \
+   providers.Singleton(
+       WarmupService,
+       agent_config_repo=agentConfigRepository,
+       agent_config_service=agentConfigService,
+       conversation_service=conversationService
    )
+
+
+# Container único do processo: rotas e lifespan compartilham os mesmos singletons
+dependencies = Dependecie()
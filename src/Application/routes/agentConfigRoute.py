@@ -4,11 +4,10 @@ from pydantic import BaseModel, Field
 from uuid import UUID
 import logging
 
-from src.Application.dependecie import Dependecie
+from src.Application.dependecie import dependencies
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/agents", tags=["Agent Management"])
-dependencies = Dependecie()
 
 
 # ========== DTOs (Data Transfer Objects) ==========
@@ -22,6 +21,7 @@ class AgentConfigCreateDTO(BaseModel):
     response_prompt: str = Field(..., description="Prompt para respostas")
     available_tools: List[str] = Field(default_factory=list, description="Lista de tools permitidas")
     is_active: bool = Field(default=True, description="Se o agente está ativo")
+    idle_close_minutes: Optional[int] = Field(None, ge=1, description="Minutos sem mensagens até encerrar a conversa (padrão global se vazio)")
 
 
 class AgentConfigUpdateDTO(BaseModel):
@@ -33,6 +33,7 @@ class AgentConfigUpdateDTO(BaseModel):
     response_prompt: Optional[str] = None
     available_tools: Optional[List[str]] = None
     is_active: Optional[bool] = None
+    idle_close_minutes: Optional[int] = Field(None, ge=1)
 
 
 class AgentConfigResponseDTO(BaseModel):
@@ -43,6 +44,7 @@ class AgentConfigResponseDTO(BaseModel):
     personality: str
     available_tools: List[str]
     is_active: bool
+    idle_close_minutes: Optional[int] = None
     created_at: str
     updated_at: str
 
@@ -91,6 +93,7 @@ async def list_agents(active_only: bool = True):
                 personality=agent.personality,
                 available_tools=agent.available_tools,
                 is_active=agent.is_active,
+                idle_close_minutes=agent.idle_close_minutes,
                 created_at=agent.created_at.isoformat(),
                 updated_at=agent.updated_at.isoformat()
             )
@@ -126,6 +129,7 @@ async def get_agent(agent_id: str):
             personality=agent.personality,
             available_tools=agent.available_tools,
             is_active=agent.is_active,
+            idle_close_minutes=agent.idle_close_minutes,
             created_at=agent.created_at.isoformat(),
             updated_at=agent.updated_at.isoformat()
         )
@@ -163,14 +167,15 @@ async def create_agent(agent_data: AgentConfigCreateDTO):
             flow_decision_prompt=agent_data.flow_decision_prompt,
             response_prompt=agent_data.response_prompt,
             available_tools=agent_data.available_tools,
-            is_active=agent_data.is_active
+            is_active=agent_data.is_active,
+            idle_close_minutes=agent_data.idle_close_minutes
         )
         
         # Salva no banco
         created_agent = await repo.create(agent)
         
         # Limpa cache para forçar reload
-        config_service.clear_cache()
+        await config_service.clear_cache()
         
         logger.info(f"✅ Agente '{created_agent.name}' criado com sucesso (ID: {created_agent.id})")
         
@@ -181,6 +186,7 @@ async def create_agent(agent_data: AgentConfigCreateDTO):
             personality=created_agent.personality,
             available_tools=created_agent.available_tools,
             is_active=created_agent.is_active,
+            idle_close_minutes=created_agent.idle_close_minutes,
             created_at=created_agent.created_at.isoformat(),
             updated_at=created_agent.updated_at.isoformat()
         )
@@ -225,12 +231,14 @@ async def update_agent(agent_id: str, agent_data: AgentConfigUpdateDTO):
             agent.available_tools = agent_data.available_tools
         if agent_data.is_active is not None:
             agent.is_active = agent_data.is_active
+        if agent_data.idle_close_minutes is not None:
+            agent.idle_close_minutes = agent_data.idle_close_minutes
         
         # Salva no banco
         updated_agent = await repo.update(agent)
         
         # Limpa cache para forçar reload
-        config_service.clear_cache()
+        await config_service.clear_cache()
         
         logger.info(f"✅ Agente '{updated_agent.name}' atualizado com sucesso")
         
@@ -241,6 +249,7 @@ async def update_agent(agent_id: str, agent_data: AgentConfigUpdateDTO):
             personality=updated_agent.personality,
             available_tools=updated_agent.available_tools,
             is_active=updated_agent.is_active,
+            idle_close_minutes=updated_agent.idle_close_minutes,
             created_at=updated_agent.created_at.isoformat(),
             updated_at=updated_agent.updated_at.isoformat()
         )
@@ -282,7 +291,7 @@ async def deactivate_agent(agent_id: str):
         await repo.update(agent)
         
         # Limpa cache
-        config_service.clear_cache()
+        await config_service.clear_cache()
         
         logger.info(f"✅ Agente '{agent.name}' desativado com sucesso")
         
@@ -314,44 +323,38 @@ async def create_phone_mapping(mapping_data: PhoneMappingCreateDTO):
         
         config_service = dependencies.agentConfigService()
         db = PostgresContext()
-        cursor, connection = db.connect()
         
-        try:
+        async with db.acquire() as connection:
             # Verifica se agente existe
-            cursor.execute(
-                "SELECT id FROM agent_configs WHERE id = %s AND is_active = true",
-                (mapping_data.agent_id,)
+            agent = await connection.fetchval(
+                "SELECT id FROM agent_configs WHERE id = $1 AND is_active = true",
+                mapping_data.agent_id
             )
-            if not cursor.fetchone():
+            if not agent:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Agente com ID {mapping_data.agent_id} não encontrado ou inativo"
                 )
             
             # Cria mapeamento
-            cursor.execute("""
+            row = await connection.fetchrow("""
                 INSERT INTO agent_phone_mappings (phone_number, agent_id, is_active)
-                VALUES (%s, %s, true)
+                VALUES ($1, $2, true)
                 RETURNING id, phone_number, agent_id, is_active, created_at
-            """, (mapping_data.phone_number, mapping_data.agent_id))
-            
-            connection.commit()
-            row = cursor.fetchone()
-            
-            # Limpa cache
-            config_service.clear_cache()
-            
-            logger.info(f"✅ Mapeamento criado: {mapping_data.phone_number} → {mapping_data.agent_id}")
-            
-            return PhoneMappingResponseDTO(
-                id=str(row[0]),
-                phone_number=row[1],
-                agent_id=str(row[2]),
-                is_active=row[3],
-                created_at=row[4].isoformat()
-            )
-        finally:
-            db.disconnect(connection)
+            """, mapping_data.phone_number, mapping_data.agent_id)
+        
+        # Limpa cache
+        await config_service.clear_cache()
+        
+        logger.info(f"✅ Mapeamento criado: {mapping_data.phone_number} → {mapping_data.agent_id}")
+        
+        return PhoneMappingResponseDTO(
+            id=str(row["id"]),
+            phone_number=row["phone_number"],
+            agent_id=str(row["agent_id"]),
+            is_active=row["is_active"],
+            created_at=row["created_at"].isoformat()
+        )
             
     except HTTPException:
         raise
@@ -385,6 +388,7 @@ async def get_agent_by_phone(phone_number: str):
             personality=agent.personality,
             available_tools=agent.available_tools,
             is_active=agent.is_active,
+            idle_close_minutes=agent.idle_close_minutes,
             created_at=agent.created_at.isoformat(),
             updated_at=agent.updated_at.isoformat()
         )
@@ -403,12 +407,13 @@ async def get_agent_by_phone(phone_number: str):
 @router.post("/cache/clear", status_code=status.HTTP_200_OK)
 async def clear_cache():
     """
-    Limpa o cache de agentes.
-    Útil após fazer alterações diretas no banco de dados.
+    Limpa o cache de agentes (L1 deste worker e L2 no Redis).
+    Mudanças no banco já invalidam todos os workers via LISTEN/NOTIFY;
+    use como último recurso (ex.: triggers ausentes).
     """
     try:
         config_service = dependencies.agentConfigService()
-        config_service.clear_cache()
+        await config_service.clear_cache()
         
         logger.info("✅ Cache de agentes limpo com sucesso")
         
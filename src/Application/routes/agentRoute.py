@@ -3,13 +3,12 @@ from fastapi import APIRouter, Request, BackgroundTasks
 import logging
 from src.Application.mapper.whatsappMessageMapper import map_webhook_to_incoming_message
 from src.Domain import MessageupsertEntity
-from src.Application.dependecie import Dependecie
+from src.Application.dependecie import dependencies
 # from src.Application.useCase.agentOrchestrator import AgentOrchestrator 
 
 logger = logging.getLogger("webhook")
 logging.basicConfig(level=logging.INFO)
 router = APIRouter()
-dependencies = Dependecie()
 
 
 
@@ -0,0 +1,278 @@
+import base64
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.Application.dependecie import dependencies
+from src.Domain import ConversationEntity, MessageEntity, MessageSearchHitEntity
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/conversations", tags=["Conversations"])
+
+STREAM_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "id", "sender_id", "instance", "channel",
+    "started_at", "ended_at", "last_message_at", "metadata"
+]
+
+
+# ========== DTOs (Data Transfer Objects) ==========
+
+class MessagePageDTO(BaseModel):
+    """Página de mensagens em ordem cronológica, com cursores opacos"""
+    messages: List[MessageEntity]
+    before: Optional[str] = None  # mensagens mais antigas que esta página
+    after: Optional[str] = None   # mensagens mais novas que esta página
+
+
+class ConversationPageDTO(BaseModel):
+    """Página de conversas (mais novas primeiro)"""
+    conversations: List[ConversationEntity]
+    next: Optional[str] = None  # cursor da próxima página; None no fim
+
+
+class MessageSearchPageDTO(BaseModel):
+    """Página de resultados da busca (mais relevantes primeiro)"""
+    results: List[MessageSearchHitEntity]
+    next: Optional[str] = None  # cursor da próxima página; None no fim
+
+
+# ========== CURSORES (keyset em (data, id): mensagens e conversas) ==========
+
+def _encode_cursor(at: datetime, row_id: UUID) -> str:
+    raw = f"{at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(at), UUID(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def _encode_search_cursor(rank: float, row_id: UUID) -> str:
+    raw = f"{rank!r}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, row_id = raw.split("|", 1)
+        return float(rank), UUID(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+# ========== ENDPOINTS DE CONVERSAS ==========
+
+@router.get("/", response_model=ConversationPageDTO)
+async def list_conversations(
+    instance: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Lista conversas filtradas, paginadas por keyset em (started_at, id).
+
+    - **instance**, **status**: filtros exatos
+    - **started_from** / **started_to**: intervalo de início [from, to)
+    - **cursor**: valor `next` da página anterior
+    """
+    repo = dependencies.conversationRepository()
+    conversations = await repo.get_conversations(
+        instance=instance,
+        status=status_filter,
+        started_from=started_from,
+        started_to=started_to,
+        before=_decode_cursor(cursor) if cursor else None,
+        limit=limit
+    )
+
+    next_cursor = None
+    if len(conversations) == limit:
+        last = conversations[-1]
+        next_cursor = _encode_cursor(last.started_at, last.id)
+    return ConversationPageDTO(conversations=conversations, next=next_cursor)
+
+
+@router.get("/export")
+async def export_conversations(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    instance: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None
+):
+    """
+    Exporta todas as conversas do filtro em NDJSON ou CSV, em streaming
+    (cursor no servidor, memória constante independente do tamanho da tabela).
+    """
+    repo = dependencies.conversationRepository()
+    rows = repo.iter_conversations(
+        instance=instance,
+        status=status_filter,
+        started_from=started_from,
+        started_to=started_to,
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+    async def ndjson():
+        async for conversation in rows:
+            yield json.dumps(conversation.model_dump(mode="json"), ensure_ascii=False) + "\n"
+
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        async for conversation in rows:
+            data = conversation.model_dump(mode="json")
+            data["metadata"] = json.dumps(data["metadata"], ensure_ascii=False) if data["metadata"] else ""
+            writer.writerow([data[column] for column in EXPORT_COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=conversations.csv"}
+        )
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/search", response_model=MessageSearchPageDTO)
+async def search_messages(
+    q: str = Query(..., min_length=2),
+    instance: Optional[str] = None,
+    agent_id: Optional[UUID] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """
+    Busca conversas pelo conteúdo das mensagens (placa, renavam, frase).
+
+    - **q**: termos em português; aceita "frase exata", OR e -termo
+    - **instance** / **agent_id**: restringe ao número ou aos números do agente
+    - **created_from** / **created_to**: intervalo [from, to) das mensagens
+    - **cursor**: valor `next` da página anterior
+    """
+    repo = dependencies.messageRepository()
+    results = await repo.search(
+        query=q,
+        instance=instance,
+        agent_id=agent_id,
+        created_from=created_from,
+        created_to=created_to,
+        after=_decode_search_cursor(cursor) if cursor else None,
+        limit=limit
+    )
+
+    next_cursor = None
+    if len(results) == limit:
+        last = results[-1]
+        next_cursor = _encode_search_cursor(last.rank, last.message.id)
+    return MessageSearchPageDTO(results=results, next=next_cursor)
+
+
+@router.get("/{conversation_id}", response_model=ConversationEntity)
+async def get_conversation(conversation_id: UUID):
+    """Busca uma conversa (inclusive já arquivada)"""
+    conversation = await dependencies.conversationRepository().get_by_id(conversation_id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversa não encontrada"
+        )
+    return conversation
+
+
+# ========== ENDPOINTS DE HISTÓRICO ==========
+
+@router.get("/{conversation_id}/messages", response_model=MessagePageDTO)
+async def list_messages(
+    conversation_id: UUID,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = None,
+    after: Optional[str] = None
+):
+    """
+    Histórico paginado por keyset (custo constante, independe do tamanho da conversa).
+    Conversas já arquivadas são lidas do arquivo, com os mesmos cursores.
+
+    - sem cursor: últimas `limit` mensagens
+    - **before**: página anterior (mais antiga)
+    - **after**: página seguinte (mais nova)
+    """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use apenas um dos cursores: before ou after"
+        )
+
+    repo = dependencies.messageRepository()
+    if before:
+        created_at, message_id = _decode_cursor(before)
+        messages = await repo.list_before(conversation_id, created_at, message_id, limit, readonly=True)
+    elif after:
+        created_at, message_id = _decode_cursor(after)
+        messages = await repo.list_after(conversation_id, created_at, limit, message_id, readonly=True)
+    else:
+        messages = await repo.list_recent(conversation_id, limit, readonly=True)
+
+    if not messages:
+        return MessagePageDTO(messages=[], before=before, after=after)
+
+    return MessagePageDTO(
+        messages=messages,
+        before=_encode_cursor(messages[0].created_at, messages[0].id),
+        after=_encode_cursor(messages[-1].created_at, messages[-1].id)
+    )
+
+
+@router.get("/{conversation_id}/messages/stream")
+async def stream_messages(conversation_id: UUID, after: Optional[str] = None):
+    """
+    Histórico completo em NDJSON (uma mensagem por linha), do mais antigo ao
+    mais novo, lido em lotes por keyset; memória constante para o suporte.
+    """
+    repo = dependencies.messageRepository()
+    created_at, message_id = _decode_cursor(after) if after else (datetime.min, None)
+
+    async def generate():
+        cursor_at, cursor_id = created_at, message_id
+        while True:
+            batch = await repo.list_after(conversation_id, cursor_at, STREAM_BATCH_SIZE, cursor_id, readonly=True)
+            for message in batch:
+                yield json.dumps(message.model_dump(mode="json"), ensure_ascii=False) + "\n"
+            if len(batch) < STREAM_BATCH_SIZE:
+                return
+            cursor_at, cursor_id = batch[-1].created_at, batch[-1].id
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Response, status
+
+from src.config import settings
+from src.Application.dependecie import dependencies
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def liveness():
+    """Processo de pé (não depende do warm-up nem do banco)"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """
+    200 só depois do warm-up (pools abertos, agentes e orchestrators
+    carregados); 503 enquanto isso, para o balanceador segurar o tráfego.
+    """
+    if not settings.STARTUP_WARMUP:
+        return {"ready": True}
+
+    warmup = dependencies.warmupService().status()
+    if not warmup["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return warmup
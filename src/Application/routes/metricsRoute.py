@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from src.Infrastructure import Metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Contadores do worker que atendeu a requisição
+    (conflitos/retries de contexto, cache, etc).
+    """
+    return Metrics.snapshot()
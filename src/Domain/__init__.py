@@ -6,6 +6,7 @@ from .entities.responsePackageEntity import ResponsePackageEntity
 from .entities.conversationEntity import ConversationEntity
 from .entities.conversationStateEntity import ConversationStateEntity
 from .entities.messageEntity import MessageEntity
+from .entities.messageSearchHitEntity import MessageSearchHitEntity
 
 from .entities.agentConfigEntity import AgentConfigEntity
 from .entities.agentPhoneMappingEntity import AgentPhoneMappingEntity
@@ -16,11 +17,14 @@ from .interfaces.IAgentsPrompts import IAgentPrompts
 
 #Infrastructure Data
 from .interfaces.IRedisRepository import IRedisRepository
+from .interfaces.IContextStore import IContextStore
 
 #Infrastructure Repository
 from .interfaces.Repository.IConversationRepository import IConversationRepository
 from .interfaces.Repository.IMessageRepository import IMessageRepository
 from .interfaces.Repository.IAgentConfigRepository import IAgentConfigRepository
+from .interfaces.Repository.IContextSnapshotRepository import IContextSnapshotRepository
+from .interfaces.Repository.IConversationArchiveRepository import IConversationArchiveRepository
 
 #Service
 from .interfaces.Service.IConversationService import IConversationService
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
@@ -17,6 +19,7 @@ class AgentConfigEntity:
     available_tools: List[str]
     id: Optional[UUID] = None
     is_active: bool = True
+    idle_close_minutes: Optional[int] = None  # None: CONVERSATION_IDLE_CLOSE_MINUTES
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -28,6 +31,20 @@ class AgentConfigEntity:
         if self.updated_at is None:
             self.updated_at = datetime.now()
     
+    def content_hash(self) -> str:
+        """
+        Hash do que define o comportamento do agente (prompts, personalidade,
+        tools). Não depende de id nem de updated_at: muda em qualquer edição,
+        mesmo feita direto no banco, e é estável para o fallback em memória.
+        """
+        content = json.dumps([
+            self.personality,
+            self.flow_decision_prompt,
+            self.response_prompt,
+            self.available_tools
+        ])
+        return hashlib.sha256(content.encode()).hexdigest()
+    
     def to_dict(self) -> dict:
         """Converte para dict (útil para serialização)"""
         return {
@@ -39,6 +56,7 @@ class AgentConfigEntity:
             "response_prompt": self.response_prompt,
             "available_tools": self.available_tools,
             "is_active": self.is_active,
+            "idle_close_minutes": self.idle_close_minutes,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
@@ -55,6 +73,7 @@ class AgentConfigEntity:
             response_prompt=data["response_prompt"],
             available_tools=data["available_tools"],
             is_active=data.get("is_active", True),
+            idle_close_minutes=data.get("idle_close_minutes"),
             created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
             updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
         )
@@ -1,10 +1,30 @@
+from collections.abc import MutableSequence
 from dataclasses import dataclass, field, asdict
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Callable, Union
+import sys
 import uuid
 import json
 
-@dataclass
+import msgpack
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _unpack_record(data: Union[bytes, list, Dict[str, Any]]) -> Union[list, Dict[str, Any]]:
+    """Registro empacotado pelo ContextCodec (msgpack posicional) ou já desempacotado"""
+    if isinstance(data, bytes):
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return data
+
+
+def _parse_timestamp(value: Union[str, int]) -> datetime:
+    """ISO (JSON) ou microssegundos desde epoch (layout posicional do ContextCodec)"""
+    if isinstance(value, int):
+        return _EPOCH + timedelta(microseconds=value)
+    return datetime.fromisoformat(value)
+
+@dataclass(slots=True)
 class FlowIntent:
     """Representa um fluxo de intenção em andamento"""
     flow_id: str
@@ -56,14 +76,15 @@ Dados Pendentes: {self.pending_params}
 """
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     role: str
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
+    id: Optional[str] = None  # id da linha em messages (o mesmo no contexto e no PostgreSQL)
 
 
-@dataclass
+@dataclass(slots=True)
 class DecisionRecord:
     """Registro de uma decisão tomada pelo agente"""
     decision: str  # call_tool, ask_user, reply, complete, new_flow
@@ -74,12 +95,76 @@ class DecisionRecord:
     user_message: Optional[str] = None  # Mensagem que gerou esta decisão
 
 
+class LazyRecordList(MutableSequence):
+    """
+    Lista que guarda os registros serializados e só os converte em objeto
+    quando são acessados. Registros nunca acessados voltam para o to_dict
+    como vieram.
+
+    Do ContextCodec vêm como bytes (um msgpack por registro): é a forma mais
+    compacta de manter em memória o histórico que o turno não lê. Também
+    aceita listas posicionais (codec versão 1) e dicts (JSON).
+    """
+    
+    __slots__ = ("_items", "_decode", "_encode")
+    
+    def __init__(
+        self,
+        raw_items: Optional[list] = None,
+        decode: Callable[[Any], Any] = None,
+        encode: Callable[[Any], dict] = None
+    ):
+        self._items: List[Any] = list(raw_items) if raw_items else []
+        self._decode = decode
+        self._encode = encode
+    
+    _RAW = (bytes, dict, list)
+    
+    def _materialize(self, index: int):
+        item = self._items[index]
+        if isinstance(item, self._RAW):
+            item = self._decode(item)
+            self._items[index] = item
+        return item
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self._items)))]
+        return self._materialize(index)
+    
+    def __setitem__(self, index, value):
+        self._items[index] = value
+    
+    def __delitem__(self, index):
+        del self._items[index]
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def insert(self, index: int, value):
+        self._items.insert(index, value)
+    
+    def to_raw(self) -> list:
+        """Serializa, reaproveitando os registros não acessados"""
+        return [item if isinstance(item, self._RAW) else self._encode(item) for item in self._items]
+    
+    def __repr__(self) -> str:
+        return f"LazyRecordList({len(self._items)} registros)"
+
+
 class ConversationContext:
     """Contexto de conversa com gerenciamento de fluxo"""
     
+    # Ordem dos campos nos registros posicionais (ContextCodec)
+    MESSAGE_FIELDS = ("role", "content", "timestamp", "id")
+    DECISION_FIELDS = ("decision", "tool_name", "tool_params", "reason", "timestamp", "user_message")
+    
+    # Quantas mensagens do fim do histórico são conferidas na deduplicação por id
+    DEDUP_WINDOW = 100
+    
     def __init__(self, sender_id: str):
         self.sender_id = sender_id
-        self.messages: List[Message] = []
+        self.messages: LazyRecordList = self._message_list()
         self.tool_results: List[dict] = []
         
         # ✅ NOVO: gerenciamento de fluxo
@@ -87,16 +172,54 @@ class ConversationContext:
         self.flow_history: List[FlowIntent] = []
         
         # ✅ NOVO: histórico de decisões
-        self.decision_history: List[DecisionRecord] = []
+        self.decision_history: LazyRecordList = self._decision_list()
+        
+        # Marca d'água do histórico: created_at da mensagem mais recente do
+        # PostgreSQL que já está refletida em `messages`
+        self.history_watermark: Optional[datetime] = None
+        
+        # Controle de concorrência otimista (versão salva junto do contexto no Redis)
+        self.version: int = 0
+        self._synced_lengths = (0, 0, 0, 0)
     
-    def add_message(self, role: str, content: str):
-        """Adiciona mensagem ao histórico"""
-        self.messages.append(Message(role=role, content=content))
+    def add_message(self, role: str, content: str) -> Message:
+        """
+        Adiciona mensagem ao histórico. O id gerado aqui é o da linha gravada
+        em messages: um merge com o mesmo turno já sincronizado do PostgreSQL
+        por outro worker não duplica a mensagem.
+        """
+        message = Message(role=sys.intern(role), content=content, id=str(uuid.uuid4()))
+        self.messages.append(message)
+        return message
     
     def get_recent_messages(self, limit: int = 20) -> List[Message]:
         """Retorna últimas N mensagens"""
         return self.messages[-limit:]
     
+    def add_history_messages(self, messages: List[Message]) -> int:
+        """
+        Acrescenta mensagens lidas do PostgreSQL (ignorando ids que o contexto
+        já tem) e avança a marca d'água. Retorna quantas foram acrescentadas.
+        """
+        added = self._append_unique(messages)
+        for message in messages:
+            if self.history_watermark is None or message.timestamp > self.history_watermark:
+                self.history_watermark = message.timestamp
+        return added
+    
+    def _append_unique(self, messages: List[Message]) -> int:
+        if not messages:
+            return 0
+        known = {m.id for m in self.messages[-(len(messages) + self.DEDUP_WINDOW):] if m.id}
+        added = 0
+        for message in messages:
+            if message.id and message.id in known:
+                continue
+            self.messages.append(message)
+            known.add(message.id)
+            added += 1
+        return added
+    
     # ========== GERENCIAMENTO DE FLUXO ==========
     
     def start_flow(self, primary_intent: str, pending_params: List[str] = None) -> FlowIntent:
@@ -162,7 +285,7 @@ class ConversationContext:
         """Adiciona uma decisão ao histórico"""
         self.decision_history.append(
             DecisionRecord(
-                decision=decision,
+                decision=sys.intern(decision),
                 tool_name=tool_name,
                 tool_params=tool_params or {},
                 reason=reason,
@@ -192,36 +315,120 @@ class ConversationContext:
         
         return "\n".join(summary_lines)
     
+    # ========== CONCORRÊNCIA OTIMISTA ==========
+    
+    def _lengths(self) -> tuple:
+        return (
+            len(self.messages),
+            len(self.decision_history),
+            len(self.tool_results),
+            len(self.flow_history)
+        )
+    
+    def mark_synced(self, version: int):
+        """Marca o estado atual como idêntico à versão persistida"""
+        self.version = version
+        self._synced_lengths = self._lengths()
+    
+    def merge_into(self, remote: 'ConversationContext') -> 'ConversationContext':
+        """
+        Reaplica sobre um contexto mais novo (salvo por outro turno) tudo
+        que foi acrescentado localmente desde o último sync. Mensagens
+        (sem repetir ids que o remoto já sincronizou do PostgreSQL),
+        decisões, resultados de tools e fluxos arquivados são concatenados;
+        o fluxo ativo deste turno prevalece e a marca d'água fica com a
+        mais recente das duas.
+        
+        Retorna o contexto remoto, que passa a carregar o delta pendente.
+        """
+        messages, decisions, tools, flows = self._synced_lengths
+        remote._synced_lengths = remote._lengths()
+        
+        remote._append_unique(self.messages[messages:])
+        remote.decision_history.extend(self.decision_history[decisions:])
+        remote.tool_results.extend(self.tool_results[tools:])
+        remote.flow_history.extend(self.flow_history[flows:])
+        remote.active_flow = self.active_flow
+        if self.history_watermark and (
+            remote.history_watermark is None or self.history_watermark > remote.history_watermark
+        ):
+            remote.history_watermark = self.history_watermark
+        
+        return remote
+    
     # ========== SERIALIZAÇÃO PARA REDIS ==========
     
     def to_dict(self) -> Dict[str, Any]:
         """Serializa o contexto para dicionário (para salvar no Redis)"""
         return {
             "sender_id": self.sender_id,
-            "messages": [
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat()
-                }
-                for msg in self.messages
-            ],
+            "messages": self.messages.to_raw(),
             "tool_results": self.tool_results,
             "active_flow": self._flow_to_dict(self.active_flow) if self.active_flow else None,
             "flow_history": [self._flow_to_dict(f) for f in self.flow_history],
-            "decision_history": [
-                {
-                    "decision": d.decision,
-                    "tool_name": d.tool_name,
-                    "tool_params": d.tool_params,
-                    "reason": d.reason,
-                    "timestamp": d.timestamp.isoformat(),
-                    "user_message": d.user_message
-                }
-                for d in self.decision_history
-            ]
+            "decision_history": self.decision_history.to_raw(),
+            "history_watermark": self.history_watermark.isoformat() if self.history_watermark else None
+        }
+    
+    @classmethod
+    def _message_list(cls, raw_items: Optional[list] = None) -> LazyRecordList:
+        return LazyRecordList(raw_items, decode=cls._message_from_raw, encode=cls._message_to_dict)
+    
+    @classmethod
+    def _decision_list(cls, raw_items: Optional[list] = None) -> LazyRecordList:
+        return LazyRecordList(raw_items, decode=cls._decision_from_raw, encode=cls._decision_to_dict)
+    
+    @staticmethod
+    def _message_to_dict(msg: Message) -> Dict[str, Any]:
+        return {
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.timestamp.isoformat(),
+            "id": msg.id
+        }
+    
+    @staticmethod
+    def _message_from_raw(data: Union[bytes, list, Dict[str, Any]]) -> Message:
+        data = _unpack_record(data)
+        if isinstance(data, list):
+            # Registros gravados antes do campo id têm só 3 posições
+            role, content, timestamp, *rest = data
+            message_id = rest[0] if rest else None
+        else:
+            role, content, timestamp = data["role"], data["content"], data["timestamp"]
+            message_id = data.get("id")
+        return Message(
+            role=sys.intern(role),
+            content=content,
+            timestamp=_parse_timestamp(timestamp),
+            id=message_id
+        )
+    
+    @staticmethod
+    def _decision_to_dict(d: DecisionRecord) -> Dict[str, Any]:
+        return {
+            "decision": d.decision,
+            "tool_name": d.tool_name,
+            "tool_params": d.tool_params,
+            "reason": d.reason,
+            "timestamp": d.timestamp.isoformat(),
+            "user_message": d.user_message
         }
     
+    @classmethod
+    def _decision_from_raw(cls, data: Union[bytes, list, Dict[str, Any]]) -> DecisionRecord:
+        data = _unpack_record(data)
+        if isinstance(data, list):
+            data = dict(zip(cls.DECISION_FIELDS, data))
+        return DecisionRecord(
+            decision=sys.intern(data["decision"]),
+            tool_name=data.get("tool_name"),
+            tool_params=data.get("tool_params", {}),
+            reason=data.get("reason"),
+            timestamp=_parse_timestamp(data["timestamp"]),
+            user_message=data.get("user_message")
+        )
+    
     def _flow_to_dict(self, flow: FlowIntent) -> Dict[str, Any]:
         """Serializa um FlowIntent para dicionário"""
         if not flow:
@@ -244,15 +451,12 @@ class ConversationContext:
         """Deserializa um dicionário para ConversationContext"""
         context = cls(sender_id=data["sender_id"])
         
-        # Restaura mensagens
-        for msg_data in data.get("messages", []):
-            context.messages.append(
-                Message(
-                    role=msg_data["role"],
-                    content=msg_data["content"],
-                    timestamp=datetime.fromisoformat(msg_data["timestamp"])
-                )
-            )
+        # Restaura mensagens (decodificadas só quando acessadas)
+        context.messages = cls._message_list(data.get("messages", []))
+        
+        # Restaura marca d'água do histórico
+        if data.get("history_watermark"):
+            context.history_watermark = datetime.fromisoformat(data["history_watermark"])
         
         # Restaura tool results
         context.tool_results = data.get("tool_results", [])
@@ -266,18 +470,8 @@ class ConversationContext:
             cls._flow_from_dict(f) for f in data.get("flow_history", [])
         ]
         
-        # Restaura decision history
-        for decision_data in data.get("decision_history", []):
-            context.decision_history.append(
-                DecisionRecord(
-                    decision=decision_data["decision"],
-                    tool_name=decision_data.get("tool_name"),
-                    tool_params=decision_data.get("tool_params", {}),
-                    reason=decision_data.get("reason"),
-                    timestamp=datetime.fromisoformat(decision_data["timestamp"]),
-                    user_message=decision_data.get("user_message")
-                )
-            )
+        # Restaura decision history (decodificado só quando acessado)
+        context.decision_history = cls._decision_list(data.get("decision_history", []))
         
         return context
     
@@ -292,7 +486,7 @@ class ConversationContext:
             current_step=data["current_step"],
             resolved_params=data.get("resolved_params", {}),
             pending_params=data.get("pending_params", []),
-            created_at=datetime.fromisoformat(data["created_at"]),
-            last_updated=datetime.fromisoformat(data["last_updated"]),
+            created_at=_parse_timestamp(data["created_at"]),
+            last_updated=_parse_timestamp(data["last_updated"]),
             ttl_seconds=data.get("ttl_seconds", 1800)
         )
\ No newline at end of file
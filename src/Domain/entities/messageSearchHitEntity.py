@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from src.Domain.entities.messageEntity import MessageEntity
+
+
+class MessageSearchHitEntity(BaseModel):
+    message: MessageEntity
+
+    sender_id: str
+    instance: str
+
+    rank: float = Field(..., description="Relevância (ts_rank_cd); maior primeiro")
+    snippet: Optional[str] = Field(
+        default=None,
+        description="Trecho da mensagem com os termos encontrados entre ** **"
+    )
@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+
+class IContextStore(ABC):
+    """
+    Armazenamento versionado de contextos de conversa (ConversationContext.to_dict).
+    Todas as implementações seguem o mesmo contrato:
+
+    - versão 0 significa "não existe";
+    - compare_and_set só grava se a versão atual for a esperada e
+      retorna (True, nova_versão) ou (False, versão_atual);
+    - `write_token` fica gravado junto do valor: se a versão não bate mas o
+      token atual é o informado, a escrita já aconteceu (retry após timeout)
+      e o retorno é (True, versão_atual).
+    """
+
+    @abstractmethod
+    async def load(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:...
+
+    @abstractmethod
+    async def compare_and_set(
+        self,
+        key: str,
+        data: Dict[str, Any],
+        expected_version: int,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> Tuple[bool, int]:...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:...
@@ -7,5 +7,10 @@ class IOpenAiClient(ABC):
         self, 
         messages: List[Dict[str, Any]], 
         tools: Optional[List[Dict[str, Any]]] = None,
-        temperature: float = 0.3
-    ) -> Dict[str, Any]:...
\ No newline at end of file
+        temperature: float = 0.3,
+        tools_payload: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:...
+
+    @staticmethod
+    @abstractmethod
+    def build_tools_payload(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:...
\ No newline at end of file
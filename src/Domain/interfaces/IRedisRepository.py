@@ -1,16 +1,40 @@
 from abc import ABC,abstractmethod
-from typing import Any,Optional
+from typing import Any,List,Optional,Tuple
 
 class IRedisRepository(ABC):
     @abstractmethod
-    def set(self,key: str,value: Any,ttl_seconds: Optional[int] = None) -> None:...
+    async def set(self,key: str,value: Any,ttl_seconds: Optional[int] = None) -> None:...
     @abstractmethod
-    def get(self, key: str) -> Optional[Any]:...
+    async def get(self, key: str) -> Optional[Any]:...
     @abstractmethod
-    def update(self, key: str, value: Any) -> bool:...
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], int]:...
     @abstractmethod
-    def renew_ttl(self, key: str, ttl_seconds: int) -> bool:...
+    async def get_versioned(self, key: str) -> Tuple[Optional[Any], int]:...
     @abstractmethod
-    def get_ttl(self, key: str) -> int:...
+    async def compare_and_set(self, key: str, value: Any, expected_version: int, ttl_seconds: Optional[int] = None, write_token: Optional[str] = None) -> Tuple[bool, int]:...
     @abstractmethod
-    def delete(self, key: str) -> None:...
\ No newline at end of file
+    async def set_versioned_if_absent(self, key: str, value: Any, version: int, ttl_seconds: Optional[int] = None) -> Tuple[bool, int]:...
+    @abstractmethod
+    async def update(self, key: str, value: Any) -> bool:...
+    @abstractmethod
+    async def renew_ttl(self, key: str, ttl_seconds: int) -> bool:...
+    @abstractmethod
+    async def get_ttl(self, key: str) -> int:...
+    @abstractmethod
+    async def delete(self, key: str) -> None:...
+    @abstractmethod
+    async def delete_if_version(self, key: str, version: int) -> bool:...
+    @abstractmethod
+    async def set_if_absent(self, key: str, value: Any, ttl_seconds: int) -> bool:...
+    @abstractmethod
+    async def zadd(self, key: str, member: str, score: float) -> None:...
+    @abstractmethod
+    async def zrange_by_score(self, key: str, max_score: float, limit: int) -> List[str]:...
+    @abstractmethod
+    async def zrem(self, key: str, *members: str) -> None:...
+    @abstractmethod
+    async def zrem_if_score_at_most(self, key: str, max_score: float, *members: str) -> int:...
+    @abstractmethod
+    async def sadd(self, key: str, member: str) -> None:...
+    @abstractmethod
+    async def smembers(self, key: str) -> List[str]:...
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from uuid import UUID
 from src.Domain.entities.agentConfigEntity import AgentConfigEntity
 
@@ -21,6 +21,11 @@ class IAgentConfigRepository(ABC):
         """Lista todos os agentes ativos"""
         ...
     
+    @abstractmethod
+    async def list_active_with_phones(self) -> List[Tuple[AgentConfigEntity, List[str]]]:
+        """Agentes ativos com seus números mapeados ativos, em uma única consulta (warm-up)"""
+        ...
+    
     @abstractmethod
     async def create(self, agent_config: AgentConfigEntity) -> AgentConfigEntity:
         """Cria novo agente"""
@@ -35,3 +40,8 @@ class IAgentConfigRepository(ABC):
     async def get_default_agent(self) -> Optional[AgentConfigEntity]:
         """Retorna o agente padrão (fallback)"""
         ...
+    
+    @abstractmethod
+    async def get_idle_thresholds(self) -> Dict[str, Optional[int]]:
+        """instance (número) → minutos de ociosidade para encerrar conversas (None: padrão)"""
+        ...
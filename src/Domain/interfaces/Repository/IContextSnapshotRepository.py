@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+
+class IContextSnapshotRepository(ABC):
+    """Armazenamento frio (PostgreSQL) de contextos de conversa ociosos"""
+
+    @abstractmethod
+    async def save(self, context_key: str, payload: bytes, version: int) -> None:
+        """Grava (ou substitui) o snapshot serializado de um contexto"""
+        ...
+
+    @abstractmethod
+    async def get(self, context_key: str) -> Optional[Tuple[bytes, int]]:
+        """Retorna (payload, versão) do snapshot, se existir"""
+        ...
+
+    @abstractmethod
+    async def delete(self, context_key: str) -> None:
+        """Remove o snapshot (após reidratar no Redis)"""
+        ...
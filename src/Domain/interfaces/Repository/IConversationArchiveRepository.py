@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+from src.Domain import ConversationEntity, MessageEntity
+
+
+class IConversationArchiveRepository(ABC):
+    """Arquivo (PostgreSQL) de conversas encerradas antigas e suas mensagens"""
+
+    @abstractmethod
+    async def archive_batch(self, closed_before: datetime, batch_size: int) -> int:
+        """Move até `batch_size` conversas encerradas antes de `closed_before`; retorna quantas"""
+        ...
+
+    @abstractmethod
+    async def get_progress(self) -> Optional[dict]:
+        """Estatísticas do job (último arquivado: last_ended_at, last_id; archived_total, updated_at)"""
+        ...
+
+    @abstractmethod
+    async def get_conversation(self, conversation_id: uuid.UUID) -> Optional[ConversationEntity]:
+        ...
+
+    @abstractmethod
+    async def get_transcript(self, conversation_id: uuid.UUID) -> Optional[List[MessageEntity]]:
+        """Mensagens arquivadas em ordem cronológica; None se a conversa não está no arquivo"""
+        ...
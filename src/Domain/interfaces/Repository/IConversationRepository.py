@@ -1,17 +1,42 @@
 # src/Domain/Repositories/IConversationRepository.py
 from abc import ABC, abstractmethod
-from typing import Optional,List
+import uuid
+from datetime import datetime
+from typing import AsyncIterator,Optional,List,Tuple
 from src.Domain import ConversationEntity
 
 class IConversationRepository(ABC):
 
     @abstractmethod
-    async def get_conversations(self) -> List[ConversationEntity]:...
+    async def get_conversations(
+        self,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        before: Optional[Tuple[datetime, uuid.UUID]] = None,
+        limit: int = 100
+    ) -> List[ConversationEntity]:...
+    @abstractmethod
+    def iter_conversations(
+        self,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[ConversationEntity]:...
+    @abstractmethod
+    async def get_by_id(self, conversation_id: uuid.UUID) -> Optional[ConversationEntity]:...
     @abstractmethod
     async def get_active_conversation(self,sender_id: str,instance: str,channel: str) -> Optional[ConversationEntity]:...
     @abstractmethod
     async def create(self, conversation: ConversationEntity) -> ConversationEntity:...
     @abstractmethod
+    async def upsert_active(self,sender_id: str,instance: str,channel: str) -> Tuple[ConversationEntity, bool]:...
+    @abstractmethod
     async def touch(self, conversation_id):...
     @abstractmethod
-    async def close(self, conversation_id):...
\ No newline at end of file
+    async def close(self, conversation_id):...
+    @abstractmethod
+    async def close_idle(self, conversation_ids: List[uuid.UUID], idle_before: datetime) -> List[ConversationEntity]:...
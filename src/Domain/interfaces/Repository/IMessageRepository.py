@@ -1,7 +1,8 @@
 # src/Domain/IMessageRepository.py
 from abc import ABC, abstractmethod
-from typing import List
-from src.Domain import MessageEntity
+from typing import List, Optional, Tuple
+from datetime import datetime
+from src.Domain import MessageEntity, MessageSearchHitEntity
 import uuid
 
 
@@ -11,10 +12,69 @@ class IMessageRepository(ABC):
     async def create(self, message: MessageEntity) -> MessageEntity:
         pass
 
+    @abstractmethod
+    async def create_many(self, messages: List[MessageEntity]) -> List[MessageEntity]:
+        """Grava várias mensagens em um único INSERT multi-linha (idempotente pelo id)"""
+        pass
+
+    @abstractmethod
+    async def copy_many(self, messages: List[MessageEntity]) -> int:
+        """Grava um lote grande via COPY (sem devolver ids); retorna o total gravado"""
+        pass
+
     @abstractmethod
     async def list_by_conversation(
         self,
         conversation_id: uuid.UUID,
         limit: int = 50
         ) -> List[MessageEntity]:
+        """Últimas `limit` mensagens, em ordem cronológica (igual a list_recent)"""
+        pass
+
+    @abstractmethod
+    async def list_recent(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int = 50,
+        readonly: bool = False
+        ) -> List[MessageEntity]:
+        """Últimas `limit` mensagens, em ordem cronológica (readonly: réplica e fallback no arquivo)"""
+        pass
+
+    @abstractmethod
+    async def list_before(
+        self,
+        conversation_id: uuid.UUID,
+        before: datetime,
+        before_id: Optional[uuid.UUID] = None,
+        limit: int = 50,
+        readonly: bool = False
+        ) -> List[MessageEntity]:
+        """Até `limit` mensagens anteriores ao cursor (created_at, id), em ordem cronológica"""
+        pass
+
+    @abstractmethod
+    async def list_after(
+        self,
+        conversation_id: uuid.UUID,
+        after: datetime,
+        limit: int = 50,
+        after_id: Optional[uuid.UUID] = None,
+        readonly: bool = False
+        ) -> List[MessageEntity]:
+        """Mensagens posteriores ao cursor (created_at, id), em ordem cronológica"""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        instance: Optional[str] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        after: Optional[Tuple[float, uuid.UUID]] = None,
+        limit: int = 20
+        ) -> List[MessageSearchHitEntity]:
+        """Busca textual (português), mais relevantes primeiro; `after` é o (rank, id) do último resultado"""
         pass
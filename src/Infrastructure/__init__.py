@@ -1,11 +1,25 @@
 from .cross_cutting.openaiClient import OpenAIClient
 from .cross_cutting.whatsappClient import WhatsAppClient
 from .cross_cutting.AgentsPrompts import AgentPrompts
+from .cross_cutting.metrics import Metrics
 
+from .data.redis.keys import RedisKeys
+from .data.redis.context.shardedRedisClient import ShardedRedisClient
 from .data.redis.context.redisContext import RedisContext
+from .data.redis.codec.contextCodec import ContextCodec
 from .data.postgres.context.PostgresContext import PostgresContext
 
 from .data.redis.repository.redisRepository import RedisRepository
+from .data.redis.repository.redisContextStore import RedisContextStore
+from .data.redis.cache.contextCache import ContextCache
+from .data.memory.inMemoryContextStore import InMemoryContextStore
 
+from .data.postgres.repository.ConversationArchiveRepository import ConversationArchiveRepository
 from .data.postgres.repository.ConversationRepository import ConversationRepository
-from .data.postgres.repository.MessageRepository import MessageRepository
\ No newline at end of file
+from .data.postgres.repository.MessageRepository import MessageRepository
+from .data.postgres.buffer.messageWriteBuffer import MessageWriteBuffer
+from .data.postgres.repository.ContextSnapshotRepository import ContextSnapshotRepository
+from .data.postgres.repository.ContextStoreRepository import PostgresContextStore
+
+from .data.postgres.listener.pgNotificationListener import PgNotificationListener
+from .data.postgres.migrations.migrationRunner import MigrationRunner
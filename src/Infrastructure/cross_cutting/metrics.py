@@ -0,0 +1,55 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+class Metrics:
+    """
+    Contadores em memória do processo.
+    Cada worker do gunicorn mantém os seus; expostos em GET /metrics.
+    """
+    _lock = threading.Lock()
+    _counters: Dict[str, int] = defaultdict(int)
+    _ratios: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+    _observations: Dict[str, List[float]] = {}
+
+    @classmethod
+    def incr(cls, name: str, value: int = 1):
+        with cls._lock:
+            cls._counters[name] += value
+
+    @classmethod
+    def observe(cls, name: str, value: float):
+        """Amostra de uma medida (ex.: latência); exposta como count/avg/max"""
+        with cls._lock:
+            count, total, peak = cls._observations.get(name, (0, 0.0, 0.0))
+            cls._observations[name] = [count + 1, total + value, max(peak, value)]
+
+    @classmethod
+    def get(cls, name: str) -> int:
+        return cls._counters.get(name, 0)
+
+    @classmethod
+    def register_ratio(cls, name: str, hits: str, *others: str):
+        """Razão derivada hits / (hits + others), calculada a cada snapshot"""
+        cls._ratios[name] = (hits, others)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, float]:
+        with cls._lock:
+            data = dict(cls._counters)
+            observations = {name: list(values) for name, values in cls._observations.items()}
+        for name, (count, total, peak) in observations.items():
+            data[f"{name}.count"] = count
+            data[f"{name}.avg"] = round(total / count, 2) if count else 0.0
+            data[f"{name}.max"] = round(peak, 2)
+        for name, (hits, others) in cls._ratios.items():
+            total = data.get(hits, 0) + sum(data.get(o, 0) for o in others)
+            data[name] = round(data.get(hits, 0) / total, 4) if total else 0.0
+        return data
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._counters.clear()
+            cls._observations.clear()
@@ -15,11 +15,27 @@ class OpenAIClient(IOpenAiClient):
         )
         self.model = settings.OPENAI_MODEL
     
+    async def warm_up(self):
+        """Abre a conexão HTTP (TLS) com a API antes da primeira mensagem"""
+        await self.client.models.retrieve(self.model)
+
+    @staticmethod
+    def build_tools_payload(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Schemas das tools no formato `tools` da API (pode ser montado uma vez e reaproveitado)"""
+        return [
+            {
+                "type": "function",
+                "function": tool,
+                "strict": True
+            } for tool in tools
+        ]
+
     async def chat(
         self, 
         messages: List[Dict[str, Any]], 
         tools: Optional[List[Dict[str, Any]]] = None,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        tools_payload: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         try:
             kwargs = {
@@ -28,14 +44,10 @@ class OpenAIClient(IOpenAiClient):
                 # "temperature": temperature
             }
             
-            if tools:
-                kwargs["tools"] = [
-                    {
-                        "type": "function",
-                        "function": tool,
-                        "strict": True
-                    } for tool in tools
-                ]
+            if tools and tools_payload is None:
+                tools_payload = self.build_tools_payload(tools)
+            if tools_payload:
+                kwargs["tools"] = tools_payload
                 kwargs["tool_choice"] = "auto"
             
             response = await self.client.chat.completions.create(**kwargs)
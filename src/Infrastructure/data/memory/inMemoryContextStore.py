@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.Domain import IContextStore
+from src.Infrastructure import ContextCodec
+
+
+class InMemoryContextStore(IContextStore):
+    """
+    Backend em processo (single-node / desenvolvimento, ou sem REDIS_URL).
+    LRU limitado por número de entradas; os valores ficam serializados com
+    o ContextCodec, então o contexto salvo não muda se o objeto vivo mudar.
+
+    Não há await entre a leitura da versão e a escrita, então o
+    compare-and-set é atômico dentro do event loop.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.codec = ContextCodec()
+        # chave → (valor, versão, expira em, token da escrita)
+        self._entries: "OrderedDict[str, Tuple[bytes, int, Optional[float], Optional[str]]]" = OrderedDict()
+
+    def _current(self, key: str) -> Optional[Tuple[bytes, int, Optional[float], Optional[str]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] is not None and entry[2] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def load(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        entry = self._current(key)
+        if entry is None:
+            return None, 0
+        return self.codec.decode(entry[0]), entry[1]
+
+    async def compare_and_set(
+        self,
+        key: str,
+        data: Dict[str, Any],
+        expected_version: int,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> Tuple[bool, int]:
+        entry = self._current(key)
+        current = entry[1] if entry else 0
+        if current != expected_version:
+            return bool(write_token and entry and entry[3] == write_token), current
+
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (self.codec.encode(data), current + 1, expires_at, write_token)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True, current + 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
@@ -0,0 +1,94 @@
+# Infrastructure/data/postgres/buffer/messageWriteBuffer.py
+import asyncio
+import logging
+from typing import List
+
+from src.Domain import IMessageRepository, MessageEntity
+from src.Infrastructure import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind de mensagens: acumula os turnos de várias conversas e grava
+    em lote via COPY a cada `flush_interval_ms` ou ao atingir `flush_max_rows`.
+
+    A memória é limitada por `max_buffered_rows`: ao encher, o `add` espera o
+    flush (backpressure) em vez de crescer. Lotes que falham voltam para a
+    fila enquanto houver espaço; `close` faz o flush final no shutdown.
+    """
+
+    def __init__(
+        self,
+        message_repo: IMessageRepository,
+        flush_interval_ms: int = 200,
+        flush_max_rows: int = 500,
+        max_buffered_rows: int = 10000
+    ):
+        self.message_repo = message_repo
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self.max_buffered_rows = max_buffered_rows
+        self._pending: List[MessageEntity] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def add(self, messages: List[MessageEntity]):
+        if self._closed:
+            # Após o shutdown não há loop: grava direto
+            await self.message_repo.create_many(messages)
+            return
+
+        if len(self._pending) + len(messages) > self.max_buffered_rows:
+            Metrics.incr("messages.buffer.backpressure")
+            await self.flush()
+            if len(self._pending) + len(messages) > self.max_buffered_rows:
+                # Banco indisponível e fila cheia: grava no caminho do turno
+                await self.message_repo.create_many(messages)
+                return
+
+        self._pending.extend(messages)
+        if len(self._pending) >= self.flush_max_rows:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                written = await self.message_repo.copy_many(batch)
+                Metrics.incr("messages.buffer.flushed", written)
+                return written
+            except Exception as e:
+                Metrics.incr("messages.buffer.flush_failures")
+                room = self.max_buffered_rows - len(self._pending)
+                if room < len(batch):
+                    Metrics.incr("messages.buffer.dropped", len(batch) - max(room, 0))
+                    logger.error(f"[MessageWriteBuffer] ❌ {len(batch) - max(room, 0)} mensagens descartadas: {e}")
+                self._pending[:0] = batch[:max(room, 0)]
+                logger.error(f"[MessageWriteBuffer] ❌ Erro ao gravar lote de {len(batch)} mensagens: {e}")
+                return 0
+
+    async def run(self):
+        """Loop de flush periódico (uma tarefa por worker)"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self):
+        """Flush final: nada que já foi aceito fica só em memória"""
+        self._closed = True
+        await self.flush()
+        if self._pending:
+            logger.error(f"[MessageWriteBuffer] ❌ {len(self._pending)} mensagens não gravadas no shutdown")
@@ -1,49 +1,177 @@
-from psycopg2 import pool as pg_pool
-import threading
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional
+
+import asyncpg
 from src.config import settings
+from src.Infrastructure.cross_cutting.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Atraso de replicação em segundos (0 quando a réplica já aplicou todo o WAL recebido)
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+async def _init_connection(connection: asyncpg.Connection):
+    # json/jsonb entram e saem como objetos Python (dict/list)
+    for typename in ("json", "jsonb"):
+        await connection.set_type_codec(
+            typename,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+
+async def _create_pool(dsn: str) -> asyncpg.Pool:
+    # asyncpg prepara cada query na primeira execução e reaproveita o
+    # statement por conexão: parse/plan saem do caminho de cada mensagem
+    return await asyncpg.create_pool(
+        dsn=dsn,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS,
+        max_inactive_connection_lifetime=settings.DB_POOL_MAX_IDLE_SECONDS,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        init=_init_connection
+    )
+
+
+class _Replica:
+    """Pool de uma réplica de leitura e o último atraso medido"""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.pool: Optional[asyncpg.Pool] = None
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = float("-inf")
 
 
 class PostgresContext:
+    """
+    Pools asyncpg únicos por processo (recriados após fork, como o RedisContext).
+    Tamanho do pool e timeouts vêm do .env (DB_POOL_*, DB_*_TIMEOUT_SECONDS).
+
+    Escritas vão sempre para o primário (DATABASE_URL). Leituras marcadas com
+    `readonly=True` vão para as réplicas (DATABASE_REPLICA_URLS) em rodízio;
+    uma réplica com atraso acima de DB_REPLICA_MAX_LAG_SECONDS, ou fora do
+    ar, fica de fora até a próxima medição e a leitura cai no primário.
+    Só marque como readonly leituras que toleram esse atraso.
+    """
+
+    _pool: Optional[asyncpg.Pool] = None
+    _replicas: List[_Replica] = []
+    _next_replica = 0
+    _pid: Optional[int] = None
+    _pool_lock = asyncio.Lock()
+
+    @classmethod
+    async def get_pool(cls) -> asyncpg.Pool:
+        if cls._pool is None or cls._pid != os.getpid():
+            async with cls._pool_lock:
+                if cls._pool is None or cls._pid != os.getpid():
+                    cls._pool = await _create_pool(settings.postgres_dsn)
+                    cls._replicas = [_Replica(dsn) for dsn in settings.postgres_replica_dsns]
+                    cls._pid = os.getpid()
+        return cls._pool
+
+    @classmethod
+    async def get_read_pool(cls) -> asyncpg.Pool:
+        """Réplica saudável seguinte no rodízio, ou o primário"""
+        primary = await cls.get_pool()
+        replicas = cls._replicas
+        for _ in range(len(replicas)):
+            replica = replicas[cls._next_replica % len(replicas)]
+            cls._next_replica += 1
+            if await cls._is_usable(replica):
+                Metrics.incr("db.reads.replica")
+                return replica.pool
+
+        if replicas:
+            Metrics.incr("db.reads.replica_fallback")
+        return primary
 
-    _connection_pool: pg_pool.ThreadedConnectionPool | None = None
-    _pool_lock = threading.Lock()
-
-    def _get_connection_pool(self) -> pg_pool.ThreadedConnectionPool:
-        if PostgresContext._connection_pool is None:
-            with PostgresContext._pool_lock:
-                if PostgresContext._connection_pool is None:
-                    PostgresContext._connection_pool = pg_pool.ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=20,
-                        dsn=settings.DATABASE_URL
-                    )
-        return PostgresContext._connection_pool
-
-    def connect(self):
+    @classmethod
+    async def _is_usable(cls, replica: _Replica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return replica.healthy
+
+        # Marca antes de medir: só uma corrotina mede por intervalo
+        replica.checked_at = now
         try:
-            connection_pool = self._get_connection_pool()
-            connection = connection_pool.getconn()
+            if replica.pool is None:
+                replica.pool = await _create_pool(replica.dsn)
+            lag = await replica.pool.fetchval(_REPLICA_LAG_SQL, timeout=settings.DB_ACQUIRE_TIMEOUT_SECONDS)
+            replica.lag_seconds = float(lag)
+            healthy = replica.lag_seconds <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        except Exception as e:
+            logger.error(f"[PostgresContext] ❌ Réplica indisponível: {e}")
+            healthy = False
 
-            if connection is None:
-                raise ConnectionError("Não foi possível obter conexão do pool")
+        if healthy != replica.healthy:
+            state = "✅ de volta ao rodízio" if healthy else f"⚠️ fora do rodízio (atraso {replica.lag_seconds}s)"
+            logger.info(f"[PostgresContext] Réplica {replica.dsn.rsplit('@', 1)[-1]} {state}")
+        replica.healthy = healthy
+        if replica.lag_seconds is not None:
+            Metrics.observe("db.replica.lag_seconds", replica.lag_seconds)
+        return healthy
 
-            cursor = connection.cursor()
-            return cursor, connection
+    @classmethod
+    async def warm_up(cls):
+        """Cria os pools (DB_POOL_MIN_SIZE conexões abertas) e mede o atraso das réplicas"""
+        await cls.get_pool()
+        for replica in cls._replicas:
+            await cls._is_usable(replica)
 
-        except pg_pool.PoolError as e:
-            raise ConnectionError(f"Erro no pool de conexões: {e}") from e
+    @asynccontextmanager
+    async def acquire(self, readonly: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        try:
+            pool = await (self.get_read_pool() if readonly else self.get_pool())
+            connection = await pool.acquire(timeout=settings.DB_ACQUIRE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError as e:
+            raise ConnectionError("Tempo esgotado aguardando conexão do pool") from e
         except Exception as e:
             raise ConnectionError(f"Erro ao conectar ao banco: {e}") from e
 
-    def disconnect(self, connection):
         try:
-            if connection and not connection.closed:
-                PostgresContext._connection_pool.putconn(connection)
-        except Exception:
-            if connection and not connection.closed:
-                connection.close()
+            yield connection
+        finally:
+            await pool.release(connection)
+
+    async def fetch(self, query: str, *args, readonly: bool = False) -> List[asyncpg.Record]:
+        async with self.acquire(readonly) as connection:
+            return await connection.fetch(query, *args)
+
+    async def fetchrow(self, query: str, *args, readonly: bool = False) -> Optional[asyncpg.Record]:
+        async with self.acquire(readonly) as connection:
+            return await connection.fetchrow(query, *args)
+
+    async def fetchval(self, query: str, *args, readonly: bool = False) -> Any:
+        async with self.acquire(readonly) as connection:
+            return await connection.fetchval(query, *args)
+
+    async def execute(self, query: str, *args) -> str:
+        async with self.acquire() as connection:
+            return await connection.execute(query, *args)
 
     @classmethod
-    def close_all_connections(cls):
-        if cls._connection_pool:
-            cls._connection_pool.closeall()
+    async def close(cls):
+        if cls._pid == os.getpid():
+            for pool in [cls._pool] + [replica.pool for replica in cls._replicas]:
+                if pool is not None:
+                    await pool.close()
+        cls._pool = None
+        cls._replicas = []
+        cls._pid = None
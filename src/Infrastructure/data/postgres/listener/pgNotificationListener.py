@@ -0,0 +1,70 @@
+# Infrastructure/data/postgres/listener/pgNotificationListener.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+import asyncpg
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PgNotificationListener:
+    """
+    LISTEN em um canal do PostgreSQL, com conexão dedicada (fora do pool:
+    uma conexão do pool em LISTEN ficaria presa para sempre).
+
+    Cada payload vai para `handler`; `on_connect` roda a cada (re)conexão,
+    já que notificações enviadas enquanto desconectado se perdem.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        handler: Callable[[str], Awaitable[None]],
+        on_connect: Optional[Callable[[], Awaitable[None]]] = None,
+        keepalive_seconds: float = 30
+    ):
+        self.channel = channel
+        self.handler = handler
+        self.on_connect = on_connect
+        self.keepalive_seconds = keepalive_seconds
+        self._pending: Set[asyncio.Task] = set()
+
+    def _dispatch(self, connection, pid, channel, payload):
+        task = asyncio.get_running_loop().create_task(self._handle(payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _handle(self, payload: str):
+        try:
+            await self.handler(payload)
+        except Exception as e:
+            logger.error(f"[PgListener] ❌ Erro ao tratar notificação de {self.channel}: {e}")
+
+    async def run(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    settings.postgres_dsn,
+                    timeout=settings.DB_ACQUIRE_TIMEOUT_SECONDS
+                )
+                await connection.add_listener(self.channel, self._dispatch)
+                if self.on_connect:
+                    await self.on_connect()
+                logger.info(f"[PgListener] ✅ LISTEN {self.channel}")
+
+                # Notificações chegam pelo callback; aqui só detecta conexão caída
+                while True:
+                    await asyncio.sleep(self.keepalive_seconds)
+                    await connection.execute("SELECT 1", timeout=settings.DB_COMMAND_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[PgListener] ❌ LISTEN {self.channel} caiu: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
@@ -0,0 +1,64 @@
+"""
+CLI de migrations (usa DATABASE_URL do .env).
+
+Uso:
+    python -m src.Infrastructure.data.postgres.migrations upgrade
+    python -m src.Infrastructure.data.postgres.migrations status
+    python -m src.Infrastructure.data.postgres.migrations partitions
+    python -m src.Infrastructure.data.postgres.migrations check-plans
+    python -m src.Infrastructure.data.postgres.migrations archive [dias]
+"""
+import asyncio
+import sys
+
+from src.config import settings
+from src.Infrastructure.data.postgres.context.PostgresContext import PostgresContext
+from src.Infrastructure.data.postgres.migrations.migrationRunner import MigrationRunner
+from src.Infrastructure.data.postgres.migrations.planCheck import check_plans
+from src.Infrastructure.data.postgres.repository.ConversationArchiveRepository import ConversationArchiveRepository
+from src.Services.conversationArchiveService import ConversationArchiveService
+
+
+async def main(command: str, *args: str) -> int:
+    runner = MigrationRunner()
+    try:
+        if command == "upgrade":
+            applied = await runner.upgrade()
+            print(f"{len(applied)} migrations aplicadas: {', '.join(applied) or '-'}")
+        elif command == "status":
+            for version, applied in await runner.status():
+                print(f"{'[x]' if applied else '[ ]'} {version}")
+        elif command == "partitions":
+            print(f"{await runner.ensure_partitions()} partições criadas")
+        elif command == "check-plans":
+            failures = await check_plans()
+            for failure in failures:
+                print(f"❌ {failure}")
+            if failures:
+                return 1
+            print("✅ Todos os planos usam índice")
+        elif command == "archive":
+            # Execução agendada (cron) do mesmo job do lifespan
+            days = int(args[0]) if args else settings.CONVERSATION_ARCHIVE_AFTER_DAYS
+            if days <= 0:
+                print("Informe a retenção em dias (ou CONVERSATION_ARCHIVE_AFTER_DAYS)")
+                return 2
+            repo = ConversationArchiveRepository()
+            archived = await ConversationArchiveService(repo, days).archive_closed(
+                settings.CONVERSATION_ARCHIVE_BATCH_SIZE
+            )
+            progress = await repo.get_progress() or {}
+            print(
+                f"{archived} conversas arquivadas "
+                f"(total: {progress.get('archived_total', 0)}, até {progress.get('last_ended_at', '-')})"
+            )
+        else:
+            print(__doc__)
+            return 2
+        return 0
+    finally:
+        await PostgresContext.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(*(sys.argv[1:] or [""]))))
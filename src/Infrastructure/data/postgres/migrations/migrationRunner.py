@@ -0,0 +1,112 @@
+# Infrastructure/data/postgres/migrations/migrationRunner.py
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Tuple
+
+from src.config import settings
+from src.Infrastructure.cross_cutting.metrics import Metrics
+from src.Infrastructure.data.postgres.context.PostgresContext import PostgresContext
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationRunner:
+    """
+    Aplica os scripts de migrations/sql em ordem (NNNN_nome.sql), cada um em
+    sua transação, registrando a versão em schema_migrations.
+
+    Um advisory lock garante que só um worker (ou o CLI) migra por vez.
+    Toda execução também garante as partições mensais de `messages`; o
+    lifespan repete isso periodicamente (`run_partitions`) para a virada do
+    mês não depender de um deploy.
+    """
+
+    LOCK_ID = 4_815_162_342
+    DIRECTORY = Path(__file__).parent / "sql"
+
+    def __init__(self):
+        self.db = PostgresContext()
+
+    def migrations(self) -> List[Tuple[str, Path]]:
+        return [(path.stem, path) for path in sorted(self.DIRECTORY.glob("*.sql"))]
+
+    async def upgrade(self) -> List[str]:
+        """Aplica as migrations pendentes; retorna as versões aplicadas"""
+        applied_now = []
+        async with self.db.acquire() as connection:
+            await connection.execute("SELECT pg_advisory_lock($1)", self.LOCK_ID)
+            try:
+                await connection.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version     TEXT PRIMARY KEY,
+                        applied_at  TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+                    )
+                """)
+                applied = {
+                    row["version"]
+                    for row in await connection.fetch("SELECT version FROM schema_migrations")
+                }
+
+                for version, path in self.migrations():
+                    if version in applied:
+                        continue
+                    async with connection.transaction():
+                        await connection.execute(path.read_text(encoding="utf-8"))
+                        await connection.execute(
+                            "INSERT INTO schema_migrations (version) VALUES ($1)", version
+                        )
+                    applied_now.append(version)
+                    logger.info(f"[Migrations] ✅ {version} aplicada")
+
+                await self._ensure_partitions(connection)
+            finally:
+                await connection.execute("SELECT pg_advisory_unlock($1)", self.LOCK_ID)
+        return applied_now
+
+    async def ensure_partitions(self) -> int:
+        """Cria as partições que faltam; se outro worker (ou o upgrade) já está nisso, não faz nada"""
+        async with self.db.acquire() as connection:
+            if not await connection.fetchval("SELECT pg_try_advisory_lock($1)", self.LOCK_ID):
+                return 0
+            try:
+                return await self._ensure_partitions(connection)
+            finally:
+                await connection.execute("SELECT pg_advisory_unlock($1)", self.LOCK_ID)
+
+    async def run_partitions(self, interval_seconds: int):
+        """Loop do lifespan: garante as partições dos próximos meses a cada intervalo"""
+        while True:
+            try:
+                await self.ensure_partitions()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Migrations] ❌ Erro ao garantir partições de messages: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    async def _ensure_partitions(self, connection) -> int:
+        row = await connection.fetchrow(
+            "SELECT partitions_created, rows_moved FROM ensure_message_partitions($1)",
+            settings.MESSAGE_PARTITION_MONTHS_AHEAD
+        )
+        created, moved = row["partitions_created"], row["rows_moved"]
+        if created:
+            logger.info(f"[Migrations] ✅ {created} partições mensais de messages criadas")
+        if moved:
+            # Mensagens de um mês sem partição (relógio adiantado, backfill) caíram no default
+            Metrics.incr("db.partitions.default_rows_moved", moved)
+            logger.warning(f"[Migrations] ⚠️ {moved} mensagens movidas de messages_default para as novas partições")
+        return created
+
+    async def status(self) -> List[Tuple[str, bool]]:
+        """(versão, aplicada?) para cada migration conhecida"""
+        async with self.db.acquire() as connection:
+            exists = await connection.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+            applied = set()
+            if exists:
+                applied = {
+                    row["version"]
+                    for row in await connection.fetch("SELECT version FROM schema_migrations")
+                }
+        return [(version, version in applied) for version, _ in self.migrations()]
@@ -0,0 +1,217 @@
+# Infrastructure/data/postgres/migrations/planCheck.py
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.Infrastructure.data.postgres.context.PostgresContext import PostgresContext
+from src.Infrastructure.data.postgres.repository.AgentConfigRepository import AgentConfigRepository
+from src.Infrastructure.data.postgres.repository.ContextSnapshotRepository import ContextSnapshotRepository
+from src.Infrastructure.data.postgres.repository.ContextStoreRepository import PostgresContextStore
+from src.Infrastructure.data.postgres.repository.ConversationArchiveRepository import ConversationArchiveRepository
+from src.Infrastructure.data.postgres.repository.ConversationRepository import ConversationRepository
+from src.Infrastructure.data.postgres.repository.MessageRepository import MessageRepository
+
+
+@dataclass
+class PlanCheck:
+    """
+    Query quente de um repositório e o que o plano precisa ter.
+
+    `tables`: nenhuma dessas tabelas (ou partições, pelo prefixo) pode ter
+    Seq Scan. `arbiter`: índice que precisa resolver o ON CONFLICT.
+    O SQL vem dos próprios repositórios (constantes *_SQL e *_query), então
+    o check valida o plano da query que roda em produção.
+    """
+    name: str
+    sql: str
+    args: Tuple[Any, ...]
+    tables: List[str] = field(default_factory=list)
+    arbiter: Optional[str] = None
+
+
+_NOW = datetime.utcnow()
+_ID = uuid.uuid4()
+_PHONE = "5511999999999"
+_CONTEXT_KEY = "conversation:{x:y}:context"
+
+
+def _dynamic(name: str, query: Tuple[str, list], tables: List[str]) -> PlanCheck:
+    sql, args = query
+    return PlanCheck(name=name, sql=sql, args=tuple(args), tables=tables)
+
+
+PLAN_CHECKS: List[PlanCheck] = [
+    PlanCheck(
+        name="ConversationRepository.get_active_conversation",
+        sql=ConversationRepository.GET_ACTIVE_SQL,
+        args=(_PHONE, "default", "whatsapp"),
+        tables=["conversations"]
+    ),
+    PlanCheck(
+        name="ConversationRepository.upsert_active",
+        sql=ConversationRepository.UPSERT_ACTIVE_SQL,
+        args=(_PHONE, "default", "whatsapp", _NOW),
+        tables=["conversations"],
+        arbiter="ux_conversations_active"
+    ),
+    _dynamic(
+        "ConversationRepository.get_conversations",
+        ConversationRepository.page_query(before=(_NOW, _ID)),
+        ["conversations"]
+    ),
+    _dynamic(
+        "ConversationRepository.get_conversations (instance, status)",
+        ConversationRepository.page_query(instance="default", status="active", before=(_NOW, _ID)),
+        ["conversations"]
+    ),
+    _dynamic(
+        "ConversationRepository.iter_conversations (instance, status)",
+        ConversationRepository.iter_query(instance="default", status="closed", started_from=_NOW),
+        ["conversations"]
+    ),
+    PlanCheck(
+        name="ConversationRepository.close_idle",
+        sql=ConversationRepository.CLOSE_IDLE_SQL,
+        args=(_NOW, [_ID], _NOW),
+        tables=["conversations"]
+    ),
+    PlanCheck(
+        name="MessageRepository.create_many",
+        sql=MessageRepository.insert_query(2),
+        args=(_ID, _ID, "user", "oi", _NOW, None, uuid.uuid4(), _ID, "assistant", "olá", _NOW, None),
+        arbiter="messages_pkey"
+    ),
+    PlanCheck(
+        name="MessageRepository.list_recent",
+        sql=MessageRepository.LIST_RECENT_SQL,
+        args=(_ID, 50),
+        tables=["messages"]
+    ),
+    PlanCheck(
+        name="MessageRepository.list_before",
+        sql=MessageRepository.LIST_BEFORE_SQL,
+        args=(_ID, _NOW, _ID, 50),
+        tables=["messages"]
+    ),
+    PlanCheck(
+        name="MessageRepository.list_after",
+        sql=MessageRepository.LIST_AFTER_SQL,
+        args=(_ID, _NOW, _ID, 50),
+        tables=["messages"]
+    ),
+    PlanCheck(
+        name="MessageRepository.list_* (fallback para o arquivo)",
+        sql=MessageRepository.CONVERSATION_EXISTS_SQL,
+        args=(_ID,),
+        tables=["conversations"]
+    ),
+    _dynamic(
+        "MessageRepository.search",
+        MessageRepository.search_query("placa ABC1D23"),
+        ["messages"]
+    ),
+    PlanCheck(
+        name="AgentConfigRepository.get_by_phone_number",
+        sql=AgentConfigRepository.GET_BY_PHONE_NUMBER_SQL,
+        args=(_PHONE,),
+        tables=["agent_phone_mappings", "agent_configs"]
+    ),
+    PlanCheck(
+        name="AgentConfigRepository.get_by_id",
+        sql=AgentConfigRepository.GET_BY_ID_SQL,
+        args=(_ID,),
+        tables=["agent_configs"]
+    ),
+    PlanCheck(
+        name="AgentConfigRepository.list_active_with_phones",
+        sql=AgentConfigRepository.LIST_ACTIVE_WITH_PHONES_SQL,
+        args=(),
+        tables=["agent_phone_mappings", "agent_configs"]
+    ),
+    PlanCheck(
+        name="AgentConfigRepository.get_idle_thresholds",
+        sql=AgentConfigRepository.IDLE_THRESHOLDS_SQL,
+        args=(),
+        tables=["agent_phone_mappings", "agent_configs"]
+    ),
+    PlanCheck(
+        name="PostgresContextStore.load",
+        sql=PostgresContextStore.LOAD_SQL,
+        args=(_CONTEXT_KEY, _NOW),
+        tables=["conversation_contexts"]
+    ),
+    PlanCheck(
+        name="PostgresContextStore.purge_expired",
+        sql=PostgresContextStore.PURGE_EXPIRED_SQL,
+        args=(_NOW, 1000),
+        tables=["conversation_contexts"]
+    ),
+    PlanCheck(
+        name="ConversationArchiveRepository.archive_batch",
+        sql=ConversationArchiveRepository.SELECT_BATCH_SQL,
+        args=(_NOW, 200),
+        tables=["conversations"]
+    ),
+    PlanCheck(
+        name="ConversationArchiveRepository.archive_batch (mensagens)",
+        sql=ConversationArchiveRepository.SELECT_MESSAGES_SQL,
+        args=([_ID],),
+        tables=["messages"]
+    ),
+    PlanCheck(
+        name="ConversationArchiveRepository.archive_batch (DELETE mensagens)",
+        sql=ConversationArchiveRepository.DELETE_MESSAGES_SQL,
+        args=([_ID],),
+        tables=["messages"]
+    ),
+    PlanCheck(
+        name="ConversationArchiveRepository.archive_batch (DELETE conversas)",
+        sql=ConversationArchiveRepository.DELETE_CONVERSATIONS_SQL,
+        args=([_ID],),
+        tables=["conversations"]
+    ),
+    PlanCheck(
+        name="ConversationArchiveRepository.get_transcript",
+        sql=ConversationArchiveRepository.GET_TRANSCRIPT_SQL,
+        args=(_ID,),
+        tables=["conversations_archive"]
+    ),
+    PlanCheck(
+        name="ContextSnapshotRepository.get",
+        sql=ContextSnapshotRepository.GET_SQL,
+        args=(_CONTEXT_KEY,),
+        tables=["conversation_context_snapshots"]
+    ),
+]
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def check_plans(checks: List[PlanCheck] = PLAN_CHECKS) -> List[str]:
+    """
+    Roda EXPLAIN de cada query com enable_seqscan desligado (tabelas de teste
+    são pequenas demais para o planner preferir índice) e devolve as falhas.
+    """
+    failures = []
+    async with PostgresContext().acquire() as connection:
+        for check in checks:
+            async with connection.transaction():
+                await connection.execute("SET LOCAL enable_seqscan = off")
+                raw = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {check.sql}", *check.args)
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+            for node in _nodes(plan):
+                relation = node.get("Relation Name", "")
+                if node["Node Type"] == "Seq Scan" and any(relation.startswith(t) for t in check.tables):
+                    failures.append(f"{check.name}: Seq Scan em {relation}")
+
+            arbiters = [index for node in _nodes(plan) for index in node.get("Conflict Arbiter Indexes", [])]
+            if check.arbiter and check.arbiter not in arbiters:
+                failures.append(f"{check.name}: ON CONFLICT não usa {check.arbiter}")
+    return failures
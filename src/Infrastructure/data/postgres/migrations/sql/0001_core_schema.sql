@@ -0,0 +1,62 @@
+-- Tabelas de agentes e conversas
+CREATE EXTENSION IF NOT EXISTS pgcrypto;  -- gen_random_uuid() antes do PostgreSQL 13
+
+CREATE TABLE IF NOT EXISTS agent_configs (
+    id                    UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name                  VARCHAR(100) NOT NULL,
+    description           TEXT NOT NULL DEFAULT '',
+    personality           TEXT NOT NULL DEFAULT '',
+    flow_decision_prompt  TEXT NOT NULL DEFAULT '',
+    response_prompt       TEXT NOT NULL DEFAULT '',
+    available_tools       JSONB NOT NULL DEFAULT '[]'::jsonb,
+    is_active             BOOLEAN NOT NULL DEFAULT true,
+    created_at            TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    updated_at            TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+CREATE TABLE IF NOT EXISTS agent_phone_mappings (
+    id            UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    phone_number  VARCHAR(50) NOT NULL,
+    agent_id      UUID NOT NULL REFERENCES agent_configs (id),
+    is_active     BOOLEAN NOT NULL DEFAULT true,
+    created_at    TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+-- get_by_phone_number: JOIN por (phone_number, is_active) a cada turno
+CREATE INDEX IF NOT EXISTS ix_agent_phone_mappings_phone_active
+    ON agent_phone_mappings (phone_number)
+    INCLUDE (agent_id)
+    WHERE is_active;
+
+CREATE TABLE IF NOT EXISTS conversations (
+    id               UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    sender_id        VARCHAR(100) NOT NULL,
+    instance         VARCHAR(50) NOT NULL,
+    channel          VARCHAR(30) NOT NULL,
+    status           VARCHAR(20) NOT NULL DEFAULT 'active',
+    started_at       TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    ended_at         TIMESTAMP NULL,
+    last_message_at  TIMESTAMP NULL,
+    metadata         JSONB NULL
+);
+
+-- Uma única conversa ativa por (sender_id, instance, channel); base do upsert
+-- em ConversationRepository.upsert_active. Fecha duplicatas antigas (mantém a
+-- mais recente) antes de criar o índice.
+UPDATE conversations c
+SET status = 'closed',
+    ended_at = NOW() AT TIME ZONE 'utc'
+WHERE c.status = 'active'
+  AND EXISTS (
+      SELECT 1
+      FROM conversations o
+      WHERE o.status = 'active'
+        AND o.sender_id = c.sender_id
+        AND o.instance = c.instance
+        AND o.channel = c.channel
+        AND (o.started_at, o.id) > (c.started_at, c.id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_conversations_active
+    ON conversations (sender_id, instance, channel)
+    WHERE status = 'active';
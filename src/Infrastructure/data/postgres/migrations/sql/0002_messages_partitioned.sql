@@ -0,0 +1,68 @@
+-- messages particionada por mês (RANGE em created_at)
+
+-- Tabela comum de uma versão anterior: vira messages_legacy e é copiada
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class
+        WHERE relname = 'messages'
+          AND relkind = 'r'
+          AND relnamespace = 'public'::regnamespace
+    ) THEN
+        ALTER TABLE messages RENAME TO messages_legacy;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS messages (
+    id               UUID NOT NULL DEFAULT gen_random_uuid(),
+    conversation_id  UUID NOT NULL REFERENCES conversations (id),
+    role             VARCHAR(20) NOT NULL,
+    content          TEXT NOT NULL,
+    created_at       TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    metadata         JSONB NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Linhas fora dos meses criados (histórico antigo) caem aqui
+CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT;
+
+-- Histórico/keyset por conversa: WHERE conversation_id ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS ix_messages_conversation_created
+    ON messages (conversation_id, created_at, id);
+
+-- Cria as partições mensais do mês atual até `months_ahead` meses à frente
+CREATE OR REPLACE FUNCTION ensure_message_partitions(months_ahead INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', NOW() AT TIME ZONE 'utc')::date;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        partition_name := format('messages_y%sm%s',
+            to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + INTERVAL '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END $$;
+
+SELECT ensure_message_partitions(3);
+
+DO $$
+BEGIN
+    IF to_regclass('messages_legacy') IS NOT NULL THEN
+        INSERT INTO messages (id, conversation_id, role, content, created_at, metadata)
+        SELECT id, conversation_id, role, content, created_at, metadata
+        FROM messages_legacy;
+        DROP TABLE messages_legacy;
+    END IF;
+END $$;
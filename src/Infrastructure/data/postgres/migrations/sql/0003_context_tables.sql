@@ -0,0 +1,20 @@
+-- Backend de contexto "durabilidade primeiro" (CONTEXT_STORE_BACKEND=postgres)
+CREATE TABLE IF NOT EXISTS conversation_contexts (
+    context_key  TEXT PRIMARY KEY,
+    payload      JSONB NOT NULL,
+    version      INTEGER NOT NULL,
+    expires_at   TIMESTAMP NULL,
+    updated_at   TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS ix_conversation_contexts_expires_at
+    ON conversation_contexts (expires_at)
+    WHERE expires_at IS NOT NULL;
+
+-- Snapshots de contextos de conversa removidos do Redis por inatividade
+CREATE TABLE IF NOT EXISTS conversation_context_snapshots (
+    context_key  TEXT PRIMARY KEY,
+    payload      BYTEA NOT NULL,
+    version      INTEGER NOT NULL DEFAULT 0,
+    updated_at   TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
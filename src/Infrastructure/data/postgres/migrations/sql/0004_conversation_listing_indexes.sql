@@ -0,0 +1,7 @@
+-- Listagem/exportação de conversas: keyset em (started_at, id), mais novas primeiro
+CREATE INDEX IF NOT EXISTS ix_conversations_started
+    ON conversations (started_at DESC, id DESC);
+
+-- Mesmo keyset filtrado por instance (e status)
+CREATE INDEX IF NOT EXISTS ix_conversations_instance_status_started
+    ON conversations (instance, status, started_at DESC, id DESC);
@@ -0,0 +1,4 @@
+-- Ociosidade (minutos) após a qual o sweeper encerra conversas do agente;
+-- NULL usa CONVERSATION_IDLE_CLOSE_MINUTES
+ALTER TABLE agent_configs
+    ADD COLUMN IF NOT EXISTS idle_close_minutes INTEGER NULL;
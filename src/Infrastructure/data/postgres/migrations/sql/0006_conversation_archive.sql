@@ -0,0 +1,36 @@
+-- Conversas encerradas há mais de CONVERSATION_ARCHIVE_AFTER_DAYS saem das
+-- tabelas quentes; as mensagens ficam em um único BYTEA por conversa
+-- (ContextCodec: msgpack + zstd/zlib)
+CREATE TABLE IF NOT EXISTS conversations_archive (
+    id               UUID PRIMARY KEY,
+    sender_id        VARCHAR(100) NOT NULL,
+    instance         VARCHAR(50) NOT NULL,
+    channel          VARCHAR(30) NOT NULL,
+    started_at       TIMESTAMP NOT NULL,
+    ended_at         TIMESTAMP NULL,
+    last_message_at  TIMESTAMP NULL,
+    metadata         JSONB NULL,
+    message_count    INTEGER NOT NULL,
+    transcript       BYTEA NOT NULL,
+    archived_at      TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+-- O transcript já vem comprimido: não comprimir de novo no TOAST
+ALTER TABLE conversations_archive ALTER COLUMN transcript SET STORAGE EXTERNAL;
+
+CREATE INDEX IF NOT EXISTS ix_conversations_archive_sender
+    ON conversations_archive (sender_id, instance);
+
+-- Progresso do job de arquivamento (keyset em (ended_at, id))
+CREATE TABLE IF NOT EXISTS archive_checkpoints (
+    job             TEXT PRIMARY KEY,
+    last_ended_at   TIMESTAMP NOT NULL,
+    last_id         UUID NOT NULL,
+    archived_total  BIGINT NOT NULL DEFAULT 0,
+    updated_at      TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+-- Candidatos ao arquivamento em ordem de encerramento
+CREATE INDEX IF NOT EXISTS ix_conversations_closed_ended
+    ON conversations (ended_at, id)
+    WHERE status = 'closed';
@@ -0,0 +1,10 @@
+-- Busca textual em messages.content (placa, renavam, frases) para o suporte.
+-- Coluna gerada: calculada no INSERT (inclusive no COPY do write-behind),
+-- sem trigger nem reprocessamento. Adicioná-la reescreve as partições uma vez.
+ALTER TABLE messages
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese', content)) STORED;
+
+-- Criado no pai, propaga para todas as partições (atuais e futuras)
+CREATE INDEX IF NOT EXISTS ix_messages_content_tsv
+    ON messages USING GIN (content_tsv);
@@ -0,0 +1,45 @@
+-- Mudanças em agentes/mapeamentos avisam todos os workers (LISTEN agent_config_changed)
+-- para invalidarem o cache do AgentConfigService. O NOTIFY só é entregue no commit.
+CREATE OR REPLACE FUNCTION notify_agent_config_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    changed_agent_id UUID;
+    phone_numbers TEXT[];
+BEGIN
+    IF TG_TABLE_NAME = 'agent_configs' THEN
+        changed_agent_id := COALESCE(NEW.id, OLD.id);
+        SELECT COALESCE(array_agg(DISTINCT phone_number), '{}')
+        INTO phone_numbers
+        FROM agent_phone_mappings
+        WHERE agent_phone_mappings.agent_id = changed_agent_id;
+    ELSE
+        changed_agent_id := COALESCE(NEW.agent_id, OLD.agent_id);
+        phone_numbers := ARRAY(
+            SELECT DISTINCT p FROM unnest(ARRAY[OLD.phone_number, NEW.phone_number]) AS p
+            WHERE p IS NOT NULL
+        );
+    END IF;
+
+    PERFORM pg_notify(
+        'agent_config_changed',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'agent_id', changed_agent_id,
+            'phone_numbers', phone_numbers
+        )::text
+    );
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS tr_agent_configs_notify ON agent_configs;
+CREATE TRIGGER tr_agent_configs_notify
+    AFTER INSERT OR UPDATE OR DELETE ON agent_configs
+    FOR EACH ROW EXECUTE FUNCTION notify_agent_config_change();
+
+DROP TRIGGER IF EXISTS tr_agent_phone_mappings_notify ON agent_phone_mappings;
+CREATE TRIGGER tr_agent_phone_mappings_notify
+    AFTER INSERT OR UPDATE OR DELETE ON agent_phone_mappings
+    FOR EACH ROW EXECUTE FUNCTION notify_agent_config_change();
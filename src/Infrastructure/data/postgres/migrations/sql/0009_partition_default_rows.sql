@@ -0,0 +1,74 @@
+-- ensure_message_partitions passa a tratar linhas em messages_default.
+--
+-- Uma mensagem com created_at em um mês ainda sem partição (relógio adiantado,
+-- backfill) cai em messages_default; depois disso o CREATE TABLE ... PARTITION OF
+-- daquele mês falha ("updated partition constraint for default partition would
+-- be violated"). Nesse caso a partição é criada solta, recebe as linhas do
+-- default e só então é anexada. Retorna também quantas linhas foram movidas,
+-- para o MigrationRunner alertar.
+DROP FUNCTION IF EXISTS ensure_message_partitions(INTEGER);
+
+CREATE FUNCTION ensure_message_partitions(months_ahead INTEGER)
+RETURNS TABLE (partitions_created INTEGER, rows_moved BIGINT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', NOW() AT TIME ZONE 'utc')::date;
+    month_end DATE;
+    partition_name TEXT;
+    pending BIGINT;
+    column_list TEXT;
+BEGIN
+    partitions_created := 0;
+    rows_moved := 0;
+
+    -- content_tsv e outras colunas geradas são recalculadas no INSERT
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+    INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'messages'::regclass
+      AND attnum > 0
+      AND NOT attisdropped
+      AND attgenerated = '';
+
+    FOR i IN 0..months_ahead LOOP
+        month_end := (month_start + INTERVAL '1 month')::date;
+        partition_name := format('messages_y%sm%s',
+            to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+
+        IF to_regclass(partition_name) IS NULL THEN
+            SELECT count(*) INTO pending
+            FROM messages_default
+            WHERE created_at >= month_start AND created_at < month_end;
+
+            IF pending = 0 THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE messages INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)',
+                    partition_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (
+                        DELETE FROM messages_default
+                        WHERE created_at >= %L AND created_at < %L
+                        RETURNING %s
+                    )
+                    INSERT INTO %I (%s) SELECT %s FROM moved',
+                    month_start, month_end, column_list, partition_name, column_list, column_list
+                );
+                EXECUTE format(
+                    'ALTER TABLE messages ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+                rows_moved := rows_moved + pending;
+            END IF;
+            partitions_created := partitions_created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN NEXT;
+END $$;
@@ -0,0 +1,3 @@
+-- Token da última escrita do contexto (compare_and_set com write_token):
+-- repetir a mesma escrita depois de um timeout não conflita nem mescla o turno de novo
+ALTER TABLE conversation_contexts ADD COLUMN IF NOT EXISTS write_token TEXT NULL;
@@ -1,8 +1,10 @@
 import json
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from uuid import UUID
 
+import asyncpg
+
 from src.Domain import (
     IAgentConfigRepository,
     AgentConfigEntity
@@ -11,224 +13,201 @@ from src.Infrastructure import PostgresContext
 
 
 class AgentConfigRepository(IAgentConfigRepository):
-    """Repositório PostgreSQL para configurações de agentes"""
+    """
+    Repositório PostgreSQL para configurações de agentes.
+
+    As leituras que preenchem o cache do AgentConfigService (por número,
+    agente padrão, warm-up) vão ao primário: logo após um NOTIFY, uma réplica
+    atrasada devolveria a configuração antiga para o L1/L2 pelo TTL inteiro.
+    """
+
+    # Lidas no caminho quente; migrations/planCheck.py roda EXPLAIN sobre estas mesmas
+    GET_BY_ID_SQL = """
+        SELECT
+            id, name, description, personality,
+            flow_decision_prompt, response_prompt,
+            available_tools, is_active, idle_close_minutes, created_at, updated_at
+        FROM agent_configs
+        WHERE id = $1
+    """
+
+    GET_BY_PHONE_NUMBER_SQL = """
+        SELECT
+            ac.id, ac.name, ac.description, ac.personality,
+            ac.flow_decision_prompt, ac.response_prompt,
+            ac.available_tools, ac.is_active, ac.idle_close_minutes, ac.created_at, ac.updated_at
+        FROM agent_configs ac
+        INNER JOIN agent_phone_mappings apm ON ac.id = apm.agent_id
+        WHERE apm.phone_number = $1
+          AND apm.is_active = true
+          AND ac.is_active = true
+        LIMIT 1
+    """
+
+    # Warm-up e sweeper (leem todos os agentes ativos)
+    LIST_ACTIVE_WITH_PHONES_SQL = """
+        SELECT
+            ac.id, ac.name, ac.description, ac.personality,
+            ac.flow_decision_prompt, ac.response_prompt,
+            ac.available_tools, ac.is_active, ac.idle_close_minutes, ac.created_at, ac.updated_at,
+            COALESCE(
+                array_agg(apm.phone_number) FILTER (WHERE apm.phone_number IS NOT NULL),
+                '{}'
+            ) AS phone_numbers
+        FROM agent_configs ac
+        LEFT JOIN agent_phone_mappings apm ON apm.agent_id = ac.id AND apm.is_active = true
+        WHERE ac.is_active = true
+        GROUP BY ac.id
+        ORDER BY ac.created_at ASC
+    """
+
+    IDLE_THRESHOLDS_SQL = """
+        SELECT apm.phone_number, ac.idle_close_minutes
+        FROM agent_phone_mappings apm
+        INNER JOIN agent_configs ac ON ac.id = apm.agent_id
+        WHERE apm.is_active = true
+          AND ac.is_active = true
+    """
 
     def __init__(self):
         self.db = PostgresContext()
 
     async def get_by_id(self, agent_id: UUID) -> Optional[AgentConfigEntity]:
         """Busca agente por ID"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    id, name, description, personality,
-                    flow_decision_prompt, response_prompt,
-                    available_tools, is_active, created_at, updated_at
-                FROM agent_configs
-                WHERE id = %s
-            """, (str(agent_id),))
+        row = await self.db.fetchrow(self.GET_BY_ID_SQL, agent_id)
 
-            row = cursor.fetchone()
-            if not row:
-                return None
-
-            return AgentConfigEntity(
-                id=UUID(row[0]),
-                name=row[1],
-                description=row[2],
-                personality=row[3],
-                flow_decision_prompt=row[4],
-                response_prompt=row[5],
-                available_tools=row[6] if isinstance(row[6], list) else json.loads(row[6]),
-                is_active=row[7],
-                created_at=row[8],
-                updated_at=row[9]
-            )
-        finally:
-            self.db.disconnect(connection)
+        return self._to_entity(row) if row else None
 
     async def get_by_phone_number(self, phone_number: str) -> Optional[AgentConfigEntity]:
         """Busca agente mapeado para um número de telefone"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    ac.id, ac.name, ac.description, ac.personality,
-                    ac.flow_decision_prompt, ac.response_prompt,
-                    ac.available_tools, ac.is_active, ac.created_at, ac.updated_at
-                FROM agent_configs ac
-                INNER JOIN agent_phone_mappings apm ON ac.id = apm.agent_id
-                WHERE apm.phone_number = %s
-                  AND apm.is_active = true
-                  AND ac.is_active = true
-                LIMIT 1
-            """, (phone_number,))
+        row = await self.db.fetchrow(self.GET_BY_PHONE_NUMBER_SQL, phone_number)
 
-            row = cursor.fetchone()
-            if not row:
-                return None
-
-            return AgentConfigEntity(
-                id=UUID(row[0]),
-                name=row[1],
-                description=row[2],
-                personality=row[3],
-                flow_decision_prompt=row[4],
-                response_prompt=row[5],
-                available_tools=row[6] if isinstance(row[6], list) else json.loads(row[6]),
-                is_active=row[7],
-                created_at=row[8],
-                updated_at=row[9]
-            )
-        finally:
-            self.db.disconnect(connection)
+        return self._to_entity(row) if row else None
 
     async def list_active(self) -> List[AgentConfigEntity]:
         """Lista todos os agentes ativos"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    id, name, description, personality,
-                    flow_decision_prompt, response_prompt,
-                    available_tools, is_active, created_at, updated_at
-                FROM agent_configs
-                WHERE is_active = true
-                ORDER BY created_at DESC
-            """)
+        rows = await self.db.fetch("""
+            SELECT
+                id, name, description, personality,
+                flow_decision_prompt, response_prompt,
+                available_tools, is_active, idle_close_minutes, created_at, updated_at
+            FROM agent_configs
+            WHERE is_active = true
+            ORDER BY created_at DESC
+        """, readonly=True)
 
-            rows = cursor.fetchall()
-            return [
-                AgentConfigEntity(
-                    id=UUID(row[0]),
-                    name=row[1],
-                    description=row[2],
-                    personality=row[3],
-                    flow_decision_prompt=row[4],
-                    response_prompt=row[5],
-                    available_tools=row[6] if isinstance(row[6], list) else json.loads(row[6]),
-                    is_active=row[7],
-                    created_at=row[8],
-                    updated_at=row[9]
-                )
-                for row in rows
-            ]
-        finally:
-            self.db.disconnect(connection)
+        return [self._to_entity(row) for row in rows]
+
+    async def list_active_with_phones(self) -> List[Tuple[AgentConfigEntity, List[str]]]:
+        """Agentes ativos e seus números ativos (uma consulta, para o warm-up)"""
+        rows = await self.db.fetch(self.LIST_ACTIVE_WITH_PHONES_SQL)
+
+        return [(self._to_entity(row), list(row["phone_numbers"])) for row in rows]
 
     async def create(self, agent_config: AgentConfigEntity) -> AgentConfigEntity:
         """Cria novo agente"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                INSERT INTO agent_configs (
-                    name, description, personality,
-                    flow_decision_prompt, response_prompt,
-                    available_tools, is_active
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id, created_at, updated_at
-            """, (
-                agent_config.name,
-                agent_config.description,
-                agent_config.personality,
-                agent_config.flow_decision_prompt,
-                agent_config.response_prompt,
-                json.dumps(agent_config.available_tools),
-                agent_config.is_active
-            ))
-
-            connection.commit()
-            row = cursor.fetchone()
-            agent_config.id = UUID(row[0])
-            agent_config.created_at = row[1]
-            agent_config.updated_at = row[2]
-            return agent_config
-        finally:
-            self.db.disconnect(connection)
+        row = await self.db.fetchrow("""
+            INSERT INTO agent_configs (
+                name, description, personality,
+                flow_decision_prompt, response_prompt,
+                available_tools, is_active, idle_close_minutes
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            RETURNING id, created_at, updated_at
+        """,
+            agent_config.name,
+            agent_config.description,
+            agent_config.personality,
+            agent_config.flow_decision_prompt,
+            agent_config.response_prompt,
+            agent_config.available_tools,
+            agent_config.is_active,
+            agent_config.idle_close_minutes
+        )
+
+        agent_config.id = row["id"]
+        agent_config.created_at = row["created_at"]
+        agent_config.updated_at = row["updated_at"]
+        return agent_config
 
     async def update(self, agent_config: AgentConfigEntity) -> AgentConfigEntity:
         """Atualiza agente existente"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                UPDATE agent_configs
-                SET name = %s,
-                    description = %s,
-                    personality = %s,
-                    flow_decision_prompt = %s,
-                    response_prompt = %s,
-                    available_tools = %s,
-                    is_active = %s,
-                    updated_at = %s
-                WHERE id = %s
-                RETURNING updated_at
-            """, (
-                agent_config.name,
-                agent_config.description,
-                agent_config.personality,
-                agent_config.flow_decision_prompt,
-                agent_config.response_prompt,
-                json.dumps(agent_config.available_tools),
-                agent_config.is_active,
-                datetime.now(),
-                str(agent_config.id)
-            ))
-
-            connection.commit()
-            row = cursor.fetchone()
-            if row:
-                agent_config.updated_at = row[0]
-            return agent_config
-        finally:
-            self.db.disconnect(connection)
+        updated_at = await self.db.fetchval("""
+            UPDATE agent_configs
+            SET name = $1,
+                description = $2,
+                personality = $3,
+                flow_decision_prompt = $4,
+                response_prompt = $5,
+                available_tools = $6,
+                is_active = $7,
+                idle_close_minutes = $8,
+                updated_at = $9
+            WHERE id = $10
+            RETURNING updated_at
+        """,
+            agent_config.name,
+            agent_config.description,
+            agent_config.personality,
+            agent_config.flow_decision_prompt,
+            agent_config.response_prompt,
+            agent_config.available_tools,
+            agent_config.is_active,
+            agent_config.idle_close_minutes,
+            datetime.now(),
+            agent_config.id
+        )
+
+        if updated_at:
+            agent_config.updated_at = updated_at
+        return agent_config
 
     async def get_default_agent(self) -> Optional[AgentConfigEntity]:
         """Retorna o agente padrão (primeiro ativo ou com nome 'default')"""
-        cursor, connection = self.db.connect()
-        try:
+        async with self.db.acquire() as connection:
             # Tenta buscar um agente com nome 'default' ou 'padrão'
-            cursor.execute("""
-                SELECT 
+            row = await connection.fetchrow("""
+                SELECT
                     id, name, description, personality,
                     flow_decision_prompt, response_prompt,
-                    available_tools, is_active, created_at, updated_at
+                    available_tools, is_active, idle_close_minutes, created_at, updated_at
                 FROM agent_configs
                 WHERE is_active = true
                   AND (LOWER(name) = 'default' OR LOWER(name) = 'padrão' OR LOWER(name) = 'assistente geral')
                 LIMIT 1
             """)
 
-            row = cursor.fetchone()
-            
             # Se não encontrar, pega o primeiro agente ativo
             if not row:
-                cursor.execute("""
-                    SELECT 
+                row = await connection.fetchrow("""
+                    SELECT
                         id, name, description, personality,
                         flow_decision_prompt, response_prompt,
-                        available_tools, is_active, created_at, updated_at
+                        available_tools, is_active, idle_close_minutes, created_at, updated_at
                     FROM agent_configs
                     WHERE is_active = true
                     ORDER BY created_at ASC
                     LIMIT 1
                 """)
-                row = cursor.fetchone()
 
-            if not row:
-                return None
-
-            return AgentConfigEntity(
-                id=UUID(row[0]),
-                name=row[1],
-                description=row[2],
-                personality=row[3],
-                flow_decision_prompt=row[4],
-                response_prompt=row[5],
-                available_tools=row[6] if isinstance(row[6], list) else json.loads(row[6]),
-                is_active=row[7],
-                created_at=row[8],
-                updated_at=row[9]
-            )
-        finally:
-            self.db.disconnect(connection)
+        return self._to_entity(row) if row else None
+
+    async def get_idle_thresholds(self) -> Dict[str, Optional[int]]:
+        """instance (número) → minutos de ociosidade para encerrar a conversa"""
+        rows = await self.db.fetch(self.IDLE_THRESHOLDS_SQL, readonly=True)
+        return {row["phone_number"]: row["idle_close_minutes"] for row in rows}
+
+    def _to_entity(self, row: asyncpg.Record) -> AgentConfigEntity:
+        available_tools = row["available_tools"]
+        return AgentConfigEntity(
+            id=row["id"],
+            name=row["name"],
+            description=row["description"],
+            personality=row["personality"],
+            flow_decision_prompt=row["flow_decision_prompt"],
+            response_prompt=row["response_prompt"],
+            available_tools=available_tools if isinstance(available_tools, list) else json.loads(available_tools),
+            is_active=row["is_active"],
+            idle_close_minutes=row["idle_close_minutes"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
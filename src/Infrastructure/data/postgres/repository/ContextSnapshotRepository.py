@@ -0,0 +1,47 @@
+# src/Infrastructure/data/postgres/repository/ContextSnapshotRepository.py
+from datetime import datetime
+from typing import Optional, Tuple
+
+from src.Domain import IContextSnapshotRepository
+from src.Infrastructure import PostgresContext
+
+
+class ContextSnapshotRepository(IContextSnapshotRepository):
+    """Snapshots de contexto em conversation_context_snapshots (bytea, formato ContextCodec)"""
+
+    # migrations/planCheck.py roda EXPLAIN sobre esta mesma
+    GET_SQL = """
+        SELECT payload, version
+        FROM conversation_context_snapshots
+        WHERE context_key = $1
+    """
+
+    def __init__(self):
+        self.db = PostgresContext()
+
+    async def save(self, context_key: str, payload: bytes, version: int) -> None:
+        await self.db.execute("""
+            INSERT INTO conversation_context_snapshots (
+                context_key,
+                payload,
+                version,
+                updated_at
+            ) VALUES ($1, $2, $3, $4)
+            ON CONFLICT (context_key) DO UPDATE
+            SET payload = EXCLUDED.payload,
+                version = EXCLUDED.version,
+                updated_at = EXCLUDED.updated_at
+        """, context_key, payload, version, datetime.utcnow())
+
+    async def get(self, context_key: str) -> Optional[Tuple[bytes, int]]:
+        row = await self.db.fetchrow(self.GET_SQL, context_key)
+
+        if not row:
+            return None
+        return row["payload"], row["version"]
+
+    async def delete(self, context_key: str) -> None:
+        await self.db.execute("""
+            DELETE FROM conversation_context_snapshots
+            WHERE context_key = $1
+        """, context_key)
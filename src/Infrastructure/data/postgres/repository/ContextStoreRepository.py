@@ -0,0 +1,132 @@
+# src/Infrastructure/data/postgres/repository/ContextStoreRepository.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from src.Domain import IContextStore
+from src.Infrastructure import PostgresContext, Metrics
+
+logger = logging.getLogger(__name__)
+
+class PostgresContextStore(IContextStore):
+    """
+    Backend "durabilidade primeiro": contexto em conversation_contexts (JSONB).
+    O compare-and-set é um único UPDATE/INSERT condicionado à versão.
+
+    Linhas expiradas já são ignoradas na leitura; `run_purge` as apaga em
+    lotes pelo índice ix_conversation_contexts_expires_at.
+    """
+
+    # migrations/planCheck.py roda EXPLAIN sobre estas mesmas
+    LOAD_SQL = """
+        SELECT payload, version
+        FROM conversation_contexts
+        WHERE context_key = $1
+          AND (expires_at IS NULL OR expires_at > $2)
+    """
+
+    PURGE_EXPIRED_SQL = """
+        DELETE FROM conversation_contexts
+        WHERE context_key IN (
+            SELECT context_key
+            FROM conversation_contexts
+            WHERE expires_at < $1
+            ORDER BY expires_at
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+    """
+
+    def __init__(self):
+        self.db = PostgresContext()
+
+    async def load(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        row = await self.db.fetchrow(self.LOAD_SQL, key, datetime.utcnow())
+
+        if not row:
+            return None, 0
+        return row["payload"], row["version"]
+
+    async def compare_and_set(
+        self,
+        key: str,
+        data: Dict[str, Any],
+        expected_version: int,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> Tuple[bool, int]:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+
+        async with self.db.acquire() as connection:
+            if expected_version == 0:
+                # Cria, ou reaproveita uma linha expirada (equivale a "não existe")
+                version = await connection.fetchval("""
+                    INSERT INTO conversation_contexts (
+                        context_key, payload, version, expires_at, updated_at, write_token
+                    ) VALUES ($1, $2, 1, $3, $4, $5)
+                    ON CONFLICT (context_key) DO UPDATE
+                    SET payload = EXCLUDED.payload,
+                        version = 1,
+                        expires_at = EXCLUDED.expires_at,
+                        updated_at = EXCLUDED.updated_at,
+                        write_token = EXCLUDED.write_token
+                    WHERE conversation_contexts.expires_at IS NOT NULL
+                      AND conversation_contexts.expires_at <= EXCLUDED.updated_at
+                    RETURNING version
+                """, key, data, expires_at, now, write_token)
+            else:
+                version = await connection.fetchval("""
+                    UPDATE conversation_contexts
+                    SET payload = $1,
+                        version = version + 1,
+                        expires_at = $2,
+                        updated_at = $3,
+                        write_token = $6
+                    WHERE context_key = $4
+                      AND version = $5
+                      AND (expires_at IS NULL OR expires_at > $3)
+                    RETURNING version
+                """, data, expires_at, now, key, expected_version, write_token)
+
+            if version:
+                return True, version
+
+            current = await connection.fetchrow("""
+                SELECT version, write_token
+                FROM conversation_contexts
+                WHERE context_key = $1
+                  AND (expires_at IS NULL OR expires_at > $2)
+            """, key, now)
+            if not current:
+                return False, 0
+            # Mesmo token: a escrita já foi feita (retry após timeout)
+            return bool(write_token and current["write_token"] == write_token), current["version"]
+
+    async def delete(self, key: str) -> None:
+        await self.db.execute("DELETE FROM conversation_contexts WHERE context_key = $1", key)
+
+    async def purge_expired(self, batch_size: int = 1000) -> int:
+        """Apaga até `batch_size` contextos expirados; SKIP LOCKED deixa os workers em paralelo"""
+        result = await self.db.execute(self.PURGE_EXPIRED_SQL, datetime.utcnow(), batch_size)
+        return int(result.split()[-1])
+
+    async def run_purge(self, interval_seconds: int, batch_size: int):
+        """Loop de limpeza: a cada intervalo, apaga lotes até não sobrar expirado"""
+        while True:
+            try:
+                purged = 0
+                while True:
+                    deleted = await self.purge_expired(batch_size)
+                    purged += deleted
+                    if deleted < batch_size:
+                        break
+                if purged:
+                    Metrics.incr("context.store.purged", purged)
+                    logger.info(f"[PostgresContextStore] 🧹 {purged} contextos expirados removidos")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[PostgresContextStore] ❌ Erro ao remover contextos expirados: {e}")
+            await asyncio.sleep(interval_seconds)
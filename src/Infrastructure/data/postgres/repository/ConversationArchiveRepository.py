@@ -0,0 +1,162 @@
+# src/Infrastructure/data/postgres/repository/ConversationArchiveRepository.py
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Optional
+
+import asyncpg
+
+from src.Domain import (
+    IConversationArchiveRepository,
+    ConversationEntity,
+    MessageEntity
+)
+from src.Infrastructure import PostgresContext, ContextCodec
+
+
+class ConversationArchiveRepository(IConversationArchiveRepository):
+    """
+    Conversas encerradas antigas em conversations_archive.
+
+    Cada lote roda em uma transação: copia as conversas (mensagens em um
+    transcript comprimido) e apaga das tabelas quentes. Se o job cair no
+    meio, nada fica pela metade.
+
+    O progresso é o próprio DELETE: cada lote pega as conversas encerradas
+    antes do corte que ainda estão em `conversations`, sem keyset. Assim
+    uma conversa encerrada tarde com ended_at retroativo (ou commitada
+    depois de um lote) entra no próximo. archive_checkpoints guarda só
+    estatísticas (último arquivado, total).
+    """
+
+    JOB = "conversations"
+    LOCK_ID = 4_815_162_343  # um job por vez (MigrationRunner usa ...342)
+
+    # Ordem posicional das mensagens no transcript
+    _MESSAGE_FIELDS = ("id", "role", "content", "created_at", "metadata")
+
+    # migrations/planCheck.py roda EXPLAIN sobre estas mesmas
+    SELECT_BATCH_SQL = """
+        SELECT id, sender_id, instance, channel, started_at, ended_at, last_message_at, metadata
+        FROM conversations
+        WHERE status = 'closed'
+          AND ended_at < $1
+        ORDER BY ended_at, id
+        LIMIT $2
+        FOR UPDATE
+    """
+
+    GET_TRANSCRIPT_SQL = """
+        SELECT transcript
+        FROM conversations_archive
+        WHERE id = $1
+    """
+
+    SELECT_MESSAGES_SQL = """
+        SELECT conversation_id, id, role, content, created_at, metadata
+        FROM messages
+        WHERE conversation_id = ANY($1::uuid[])
+        ORDER BY conversation_id, created_at, id
+    """
+
+    DELETE_MESSAGES_SQL = "DELETE FROM messages WHERE conversation_id = ANY($1::uuid[])"
+    DELETE_CONVERSATIONS_SQL = "DELETE FROM conversations WHERE id = ANY($1::uuid[])"
+
+    def __init__(self):
+        self.db = PostgresContext()
+        self.codec = ContextCodec(compression_threshold=0)
+
+    async def archive_batch(self, closed_before: datetime, batch_size: int) -> int:
+        async with self.db.acquire() as connection:
+            async with connection.transaction():
+                if not await connection.fetchval("SELECT pg_try_advisory_xact_lock($1)", self.LOCK_ID):
+                    return 0
+
+                conversations = await connection.fetch(self.SELECT_BATCH_SQL, closed_before, batch_size)
+                if not conversations:
+                    return 0
+
+                ids = [row["id"] for row in conversations]
+                transcripts = defaultdict(list)
+                for row in await connection.fetch(self.SELECT_MESSAGES_SQL, ids):
+                    transcripts[row["conversation_id"]].append([
+                        str(row["id"]),
+                        row["role"],
+                        row["content"],
+                        row["created_at"].isoformat(),
+                        row["metadata"]
+                    ])
+
+                await connection.executemany("""
+                    INSERT INTO conversations_archive (
+                        id, sender_id, instance, channel, started_at, ended_at,
+                        last_message_at, metadata, message_count, transcript
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    ON CONFLICT (id) DO NOTHING
+                """, [
+                    (
+                        row["id"], row["sender_id"], row["instance"], row["channel"],
+                        row["started_at"], row["ended_at"], row["last_message_at"], row["metadata"],
+                        len(transcripts[row["id"]]),
+                        self.codec.encode(transcripts[row["id"]])
+                    )
+                    for row in conversations
+                ])
+
+                await connection.execute(self.DELETE_MESSAGES_SQL, ids)
+                await connection.execute(self.DELETE_CONVERSATIONS_SQL, ids)
+
+                last = conversations[-1]
+                await connection.execute("""
+                    INSERT INTO archive_checkpoints (job, last_ended_at, last_id, archived_total, updated_at)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (job) DO UPDATE
+                    SET last_ended_at = EXCLUDED.last_ended_at,
+                        last_id = EXCLUDED.last_id,
+                        archived_total = archive_checkpoints.archived_total + EXCLUDED.archived_total,
+                        updated_at = EXCLUDED.updated_at
+                """, self.JOB, last["ended_at"], last["id"], len(conversations), datetime.utcnow())
+
+        return len(conversations)
+
+    async def get_progress(self) -> Optional[dict]:
+        row = await self.db.fetchrow("""
+            SELECT last_ended_at, last_id, archived_total, updated_at
+            FROM archive_checkpoints
+            WHERE job = $1
+        """, self.JOB)
+        return dict(row) if row else None
+
+    async def get_conversation(self, conversation_id: uuid.UUID) -> Optional[ConversationEntity]:
+        row = await self.db.fetchrow("""
+            SELECT id, sender_id, instance, channel, started_at, ended_at, last_message_at, metadata
+            FROM conversations_archive
+            WHERE id = $1
+        """, conversation_id, readonly=True)
+
+        return self._to_entity(row) if row else None
+
+    async def get_transcript(self, conversation_id: uuid.UUID) -> Optional[List[MessageEntity]]:
+        transcript = await self.db.fetchval(self.GET_TRANSCRIPT_SQL, conversation_id, readonly=True)
+
+        if transcript is None:
+            return None
+        return [
+            MessageEntity(
+                conversation_id=conversation_id,
+                **dict(zip(self._MESSAGE_FIELDS, values))
+            )
+            for values in self.codec.decode(transcript)
+        ]
+
+    def _to_entity(self, row: asyncpg.Record) -> ConversationEntity:
+        return ConversationEntity(
+            id=row["id"],
+            sender_id=row["sender_id"],
+            instance=row["instance"],
+            channel=row["channel"],
+            started_at=row["started_at"],
+            ended_at=row["ended_at"],
+            last_message_at=row["last_message_at"],
+            metadata=row["metadata"]
+        )
@@ -1,52 +1,210 @@
 # src/Infrastructure/Persistence/ConversationPostgresRepository.py
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
+
+import asyncpg
 
 from src.Domain import (
     IConversationRepository,
     ConversationEntity
 )
 from src.Infrastructure import PostgresContext
+from src.Infrastructure.data.postgres.repository.ConversationArchiveRepository import ConversationArchiveRepository
 
 
 class ConversationRepository(IConversationRepository):
 
+    # Queries quentes; migrations/planCheck.py roda EXPLAIN sobre estas mesmas
+    GET_ACTIVE_SQL = """
+        SELECT
+            id,
+            sender_id,
+            instance,
+            channel,
+            started_at,
+            ended_at,
+            last_message_at,
+            metadata
+        FROM conversations
+        WHERE sender_id = $1
+          AND instance = $2
+          AND channel = $3
+          AND status = 'active'
+        LIMIT 1
+    """
+
+    UPSERT_ACTIVE_SQL = """
+        WITH previous AS (
+            SELECT last_message_at
+            FROM conversations
+            WHERE sender_id = $1
+              AND instance = $2
+              AND channel = $3
+              AND status = 'active'
+        )
+        INSERT INTO conversations (
+            sender_id,
+            instance,
+            channel,
+            started_at,
+            last_message_at,
+            status
+        ) VALUES ($1, $2, $3, $4, $4, 'active')
+        ON CONFLICT (sender_id, instance, channel) WHERE status = 'active'
+        DO UPDATE SET last_message_at = EXCLUDED.last_message_at
+        RETURNING
+            id,
+            sender_id,
+            instance,
+            channel,
+            started_at,
+            ended_at,
+            (SELECT last_message_at FROM previous) AS last_message_at,
+            metadata,
+            (xmax = 0) AS created
+    """
+
+    # Encerramento em lote do ConversationSweeperService
+    CLOSE_IDLE_SQL = """
+        UPDATE conversations
+        SET status = 'closed',
+            ended_at = $1
+        WHERE id = ANY($2::uuid[])
+          AND status = 'active'
+          AND last_message_at < $3
+        RETURNING id, sender_id, instance, channel, started_at, ended_at, last_message_at, metadata
+    """
+
     def __init__(self):
         self.db = PostgresContext()
+        self.archive = ConversationArchiveRepository()
+
+    async def get_by_id(self, conversation_id: uuid.UUID) -> Optional[ConversationEntity]:
+        """Busca a conversa nas tabelas quentes e, se não estiver, no arquivo"""
+        row = await self.db.fetchrow("""
+            SELECT id, sender_id, instance, channel, started_at, ended_at, last_message_at, metadata
+            FROM conversations
+            WHERE id = $1
+        """, conversation_id, readonly=True)
+
+        if row:
+            return self._to_entity(row)
+        return await self.archive.get_conversation(conversation_id)
+
+    async def get_conversations(
+        self,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        before: Optional[Tuple[datetime, uuid.UUID]] = None,
+        limit: int = 100
+    ) -> List[ConversationEntity]:
+        """
+        Página de conversas (mais novas primeiro) por keyset em (started_at, id).
+        `before` é o (started_at, id) da última conversa da página anterior.
+        """
+        sql, args = self.page_query(instance, status, started_from, started_to, before, limit)
+        rows = await self.db.fetch(sql, *args, readonly=True)
+        return [self._to_entity(row) for row in rows]
+
+    async def iter_conversations(
+        self,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[ConversationEntity]:
+        """
+        Todas as conversas do filtro via cursor no servidor, buscando
+        `chunk_size` linhas por vez: memória constante para exportações.
+        """
+        sql, args = self.iter_query(instance, status, started_from, started_to)
+        async with self.db.acquire(readonly=True) as connection:
+            async with connection.transaction(readonly=True):
+                cursor = connection.cursor(sql, *args, prefetch=chunk_size)
+                async for row in cursor:
+                    yield self._to_entity(row)
+
+    @classmethod
+    def iter_query(
+        cls,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None
+    ) -> Tuple[str, list]:
+        """SQL e argumentos de iter_conversations (também usados pelo planCheck)"""
+        where, args = cls._filters(instance, status, started_from, started_to)
+
+        return f"""
+            SELECT
+                id,
+                sender_id,
+                instance,
+                channel,
+                started_at,
+                ended_at,
+                last_message_at,
+                metadata
+            FROM conversations
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY started_at DESC, id DESC
+        """, args
+
+    @classmethod
+    def page_query(
+        cls,
+        instance: Optional[str] = None,
+        status: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        before: Optional[Tuple[datetime, uuid.UUID]] = None,
+        limit: int = 100
+    ) -> Tuple[str, list]:
+        """SQL e argumentos de get_conversations (também usados pelo planCheck)"""
+        where, args = cls._filters(instance, status, started_from, started_to)
+        if before:
+            args += [before[0], before[1]]
+            where.append(f"(started_at, id) < (${len(args) - 1}, ${len(args)})")
+        args.append(limit)
 
-    async def get_conversations(self) -> List[ConversationEntity]:
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    id,
-                    sender_id,
-                    instance,
-                    channel,
-                    started_at,
-                    ended_at,
-                    last_message_at,
-                    metadata
-                FROM conversations
-            """)
-            rows = cursor.fetchall()
-
-            return [
-                ConversationEntity(
-                    id=row[0],
-                    sender_id=row[1],
-                    instance=row[2],
-                    channel=row[3],
-                    started_at=row[4],
-                    ended_at=row[5],
-                    last_message_at=row[6],
-                    metadata=row[7]
-                )
-                for row in rows
-            ]
-        finally:
-            self.db.disconnect(connection)
+        return f"""
+            SELECT
+                id,
+                sender_id,
+                instance,
+                channel,
+                started_at,
+                ended_at,
+                last_message_at,
+                metadata
+            FROM conversations
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY started_at DESC, id DESC
+            LIMIT ${len(args)}
+        """, args
+
+    @staticmethod
+    def _filters(
+        instance: Optional[str],
+        status: Optional[str],
+        started_from: Optional[datetime],
+        started_to: Optional[datetime]
+    ) -> Tuple[List[str], list]:
+        where, args = [], []
+        for condition, value in (
+            ("instance = ${}", instance),
+            ("status = ${}", status),
+            ("started_at >= ${}", started_from),
+            ("started_at < ${}", started_to),
+        ):
+            if value is not None:
+                args.append(value)
+                where.append(condition.format(len(args)))
+        return where, args
 
     async def get_active_conversation(
         self,
@@ -55,93 +213,83 @@ class ConversationRepository(IConversationRepository):
         channel: str
     ) -> Optional[ConversationEntity]:
 
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    id,
-                    sender_id,
-                    instance,
-                    channel,
-                    started_at,
-                    ended_at,
-                    last_message_at,
-                    metadata
-                FROM conversations
-                WHERE sender_id = %s
-                  AND instance = %s
-                  AND channel = %s
-                  AND status = 'active'
-                LIMIT 1
-            """, (sender_id, instance, channel))
-
-            row = cursor.fetchone()
-            if not row:
-                return None
-
-            return ConversationEntity(
-                id=row[0],
-                sender_id=row[1],
-                instance=row[2],
-                channel=row[3],
-                started_at=row[4],
-                ended_at=row[5],
-                last_message_at=row[6],
-                metadata=row[7]
-            )
-        finally:
-            self.db.disconnect(connection)
+        row = await self.db.fetchrow(self.GET_ACTIVE_SQL, sender_id, instance, channel)
+
+        return self._to_entity(row) if row else None
 
     async def create(self, conversation: ConversationEntity) -> ConversationEntity:
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                INSERT INTO conversations (
-                    sender_id,
-                    instance,
-                    channel,
-                    started_at,
-                    status,
-                    metadata
-                ) VALUES ( %s, %s, %s, %s, 'active', %s)
-                RETURNING id
-            """, (
-                conversation.sender_id,
-                conversation.instance,
-                conversation.channel,
-                conversation.started_at or datetime.utcnow(),
-                conversation.metadata
-            ))
-
-            connection.commit()
-            conversation.id = cursor.fetchone()[0]
-            return conversation
-        finally:
-            self.db.disconnect(connection)
+        conversation.id = await self.db.fetchval("""
+            INSERT INTO conversations (
+                sender_id,
+                instance,
+                channel,
+                started_at,
+                status,
+                metadata
+            ) VALUES ($1, $2, $3, $4, 'active', $5)
+            RETURNING id
+        """,
+            conversation.sender_id,
+            conversation.instance,
+            conversation.channel,
+            conversation.started_at or datetime.utcnow(),
+            conversation.metadata
+        )
+        return conversation
+
+    async def upsert_active(
+        self,
+        sender_id: str,
+        instance: str,
+        channel: str
+    ) -> Tuple[ConversationEntity, bool]:
+        """
+        Busca, cria ou atualiza a conversa ativa em um único round trip
+        (índice único parcial ux_conversations_active).
+
+        Retorna (conversa, criada). `last_message_at` da entidade é o valor
+        anterior à atualização, usado na sincronização de histórico.
+        """
+        row = await self.db.fetchrow(self.UPSERT_ACTIVE_SQL, sender_id, instance, channel, datetime.utcnow())
+
+        return self._to_entity(row), row["created"]
 
     async def touch(self, conversation_id):
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                UPDATE conversations
-                SET last_message_at = %s
-                WHERE id = %s
-            """, (datetime.utcnow(), str(conversation_id)))
-
-            connection.commit()
-        finally:
-            self.db.disconnect(connection)
+        await self.db.execute("""
+            UPDATE conversations
+            SET last_message_at = $1
+            WHERE id = $2
+        """, datetime.utcnow(), conversation_id)
 
     async def close(self, conversation_id):
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                UPDATE conversations
-                SET status = 'closed',
-                    ended_at = %s
-                WHERE id = %s
-            """, (datetime.utcnow(), conversation_id))
-
-            connection.commit()
-        finally:
-            self.db.disconnect(connection)
+        await self.db.execute("""
+            UPDATE conversations
+            SET status = 'closed',
+                ended_at = $1
+            WHERE id = $2
+        """, datetime.utcnow(), conversation_id)
+
+    async def close_idle(
+        self,
+        conversation_ids: List[uuid.UUID],
+        idle_before: datetime
+    ) -> List[ConversationEntity]:
+        """
+        Encerra, em um único UPDATE, as conversas do lote ainda ativas e sem
+        mensagem desde `idle_before`; retorna as que foram encerradas.
+        """
+        rows = await self.db.fetch(self.CLOSE_IDLE_SQL, datetime.utcnow(), conversation_ids, idle_before)
+
+        return [self._to_entity(row) for row in rows]
+
+    def _to_entity(self, row: asyncpg.Record) -> ConversationEntity:
+        return ConversationEntity(
+            id=row["id"],
+            sender_id=row["sender_id"],
+            instance=row["instance"],
+            channel=row["channel"],
+            started_at=row["started_at"],
+            ended_at=row["ended_at"],
+            last_message_at=row["last_message_at"],
+            metadata=row["metadata"]
+        )
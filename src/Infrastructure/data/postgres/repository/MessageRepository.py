@@ -1,86 +1,360 @@
 # src/Infrastructure/data/postgres/repository/MessageRepository.py
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+import asyncpg
 
 from src.Domain import (
     IMessageRepository,
-    MessageEntity
+    MessageEntity,
+    MessageSearchHitEntity
 )
 from src.Infrastructure import PostgresContext
+from src.Infrastructure.data.postgres.repository.ConversationArchiveRepository import ConversationArchiveRepository
 
 
 class MessageRepository(IMessageRepository):
+    """
+    Mensagens em `messages` (particionada por mês). Leituras `readonly`
+    (ferramentas de suporte) de uma conversa que já saiu de `conversations`
+    caem no arquivo de conversas antigas (ConversationArchiveRepository),
+    com o mesmo keyset. Página vazia de uma conversa ativa é só página vazia.
+    """
+
+    # Sentinelas do keyset (created_at, id) quando o cursor só tem a data
+    _MIN_ID = uuid.UUID(int=0)
+    _MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+
+    _INSERT_CHUNK_ROWS = 1000
+
+    # Leituras quentes; migrations/planCheck.py roda EXPLAIN sobre estas mesmas
+    LIST_RECENT_SQL = """
+        SELECT
+            id,
+            conversation_id,
+            role,
+            content,
+            created_at,
+            metadata
+        FROM messages
+        WHERE conversation_id = $1
+        ORDER BY created_at DESC, id DESC
+        LIMIT $2
+    """
+
+    LIST_BEFORE_SQL = """
+        SELECT
+            id,
+            conversation_id,
+            role,
+            content,
+            created_at,
+            metadata
+        FROM messages
+        WHERE conversation_id = $1
+          AND (created_at, id) < ($2, $3)
+        ORDER BY created_at DESC, id DESC
+        LIMIT $4
+    """
+
+    LIST_AFTER_SQL = """
+        SELECT
+            id,
+            conversation_id,
+            role,
+            content,
+            created_at,
+            metadata
+        FROM messages
+        WHERE conversation_id = $1
+          AND (created_at, id) > ($2, $3)
+        ORDER BY created_at ASC, id ASC
+        LIMIT $4
+    """
+
+    CONVERSATION_EXISTS_SQL = "SELECT EXISTS (SELECT 1 FROM conversations WHERE id = $1)"
 
     def __init__(self):
         self.db = PostgresContext()
+        self.archive = ConversationArchiveRepository()
 
     async def create(self, message: MessageEntity) -> MessageEntity:
-        """Cria uma nova mensagem no banco de dados"""
-        cursor, connection = self.db.connect()
+        """Cria uma nova mensagem no banco de dados (idempotente pelo id, ver create_many)"""
+        return (await self.create_many([message]))[0]
+
+    async def create_many(self, messages: List[MessageEntity]) -> List[MessageEntity]:
+        """
+        Grava as mensagens de um turno em um único INSERT multi-linha.
+
+        O id é gerado aqui (se ainda não veio) e gravado junto: repetir a
+        chamada com as mesmas entidades, depois de uma falha em que o commit
+        pode ter acontecido, não duplica nada (ON CONFLICT DO NOTHING).
+        """
+        if not messages:
+            return messages
+
+        self._assign_keys(messages)
+        async with self.db.acquire() as connection:
+            async with connection.transaction():
+                await self._insert(connection, messages)
+        return messages
+
+    async def copy_many(self, messages: List[MessageEntity]) -> int:
+        """
+        Grava um lote via COPY (protocolo binário, sem RETURNING).
+        Mensagens com metadata vão por INSERT (o codec jsonb do pool é
+        textual), na mesma transação: o lote entra inteiro ou não entra.
+
+        COPY não tem ON CONFLICT: se o lote já tinha sido gravado (retry
+        depois de um commit que pareceu falhar), a transação cai por chave
+        duplicada e o lote é regravado pelo INSERT idempotente.
+        """
+        if not messages:
+            return 0
+
+        self._assign_keys(messages)
+        plain = [m for m in messages if m.metadata is None]
+        with_metadata = [m for m in messages if m.metadata is not None]
+
         try:
-            
-            created_at = message.created_at or datetime.utcnow()
-
-            cursor.execute("""
-                INSERT INTO messages (
-                    conversation_id,
-                    role,
-                    content,
-                    created_at,
-                    metadata
-                ) VALUES ( %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                
-                str(message.conversation_id),
-                message.role,
-                message.content,
+            async with self.db.acquire() as connection:
+                async with connection.transaction():
+                    if plain:
+                        await connection.copy_records_to_table(
+                            "messages",
+                            columns=["id", "conversation_id", "role", "content", "created_at"],
+                            records=[
+                                (m.id, m.conversation_id, m.role, m.content, m.created_at)
+                                for m in plain
+                            ]
+                        )
+                    if with_metadata:
+                        await self._insert(connection, with_metadata)
+        except asyncpg.UniqueViolationError:
+            await self.create_many(messages)
+        return len(messages)
+
+    @staticmethod
+    def _assign_keys(messages: List[MessageEntity]):
+        """Fixa (id, created_at) antes da primeira tentativa: os retries regravam a mesma chave"""
+        now = datetime.utcnow()
+        for message in messages:
+            message.id = message.id or uuid.uuid4()
+            message.created_at = message.created_at or now
+
+    @staticmethod
+    def insert_query(rows: int) -> str:
+        """INSERT multi-linha de `rows` mensagens (também usado pelo planCheck)"""
+        placeholders = ", ".join(
+            f"(${i * 6 + 1}, ${i * 6 + 2}, ${i * 6 + 3}, ${i * 6 + 4}, ${i * 6 + 5}, ${i * 6 + 6})"
+            for i in range(rows)
+        )
+        return f"""
+            INSERT INTO messages (
+                id,
+                conversation_id,
+                role,
+                content,
                 created_at,
-                message.metadata
-            ))
+                metadata
+            ) VALUES {placeholders}
+            ON CONFLICT (id, created_at) DO NOTHING
+        """
 
-            connection.commit()
-            message.id = cursor.fetchone()[0]
-            message.created_at = created_at
-            return message
-        finally:
-            self.db.disconnect(connection)
+    async def _insert(self, connection: asyncpg.Connection, messages: List[MessageEntity]):
+        # Em blocos: o protocolo limita cada statement a 32767 parâmetros
+        for start in range(0, len(messages), self._INSERT_CHUNK_ROWS):
+            chunk = messages[start:start + self._INSERT_CHUNK_ROWS]
+            args = [
+                value
+                for message in chunk
+                for value in (
+                    message.id,
+                    message.conversation_id,
+                    message.role,
+                    message.content,
+                    message.created_at,
+                    message.metadata
+                )
+            ]
+
+            await connection.execute(self.insert_query(len(chunk)), *args)
 
     async def list_by_conversation(
         self,
         conversation_id: uuid.UUID,
         limit: int = 50
     ) -> List[MessageEntity]:
-        """Lista mensagens de uma conversa"""
-        cursor, connection = self.db.connect()
-        try:
-            cursor.execute("""
-                SELECT 
-                    id,
-                    conversation_id,
-                    role,
-                    content,
-                    created_at,
-                    metadata
-                FROM messages
-                WHERE conversation_id = %s
-                ORDER BY created_at ASC
-                LIMIT %s
-            """, (str(conversation_id), limit))
-
-            rows = cursor.fetchall()
-
-            return [
-                MessageEntity(
-                    id=row[0],
-                    conversation_id=row[1],
-                    role=row[2],
-                    content=row[3],
-                    created_at=row[4],
-                    metadata=row[5]
-                )
-                for row in rows
-            ]
-        finally:
-            self.db.disconnect(connection)
+        """Lista as últimas `limit` mensagens de uma conversa (ordem cronológica)"""
+        return await self.list_recent(conversation_id, limit)
+
+    async def list_recent(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int = 50,
+        readonly: bool = False
+    ) -> List[MessageEntity]:
+        """
+        Lista as últimas mensagens de uma conversa (ordem cronológica).
+        `readonly`: pode ler de uma réplica (consultas de suporte, não o turno).
+        """
+        rows = await self.db.fetch(self.LIST_RECENT_SQL, conversation_id, limit, readonly=readonly)
+
+        if not rows and readonly and await self._is_archived(conversation_id):
+            return (await self._archived(conversation_id))[-limit:]
+        return [self._to_entity(row) for row in reversed(rows)]
+
+    async def list_before(
+        self,
+        conversation_id: uuid.UUID,
+        before: datetime,
+        before_id: Optional[uuid.UUID] = None,
+        limit: int = 50,
+        readonly: bool = False
+    ) -> List[MessageEntity]:
+        """
+        Página anterior ao cursor (created_at, id), em ordem cronológica.
+        Sem `before_id`, todas as mensagens de `before` ficam de fora.
+        """
+        rows = await self.db.fetch(
+            self.LIST_BEFORE_SQL, conversation_id, before, before_id or self._MIN_ID, limit, readonly=readonly
+        )
+
+        if not rows and readonly and await self._is_archived(conversation_id):
+            cursor = (before, before_id or self._MIN_ID)
+            return [m for m in await self._archived(conversation_id) if (m.created_at, m.id) < cursor][-limit:]
+        return [self._to_entity(row) for row in reversed(rows)]
+
+    async def list_after(
+        self,
+        conversation_id: uuid.UUID,
+        after: datetime,
+        limit: int = 50,
+        after_id: Optional[uuid.UUID] = None,
+        readonly: bool = False
+    ) -> List[MessageEntity]:
+        """
+        Mensagens depois do cursor (created_at, id), em ordem cronológica.
+        Sem `after_id`, equivale a created_at > after (marca d'água).
+        """
+        rows = await self.db.fetch(
+            self.LIST_AFTER_SQL, conversation_id, after, after_id or self._MAX_ID, limit, readonly=readonly
+        )
+
+        if not rows and readonly and await self._is_archived(conversation_id):
+            cursor = (after, after_id or self._MAX_ID)
+            return [m for m in await self._archived(conversation_id) if (m.created_at, m.id) > cursor][:limit]
+        return [self._to_entity(row) for row in rows]
+
+    async def search(
+        self,
+        query: str,
+        instance: Optional[str] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        after: Optional[Tuple[float, uuid.UUID]] = None,
+        limit: int = 20
+    ) -> List[MessageSearchHitEntity]:
+        """
+        Busca textual em português (websearch: "frase exata", OR, -termo) pelo
+        índice GIN de content_tsv, paginada por keyset em (rank, id).
+        O intervalo de datas também poda as partições mensais.
+        Conversas já arquivadas não entram na busca.
+        """
+        sql, args = self.search_query(query, instance, agent_id, created_from, created_to, after, limit)
+        rows = await self.db.fetch(sql, *args, readonly=True)
+
+        return [
+            MessageSearchHitEntity(
+                message=self._to_entity(row),
+                sender_id=row["sender_id"],
+                instance=row["instance"],
+                rank=row["rank"],
+                snippet=row["snippet"]
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def search_query(
+        query: str,
+        instance: Optional[str] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        after: Optional[Tuple[float, uuid.UUID]] = None,
+        limit: int = 20
+    ) -> Tuple[str, list]:
+        """SQL e argumentos de search (também usados pelo planCheck)"""
+        args: list = [query]
+        where = ["m.content_tsv @@ q.query"]
+        for condition, value in (
+            ("c.instance = ${}", instance),
+            ("c.instance IN (SELECT phone_number FROM agent_phone_mappings WHERE agent_id = ${})", agent_id),
+            ("m.created_at >= ${}", created_from),
+            ("m.created_at < ${}", created_to),
+        ):
+            if value is not None:
+                args.append(value)
+                where.append(condition.format(len(args)))
+        if after:
+            args += [after[0], after[1]]
+            where.append(f"(ts_rank_cd(m.content_tsv, q.query), m.id) < (${len(args) - 1}, ${len(args)})")
+        args.append(limit)
+
+        # ts_headline só para as linhas da página (é caro)
+        return f"""
+            SELECT
+                hit.id,
+                hit.conversation_id,
+                hit.role,
+                hit.content,
+                hit.created_at,
+                hit.metadata,
+                hit.sender_id,
+                hit.instance,
+                hit.rank,
+                ts_headline(
+                    'portuguese', hit.content, hit.query,
+                    'StartSel=**, StopSel=**, MaxFragments=2, MaxWords=20, MinWords=5'
+                ) AS snippet
+            FROM (
+                SELECT
+                    m.id,
+                    m.conversation_id,
+                    m.role,
+                    m.content,
+                    m.created_at,
+                    m.metadata,
+                    c.sender_id,
+                    c.instance,
+                    q.query,
+                    ts_rank_cd(m.content_tsv, q.query) AS rank
+                FROM messages m
+                CROSS JOIN websearch_to_tsquery('portuguese', $1) AS q(query)
+                INNER JOIN conversations c ON c.id = m.conversation_id
+                WHERE {" AND ".join(where)}
+                ORDER BY rank DESC, m.id DESC
+                LIMIT ${len(args)}
+            ) hit
+            ORDER BY hit.rank DESC, hit.id DESC
+        """, args
+
+    async def _is_archived(self, conversation_id: uuid.UUID) -> bool:
+        """A conversa saiu de `conversations` (archive_batch apaga as duas tabelas juntas)"""
+        return not await self.db.fetchval(self.CONVERSATION_EXISTS_SQL, conversation_id, readonly=True)
+
+    async def _archived(self, conversation_id: uuid.UUID) -> List[MessageEntity]:
+        return await self.archive.get_transcript(conversation_id) or []
+
+    def _to_entity(self, row: asyncpg.Record) -> MessageEntity:
+        return MessageEntity(
+            id=row["id"],
+            conversation_id=row["conversation_id"],
+            role=row["role"],
+            content=row["content"],
+            created_at=row["created_at"],
+            metadata=row["metadata"]
+        )
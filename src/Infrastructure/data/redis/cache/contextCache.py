@@ -0,0 +1,146 @@
+# Infrastructure/data/redis/cache/contextCache.py
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import redis.asyncio as redis
+
+from src.Domain import ConversationContext
+from src.Infrastructure import Metrics, RedisKeys
+
+logger = logging.getLogger(__name__)
+
+
+class ContextCache:
+    """
+    Cache L1 (em processo) de ConversationContext vivos, na frente do Redis.
+
+    - LRU limitado por número de entradas e por idade máxima.
+    - Semântica de checkout: `take` remove a entrada, então dois turnos
+      simultâneos no mesmo worker nunca compartilham o mesmo objeto; o
+      contexto volta ao cache com `put` depois de salvo no Redis.
+    - Cada escrita publica (chave, versão) no canal de invalidação; os outros
+      workers descartam cópias com versão menor.
+
+    Uma invalidação perdida não corrompe nada: o save usa compare-and-set,
+    então uma cópia velha vira apenas um conflito resolvido por merge.
+    """
+
+    CHANNEL = RedisKeys.CONTEXT_INVALIDATION_CHANNEL
+
+    # Maior que qualquer versão real: quem recebe descarta a cópia incondicionalmente
+    EVICT_VERSION = 2 ** 62
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis],
+        max_entries: int = 1000,
+        ttl_seconds: int = 300
+    ):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.origin = uuid.uuid4().hex[:12]
+        self._entries: "OrderedDict[str, Tuple[ConversationContext, float]]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+
+    # ========== LRU ==========
+
+    def take(self, key: str) -> Optional[ConversationContext]:
+        """Retira o contexto do cache (checkout)"""
+        self._ensure_listener()
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            Metrics.incr("context.l1.misses")
+            return None
+
+        context, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            Metrics.incr("context.l1.expired")
+            return None
+
+        Metrics.incr("context.l1.hits")
+        return context
+
+    def put(self, key: str, context: ConversationContext):
+        """Devolve/insere o contexto no cache e avisa os outros workers"""
+        self._ensure_listener()
+
+        self._entries[key] = (context, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            Metrics.incr("context.l1.evictions")
+
+    def invalidate(self, key: str, version: Optional[int] = None):
+        """Remove a entrada (ou apenas se a versão em cache for anterior a `version`)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if version is None or entry[0].version < version:
+            del self._entries[key]
+            Metrics.incr("context.l1.invalidations")
+
+    def clear(self):
+        self._entries.clear()
+
+    async def evict(self, key: str):
+        """Descarta o contexto aqui e nos outros workers (ex.: conversa encerrada)"""
+        self.invalidate(key)
+        await self.publish(key, self.EVICT_VERSION)
+
+    # ========== INVALIDAÇÃO ENTRE WORKERS ==========
+
+    async def publish(self, key: str, version: int):
+        """Anuncia uma nova versão do contexto para os outros workers"""
+        if not self.client:
+            return
+        try:
+            await self.client.publish(self.CHANNEL, f"{self.origin}|{version}|{key}")
+        except Exception as e:
+            logger.error(f"[ContextCache] ❌ Erro ao publicar invalidação de {key}: {e}")
+
+    def _ensure_listener(self):
+        if not self.client or (self._listener and not self._listener.done()):
+            return
+        try:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        except RuntimeError:
+            pass  # fora de um event loop: o cache funciona só com TTL
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    # Invalidações podem ter sido perdidas enquanto desconectado
+                    self.clear()
+                    logger.info("[ContextCache] ✅ Inscrito no canal de invalidação")
+
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ContextCache] ❌ Listener de invalidação caiu: {e}")
+                self.clear()
+                await asyncio.sleep(1)
+
+    def _apply(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, version, key = data.split("|", 2)
+        if origin != self.origin:
+            self.invalidate(key, int(version))
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        self.clear()
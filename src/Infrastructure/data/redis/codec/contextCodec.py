@@ -0,0 +1,188 @@
+# Infrastructure/data/redis/codec/contextCodec.py
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import zstandard
+
+from src.Domain.entities.conversationContextEntity import ConversationContext
+
+
+class ContextCodec:
+    """
+    Codec binário versionado para os valores salvos no Redis.
+
+    Formato: MAGIC (1 byte) + versão (1 byte) + flags (1 byte) + payload msgpack.
+    O byte 0xC1 nunca aparece no início de um msgpack ou de um JSON válido,
+    então valores antigos (JSON puro) continuam legíveis sem migração.
+
+    Contextos de conversa (ConversationContext.to_dict) são gravados em
+    layout posicional (sem repetir as chaves) e com timestamps inteiros
+    em microssegundos. Qualquer outro valor é gravado como msgpack genérico.
+
+    Desde a versão 2, cada mensagem e decisão é um msgpack próprio (bin)
+    dentro do payload. O decode devolve esses bytes sem desempacotar: o
+    ConversationContext guarda só eles (bem menores que listas/objetos
+    Python) e desempacota cada registro no primeiro acesso (LazyRecordList);
+    os nunca acessados voltam para o encode como vieram. A versão 1
+    (registros como listas posicionais) continua legível.
+
+    zstd vem do pacote `zstandard` (dependência explícita), para que todo
+    worker leia o que qualquer outro gravou, independente da versão do Python.
+    """
+
+    MAGIC = b"\xc1"
+    VERSION = 2
+    SUPPORTED_VERSIONS = (1, 2)
+
+    FLAG_ZSTD = 0x01
+    FLAG_ZLIB = 0x02
+
+    KIND_VALUE = 0
+    KIND_CONTEXT = 1
+
+    # Payloads acima deste tamanho são comprimidos
+    COMPRESSION_THRESHOLD = 1024
+
+    _EPOCH = datetime(1970, 1, 1)
+
+    _CONTEXT_KEYS = (
+        "sender_id", "messages", "tool_results",
+        "active_flow", "flow_history", "decision_history"
+    )
+    _MESSAGE_FIELDS = ConversationContext.MESSAGE_FIELDS
+    _DECISION_FIELDS = ConversationContext.DECISION_FIELDS
+    _FLOW_FIELDS = (
+        "flow_id", "primary_intent", "sub_intent", "status", "current_step",
+        "resolved_params", "pending_params", "created_at", "last_updated", "ttl_seconds"
+    )
+    _TIMESTAMP_FIELDS = frozenset({"timestamp", "created_at", "last_updated"})
+
+    def __init__(self, compression_threshold: Optional[int] = None):
+        self.compression_threshold = (
+            compression_threshold if compression_threshold is not None else self.COMPRESSION_THRESHOLD
+        )
+        self._zstd_compressor = zstandard.ZstdCompressor()
+        self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    # ========== API PÚBLICA ==========
+
+    def encode(self, value: Any) -> bytes:
+        """Serializa um valor para o formato binário"""
+        if self._is_context(value):
+            body = [self.KIND_CONTEXT, *self._pack_context(value)]
+        else:
+            body = [self.KIND_VALUE, value]
+
+        payload = msgpack.packb(body, use_bin_type=True)
+        flags = 0
+
+        if len(payload) >= self.compression_threshold:
+            compressed, flag = self._compress(payload)
+            if len(compressed) < len(payload):
+                payload, flags = compressed, flag
+
+        return self.MAGIC + bytes((self.VERSION, flags)) + payload
+
+    def decode(self, raw: Any) -> Optional[Any]:
+        """Deserializa um valor (binário ou JSON legado)"""
+        if raw is None:
+            return None
+
+        if isinstance(raw, str):
+            return json.loads(raw)
+
+        if not raw.startswith(self.MAGIC):
+            # Formato antigo: json.dumps puro
+            return json.loads(raw)
+
+        version, flags = raw[1], raw[2]
+        if version not in self.SUPPORTED_VERSIONS:
+            raise ValueError(f"Versão de codec não suportada: {version}")
+
+        payload = self._decompress(raw[3:], flags)
+        body = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+        if body[0] == self.KIND_CONTEXT:
+            return self._unpack_context(body[1:])
+        return body[1]
+
+    # ========== CONTEXTO ==========
+
+    def _is_context(self, value: Any) -> bool:
+        return (
+            isinstance(value, dict)
+            and "sender_id" in value
+            and isinstance(value.get("messages"), list)
+        )
+
+    def _pack_context(self, data: Dict[str, Any]) -> List[Any]:
+        extra = {k: v for k, v in data.items() if k not in self._CONTEXT_KEYS}
+        return [
+            data["sender_id"],
+            [self._pack_packed(m, self._MESSAGE_FIELDS) for m in data.get("messages", [])],
+            data.get("tool_results", []),
+            self._pack_record(data["active_flow"], self._FLOW_FIELDS) if data.get("active_flow") else None,
+            [self._pack_record(f, self._FLOW_FIELDS) for f in data.get("flow_history", [])],
+            [self._pack_packed(d, self._DECISION_FIELDS) for d in data.get("decision_history", [])],
+            extra
+        ]
+
+    def _unpack_context(self, body: List[Any]) -> Dict[str, Any]:
+        sender_id, messages, tool_results, active_flow, flow_history, decisions, extra = body
+        # Mensagens e decisões seguem empacotadas (v2) ou posicionais (v1): o
+        # ConversationContext decodifica no acesso. Fluxos são poucos e viram
+        # dict, com os timestamps ainda inteiros
+        data = {
+            "sender_id": sender_id,
+            "messages": messages,
+            "tool_results": tool_results,
+            "active_flow": dict(zip(self._FLOW_FIELDS, active_flow)) if active_flow else None,
+            "flow_history": [dict(zip(self._FLOW_FIELDS, f)) for f in flow_history],
+            "decision_history": decisions
+        }
+        data.update(extra)
+        return data
+
+    def _pack_packed(self, record: Any, fields: tuple) -> bytes:
+        if isinstance(record, bytes):
+            # Registro que veio empacotado do decode e não foi acessado
+            return record
+        return msgpack.packb(self._pack_record(record, fields), use_bin_type=True)
+
+    def _pack_record(self, record: Any, fields: tuple) -> List[Any]:
+        if isinstance(record, list):
+            # Registro posicional (payload versão 1) que não foi acessado
+            return record
+        return [
+            self._encode_timestamp(record.get(name)) if name in self._TIMESTAMP_FIELDS else record.get(name)
+            for name in fields
+        ]
+
+    # ========== TIMESTAMPS ==========
+
+    def _encode_timestamp(self, value: Any) -> Any:
+        """ISO naive -> microssegundos desde epoch (datas com fuso ficam como texto)"""
+        if not isinstance(value, str):
+            return value
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if dt.tzinfo is not None:
+            return value
+        return (dt - self._EPOCH) // timedelta(microseconds=1)
+
+    # ========== COMPRESSÃO ==========
+
+    def _compress(self, payload: bytes):
+        return self._zstd_compressor.compress(payload), self.FLAG_ZSTD
+
+    def _decompress(self, payload: bytes, flags: int) -> bytes:
+        if flags & self.FLAG_ZSTD:
+            return self._zstd_decompressor.decompress(payload)
+        if flags & self.FLAG_ZLIB:  # gravado antes do zstandard virar dependência
+            return zlib.decompress(payload)
+        return payload
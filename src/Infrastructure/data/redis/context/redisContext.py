@@ -1,18 +1,80 @@
 # Infrastructure/data/redis/context/redis_context.py
-import redis
+import os
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.asyncio.cluster import RedisCluster
 from src.config import settings
+from src.Infrastructure.data.redis.context.shardedRedisClient import ShardedRedisClient
 
 class RedisContext:
-    _client = None  # singleton simples
+    """
+    Um único cliente assíncrono por processo, recriado se o processo for
+    forkado (workers do gunicorn). Três modos, conforme o .env:
+
+    - REDIS_SHARD_URLS: vários nós independentes com consistent hashing no cliente
+    - REDIS_CLUSTER: Redis Cluster a partir de REDIS_URL
+    - padrão: um nó em REDIS_URL com pool de conexões
+    """
+    _pool: Optional[redis.ConnectionPool] = None
+    _client = None
+    _pid: Optional[int] = None
+
+    _CLIENT_OPTIONS = dict(
+        decode_responses=False,  # valores binários (ContextCodec)
+        # Os scripts de escrita são idempotentes no retry (token do compare_and_set,
+        # delete/zrem condicionados), então repetir após timeout é seguro
+        retry_on_timeout=True,
+        socket_timeout=5,
+        health_check_interval=30
+    )
 
     @classmethod
-    def get_client(cls) -> redis.Redis:
-        if settings.REDIS_URL:
-            cls._client = redis.Redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True,
-                retry_on_timeout=True,
-                socket_timeout=5,
-                health_check_interval=30
-            )
+    def get_client(cls):
+        if not (settings.REDIS_URL or settings.REDIS_SHARD_URLS):
+            return None
+
+        if cls._client is None or cls._pid != os.getpid():
+            if settings.REDIS_SHARD_URLS:
+                cls._client = ShardedRedisClient([
+                    redis.Redis.from_url(
+                        url.strip(),
+                        max_connections=settings.REDIS_MAX_CONNECTIONS,
+                        **cls._CLIENT_OPTIONS
+                    )
+                    for url in settings.REDIS_SHARD_URLS.split(",") if url.strip()
+                ])
+            elif settings.REDIS_CLUSTER:
+                cls._client = RedisCluster.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    decode_responses=False,
+                    socket_timeout=5,
+                    health_check_interval=30
+                )
+            else:
+                cls._pool = redis.ConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    **cls._CLIENT_OPTIONS
+                )
+                cls._client = redis.Redis(connection_pool=cls._pool)
+            cls._pid = os.getpid()
         return cls._client
+
+    @classmethod
+    async def warm_up(cls):
+        """Abre as conexões (um PING por nó) antes da primeira mensagem"""
+        client = cls.get_client()
+        if client is not None:
+            await client.ping()
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+        if cls._pool is not None:
+            await cls._pool.disconnect()
+        cls._client = None
+        cls._pool = None
+        cls._pid = None
@@ -0,0 +1,78 @@
+# Infrastructure/data/redis/context/shardedRedisClient.py
+import asyncio
+import bisect
+import hashlib
+from typing import List, Optional, Sequence
+
+import redis.asyncio as redis
+
+from src.Infrastructure.data.redis.keys import RedisKeys
+
+
+class ShardedRedisClient:
+    """
+    Consistent hashing no cliente sobre vários nós Redis independentes
+    (alternativa ao Redis Cluster).
+
+    O nó é escolhido pela hash tag da chave, então todas as chaves de uma
+    conversa ficam no mesmo nó. Comandos de chave única são roteados pelo
+    primeiro argumento; scripts Lua, pelo primeiro item de `keys`.
+    Pub/sub usa sempre o primeiro nó.
+    """
+
+    def __init__(self, clients: Sequence[redis.Redis], virtual_nodes: int = 160):
+        self.clients = list(clients)
+        ring = sorted(
+            (self._hash(f"{index}-{vnode}"), index)
+            for index in range(len(self.clients))
+            for vnode in range(virtual_nodes)
+        )
+        self._ring_hashes = [h for h, _ in ring]
+        self._ring_nodes = [index for _, index in ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def node_index(self, key) -> int:
+        if isinstance(key, bytes):
+            key = key.decode()
+        position = bisect.bisect(self._ring_hashes, self._hash(RedisKeys.hash_tag(key)))
+        return self._ring_nodes[position % len(self._ring_nodes)]
+
+    def node_for(self, key) -> redis.Redis:
+        return self.clients[self.node_index(key)]
+
+    def register_script(self, script: str) -> "_ShardedScript":
+        return _ShardedScript(self, script)
+
+    async def publish(self, channel: str, message):
+        return await self.clients[0].publish(channel, message)
+
+    def pubsub(self):
+        return self.clients[0].pubsub()
+
+    async def ping(self) -> bool:
+        results = await asyncio.gather(*(client.ping() for client in self.clients))
+        return all(results)
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+
+    def __getattr__(self, name: str):
+        # get/set/expire/ttl/delete/zadd/zrangebyscore/zrem... → nó da chave
+        def routed(key, *args, **kwargs):
+            return getattr(self.node_for(key), name)(key, *args, **kwargs)
+        return routed
+
+
+class _ShardedScript:
+    """Script registrado em todos os nós; executado no nó de keys[0]"""
+
+    def __init__(self, sharded: ShardedRedisClient, script: str):
+        self.sharded = sharded
+        self.scripts = [client.register_script(script) for client in sharded.clients]
+
+    async def __call__(self, keys: List[str], args: Optional[list] = None):
+        return await self.scripts[self.sharded.node_index(keys[0])](keys=keys, args=args)
@@ -0,0 +1,77 @@
+# Infrastructure/data/redis/keys.py
+import zlib
+from typing import List
+
+
+class RedisKeys:
+    """
+    Esquema único de chaves do Redis.
+
+    Todas as chaves de uma conversa usam a mesma hash tag
+    `{<sender_id>:<instance>}`, então caem no mesmo slot do Redis Cluster
+    (ou no mesmo nó do hash ring do ShardedRedisClient) e podem ser usadas
+    juntas em scripts Lua e transações.
+
+    Índices globais (atividade de contextos) são divididos em
+    ACTIVITY_INDEX_SHARDS sorted sets, cada um com a própria hash tag, para
+    não concentrar toda a escrita em um único nó. A atividade de conversas
+    fica em um sorted set por instance (o limite de ociosidade é por agente).
+    """
+
+    ACTIVITY_INDEX_SHARDS = 16
+
+    CONTEXT_INVALIDATION_CHANNEL = "conversation-context:invalidate"
+    CONTEXT_OFFLOAD_LOCK = "conversation-context:offload-lock"
+    CONVERSATION_ACTIVITY_INSTANCES = "conversations:activity:instances"
+    CONVERSATION_SWEEP_LOCK = "conversations:sweep-lock"
+    AGENT_CONFIG_CACHED_PHONES = "agent-config:cached-phones"
+
+    @staticmethod
+    def hash_tag(key: str) -> str:
+        """Parte da chave usada para escolher o slot/nó (regra do Redis Cluster)"""
+        start = key.find("{")
+        if start != -1:
+            end = key.find("}", start + 1)
+            if end > start + 1:
+                return key[start + 1:end]
+        return key
+
+    @staticmethod
+    def conversation_tag(sender_id: str, instance: str) -> str:
+        return f"{{{sender_id}:{instance}}}"
+
+    # ========== CHAVES POR CONVERSA ==========
+
+    @classmethod
+    def conversation_context(cls, sender_id: str, instance: str) -> str:
+        return f"conversation:{cls.conversation_tag(sender_id, instance)}:context"
+
+    @staticmethod
+    def legacy_conversation_context(sender_id: str, instance: str) -> str:
+        """Formato anterior (sem hash tag), lido apenas como fallback"""
+        return f"conversation:{sender_id}:{instance}"
+
+    # ========== CACHE DE AGENTES ==========
+
+    @staticmethod
+    def agent_config(phone_number: str) -> str:
+        return f"agent-config:{{{phone_number}}}"
+
+    # ========== ÍNDICES GLOBAIS ==========
+
+    @classmethod
+    def context_activity_index(cls, context_key: str) -> str:
+        shard = zlib.crc32(cls.hash_tag(context_key).encode()) % cls.ACTIVITY_INDEX_SHARDS
+        return f"conversation-context:activity:{{shard-{shard}}}"
+
+    @classmethod
+    def context_activity_indexes(cls) -> List[str]:
+        return [
+            f"conversation-context:activity:{{shard-{shard}}}"
+            for shard in range(cls.ACTIVITY_INDEX_SHARDS)
+        ]
+
+    @staticmethod
+    def conversation_activity_index(instance: str) -> str:
+        """Sorted set das conversas ativas da instance (membro "id|sender", score = última mensagem)"""
+        return f"conversations:activity:{{{instance}}}"
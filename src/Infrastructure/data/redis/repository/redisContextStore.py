@@ -0,0 +1,26 @@
+from typing import Any, Dict, Optional, Tuple
+
+from src.Domain import IContextStore, IRedisRepository
+
+
+class RedisContextStore(IContextStore):
+    """Backend padrão (multi-worker): hash versionado no Redis via scripts Lua"""
+
+    def __init__(self, redis: IRedisRepository):
+        self.redis = redis
+
+    async def load(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        return await self.redis.get_versioned(key)
+
+    async def compare_and_set(
+        self,
+        key: str,
+        data: Dict[str, Any],
+        expected_version: int,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> Tuple[bool, int]:
+        return await self.redis.compare_and_set(key, data, expected_version, ttl_seconds, write_token)
+
+    async def delete(self, key: str) -> None:
+        await self.redis.delete(key)
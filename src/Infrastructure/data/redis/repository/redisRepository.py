@@ -1,55 +1,212 @@
-import json
-from typing import Any, Optional
-from src.Infrastructure import RedisContext
+from typing import Any, List, Optional, Tuple
+from src.Infrastructure import RedisContext, ContextCodec
 from src.Domain import IRedisRepository
 
+# Lê {versão, valor} de uma chave versionada (hash) ou legada (string, versão 0)
+_GET_VERSIONED = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'hash' then
+    local row = redis.call('HMGET', KEYS[1], 'v', 'd')
+    return {tonumber(row[1]) or 0, row[2]}
+elseif kind == 'string' then
+    return {0, redis.call('GET', KEYS[1])}
+end
+return {0, false}
+"""
+
+# Grava somente se a versão atual ainda for a esperada; retorna {1, nova} ou {0, atual}.
+# O token (ARGV[4]) fica em 't': conflito com o mesmo token é a própria escrita
+# repetida (timeout na resposta + retry), então conta como gravado: {1, atual}.
+_COMPARE_AND_SET = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+local current = 0
+if kind == 'hash' then
+    current = tonumber(redis.call('HGET', KEYS[1], 'v')) or 0
+end
+if current ~= tonumber(ARGV[1]) then
+    if ARGV[4] ~= '' and kind == 'hash' and redis.call('HGET', KEYS[1], 't') == ARGV[4] then
+        return {1, current}
+    end
+    return {0, current}
+end
+if kind == 'string' then
+    redis.call('DEL', KEYS[1])
+end
+local version = current + 1
+redis.call('HSET', KEYS[1], 'v', version, 'd', ARGV[2], 't', ARGV[4])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, version}
+"""
+
+# Cria a chave versionada já em ARGV[1] (contexto vindo do armazenamento frio),
+# somente se ela não existir; retorna {1, versão} ou {0, versão atual}
+_SET_VERSIONED_IF_ABSENT = """
+local kind = redis.call('TYPE', KEYS[1])['ok']
+if kind == 'hash' then
+    return {0, tonumber(redis.call('HGET', KEYS[1], 'v')) or 0}
+elseif kind ~= 'none' then
+    return {0, 0}
+end
+redis.call('HSET', KEYS[1], 'v', ARGV[1], 'd', ARGV[2], 't', '')
+if tonumber(ARGV[3]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, tonumber(ARGV[1])}
+"""
+
+# Valor e TTL em um round trip; script (e não pipeline) para rotear pela chave no cluster
+_GET_WITH_TTL = """
+return {redis.call('GET', KEYS[1]), redis.call('TTL', KEYS[1])}
+"""
+
+# Remove a chave somente se ninguém gravou uma versão nova desde a leitura
+_DELETE_IF_VERSION = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'v')) or 0
+if current ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# Remove os membros cujo score ainda é <= ARGV[1] (não foram tocados desde a leitura)
+_ZREM_IF_SCORE_AT_MOST = """
+local max_score = tonumber(ARGV[1])
+local removed = 0
+for i = 2, #ARGV do
+    local score = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[i]))
+    if score and score <= max_score then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
 class RedisRepository(IRedisRepository):
 
     def __init__(self):
         self.redis = RedisContext.get_client()
+        self.codec = ContextCodec()
+        self._get_versioned = self.redis.register_script(_GET_VERSIONED) if self.redis else None
+        self._compare_and_set = self.redis.register_script(_COMPARE_AND_SET) if self.redis else None
+        self._set_versioned_if_absent = self.redis.register_script(_SET_VERSIONED_IF_ABSENT) if self.redis else None
+        self._delete_if_version = self.redis.register_script(_DELETE_IF_VERSION) if self.redis else None
+        self._get_with_ttl = self.redis.register_script(_GET_WITH_TTL) if self.redis else None
+        self._zrem_if_score_at_most = self.redis.register_script(_ZREM_IF_SCORE_AT_MOST) if self.redis else None
 
-    def set(
+    async def set(
         self,
         key: str,
         value: Any,
         ttl_seconds: Optional[int] = None
     ) -> None:
-        data = json.dumps(value)
+        data = self.codec.encode(value)
+        await self.redis.set(key, data, ex=ttl_seconds or None)
 
-        if ttl_seconds:
-            self.redis.setex(key, ttl_seconds, data)
-        else:
-            self.redis.set(key, data)
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.redis.get(key)
+        return self.codec.decode(value) if value else None
 
-    def get(self, key: str) -> Optional[Any]:
-        value = self.redis.get(key)
-        return json.loads(value) if value else None
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], int]:
+        """Lê valor e TTL em um único round trip"""
+        value, ttl = await self._get_with_ttl(keys=[key])
+        return (self.codec.decode(value) if value else None), ttl
 
-    def update(self, key: str, value: Any) -> bool:
-        if not self.redis.exists(key):
-            return False
+    async def update(self, key: str, value: Any) -> bool:
+        """
+        Sobrescreve apenas se a chave existir, preservando o TTL atual.
+        SET XX KEEPTTL faz EXISTS + TTL + SETEX em um único comando atômico.
+        """
+        data = self.codec.encode(value)
+        return bool(await self.redis.set(key, data, xx=True, keepttl=True))
 
-        ttl = self.redis.ttl(key)
-        data = json.dumps(value)
+    async def get_versioned(self, key: str) -> Tuple[Optional[Any], int]:
+        """Lê valor e versão de uma chave gravada com compare_and_set"""
+        version, value = await self._get_versioned(keys=[key])
+        return (self.codec.decode(value) if value else None), int(version)
 
-        if ttl > 0:
-            self.redis.setex(key, ttl, data)
-        else:
-            self.redis.set(key, data)
+    async def compare_and_set(
+        self,
+        key: str,
+        value: Any,
+        expected_version: int,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> Tuple[bool, int]:
+        """
+        Grava o valor apenas se a versão armazenada for `expected_version`.
+        Retorna (True, nova_versão) ou (False, versão_atual) em caso de conflito.
+        Com `write_token`, repetir a mesma escrita é idempotente (ver IContextStore).
+        """
+        data = self.codec.encode(value)
+        saved, version = await self._compare_and_set(
+            keys=[key],
+            args=[expected_version, data, ttl_seconds or 0, write_token or ""]
+        )
+        return bool(saved), int(version)
 
-        return True
+    async def set_versioned_if_absent(
+        self,
+        key: str,
+        value: Any,
+        version: int,
+        ttl_seconds: Optional[int] = None
+    ) -> Tuple[bool, int]:
+        """
+        Cria a chave versionada com `version` apenas se ela não existir.
+        Retorna (True, version) ou (False, versão_atual) se já existir.
+        """
+        data = self.codec.encode(value)
+        saved, current = await self._set_versioned_if_absent(
+            keys=[key],
+            args=[version, data, ttl_seconds or 0]
+        )
+        return bool(saved), int(current)
 
-    def renew_ttl(self, key: str, ttl_seconds: int) -> bool:
-        return self.redis.expire(key, ttl_seconds)
+    async def renew_ttl(self, key: str, ttl_seconds: int) -> bool:
+        return bool(await self.redis.expire(key, ttl_seconds))
 
-    def get_ttl(self, key: str) -> int:
+    async def get_ttl(self, key: str) -> int:
         """
         Retornos:
         -2 -> chave não existe
         -1 -> chave existe sem TTL
         >=0 -> segundos restantes
         """
-        return self.redis.ttl(key)
+        return await self.redis.ttl(key)
+
+    async def delete(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def delete_if_version(self, key: str, version: int) -> bool:
+        """Remove a chave versionada apenas se a versão ainda for `version`"""
+        return bool(await self._delete_if_version(keys=[key], args=[version]))
+
+    async def set_if_absent(self, key: str, value: Any, ttl_seconds: int) -> bool:
+        """SET NX EX (usado como lock simples entre workers)"""
+        return bool(await self.redis.set(key, self.codec.encode(value), nx=True, ex=ttl_seconds))
+
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        await self.redis.zadd(key, {member: score})
+
+    async def zrange_by_score(self, key: str, max_score: float, limit: int) -> List[str]:
+        members = await self.redis.zrangebyscore(key, "-inf", max_score, start=0, num=limit)
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+    async def zrem(self, key: str, *members: str) -> None:
+        await self.redis.zrem(key, *members)
+
+    async def zrem_if_score_at_most(self, key: str, max_score: float, *members: str) -> int:
+        """Remove apenas os membros cujo score não passou de `max_score` (ZADD concorrente vence)"""
+        if not members:
+            return 0
+        return int(await self._zrem_if_score_at_most(keys=[key], args=[max_score, *members]))
+
+    async def sadd(self, key: str, member: str) -> None:
+        await self.redis.sadd(key, member)
 
-    def delete(self, key: str) -> None:
-        self.redis.delete(key)
+    async def smembers(self, key: str) -> List[str]:
+        members = await self.redis.smembers(key)
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
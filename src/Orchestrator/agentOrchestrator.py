@@ -29,6 +29,12 @@ class AgentOrchestrator:
         # Cria executor de tools com apenas as tools permitidas para este agente
         self.tool_executor = ExecutorTool(allowed_tools=agent_config.available_tools)
         
+        # Catálogo e payload `tools` da OpenAI montados uma vez por versão do agente
+        # (o ConversationService refaz o orchestrator quando a configuração ou o
+        # ToolRegistry mudam)
+        self.tools_description = self._get_available_tools_description()
+        self.tools_payload = llm_client.build_tools_payload(self.tool_executor.get_available_tools())
+        
         logger.info(f"[AgentOrchestrator] ✅ Inicializado com agente: {agent_config.name}")
         logger.info(f"[AgentOrchestrator] 🔧 Tools disponíveis: {agent_config.available_tools}")
         
@@ -66,7 +72,7 @@ class AgentOrchestrator:
 
     def __build_flow_decision_messages(self, context, user_message,prompt:str):
         flow_ctx = context.get_flow_context()
-        tools_desc = self._get_available_tools_description()
+        tools_desc = self.tools_description
         
         # 🔥 ADICIONAR: Resumo dos dados já coletados
         memory_context = ""
@@ -171,7 +177,7 @@ class AgentOrchestrator:
                                     """
         
         # Obter descrição das ferramentas disponíveis
-        available_tools_desc = self._get_available_tools_description()
+        available_tools_desc = self.tools_description
         
         # Formatar decisão para o prompt (incluindo informação sobre complete)
         decision_context_str = json.dumps(decision, ensure_ascii=False, indent=2)
@@ -285,7 +291,8 @@ class AgentOrchestrator:
         
         decision_response = await self.llm_client.chat(
             messages=decision_messages,
-            tools=self.tool_executor.get_available_tools()
+            tools=self.tool_executor.get_available_tools(),
+            tools_payload=self.tools_payload
         )
 
         decision = json.loads(decision_response.get("content", "{}"))
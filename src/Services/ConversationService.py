@@ -1,30 +1,51 @@
+import asyncio
 import logging
-from typing import Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
 from src.Domain import (
     IConversationService,
     ConversationEntity,
     ConversationContext,
     IConversationRepository,
-    IRedisRepository,
-    IAgentConfigRepository,
+    IContextStore,
     IMessageRepository,
+    AgentConfigEntity,
     MessageEntity,
     ResponsePackageEntity
 )
+from src.Domain.entities.conversationContextEntity import Message
 from src.Orchestrator import AgentOrchestrator
-from src.Infrastructure import OpenAIClient
-# from src.Services.agentConfigService import AgentConfigService
+from src.Tools import ToolRegistry
+from src.Infrastructure import OpenAIClient, Metrics, ContextCache, RedisKeys, MessageWriteBuffer
+from src.Services.contextTieringService import ContextTieringService
+from src.Services.postTurnPipeline import PostTurnPipeline
+from src.Services.agentConfigService import AgentConfigService
+from src.Services.conversationSweeperService import ConversationSweeperService
+from src.config import settings
 
 logger = logging.getLogger(__name__)
 
 class ConversationService(IConversationService):
 
+    # Tentativas de merge + compare-and-set antes de desistir de salvar o contexto
+    CONTEXT_SAVE_MAX_RETRIES = 5
+
+    # Orchestrators em memória (LRU); agentes apagados ou editados saem por aqui
+    ORCHESTRATOR_CACHE_MAX_ENTRIES = 256
+
     def __init__(
         self,
         conversation_repo: IConversationRepository,
         message_repo: IMessageRepository,
-        redis: IRedisRepository,
-        agent_config_service: IAgentConfigRepository
+        context_store: IContextStore,
+        agent_config_service: AgentConfigService,
+        context_cache: Optional[ContextCache] = None,
+        context_tiering: Optional[ContextTieringService] = None,
+        message_writer: Optional[MessageWriteBuffer] = None,
+        post_turn: Optional[PostTurnPipeline] = None,
+        conversation_sweeper: Optional[ConversationSweeperService] = None
     ):
         """
         Inicializa o serviço de conversação.
@@ -32,45 +53,163 @@ class ConversationService(IConversationService):
         Args:
             conversation_repo: Repositório de conversas
             message_repo: Repositório de mensagens
-            redis: Repositório Redis para cache
+            context_store: Armazenamento versionado de contextos (memory | redis | postgres)
             agent_config_service: Serviço para resolver configuração de agentes
+            context_cache: Cache L1 em processo de contextos (opcional)
+            context_tiering: Offload/reidratação de contextos ociosos no PostgreSQL (opcional)
+            message_writer: Buffer write-behind de mensagens (opcional; sem ele, INSERT por turno)
+            post_turn: Persistência do turno em background (opcional; sem ela, antes da resposta)
+            conversation_sweeper: Índice de atividade para encerrar conversas ociosas (opcional)
         """
         self.conversation_repo = conversation_repo
         self.message_repo = message_repo
-        self.redis = redis
+        self.context_store = context_store
         self.agent_config_service = agent_config_service
+        self.context_cache = context_cache
+        self.context_tiering = context_tiering
+        self.message_writer = message_writer
+        self.post_turn = post_turn
+        self.conversation_sweeper = conversation_sweeper
         self.llm_client = OpenAIClient()
+        # (hash do conteúdo do agente, versão do ToolRegistry) → orchestrator;
+        # o orchestrator não guarda estado de conversa
+        self._orchestrators: "OrderedDict[Tuple[str, int], AgentOrchestrator]" = OrderedDict()
         
         logger.info("[ConversationService] ✅ Inicializado com suporte a multi-agentes")
 
+    def get_orchestrator(self, agent_config: AgentConfigEntity) -> AgentOrchestrator:
+        """
+        Orchestrator do agente, reaproveitado enquanto o conteúdo da
+        configuração (content_hash) e o registro de tools não mudam.
+        """
+        key = (agent_config.content_hash(), ToolRegistry.version)
+        orchestrator = self._orchestrators.get(key)
+        if orchestrator is not None:
+            self._orchestrators.move_to_end(key)
+            return orchestrator
+
+        orchestrator = AgentOrchestrator(
+            llm_client=self.llm_client,
+            agent_config=agent_config
+        )
+        self._orchestrators[key] = orchestrator
+        while len(self._orchestrators) > self.ORCHESTRATOR_CACHE_MAX_ENTRIES:
+            self._orchestrators.popitem(last=False)
+        return orchestrator
+
     def _get_redis_key(self, sender_id: str, instance: str) -> str:
-        """Gera chave única para Redis"""
-        return f"conversation:{sender_id}:{instance}"
+        """Gera chave única para Redis (hash tag por conversa, ver RedisKeys)"""
+        return RedisKeys.conversation_context(sender_id, instance)
 
     async def _load_context_from_redis(self, sender_id: str, instance: str) -> Optional[ConversationContext]:
-        """Carrega contexto do Redis"""
+        """Carrega contexto do cache L1 ou do Redis (com a versão usada no compare-and-set)"""
         try:
             key = self._get_redis_key(sender_id, instance)
-            context_data = self.redis.get(key)
+            
+            if self.context_cache:
+                context = self.context_cache.take(key)
+                if context:
+                    logger.info(f"[{sender_id}] ✅ Contexto carregado do cache local (versão {context.version})")
+                    return context
+            
+            context_data, version = await self.context_store.load(key)
             
             if context_data:
+                Metrics.incr("context.tier.hot_hits")
                 context = ConversationContext.from_dict(context_data)
-                logger.info(f"[{sender_id}] ✅ Contexto carregado do Redis")
+                context.version = version
+                logger.info(f"[{sender_id}] ✅ Contexto carregado do Redis (versão {version})")
                 return context
+            
+            # Contextos gravados antes do esquema com hash tag: migram no próximo save
+            legacy_data, _ = await self.context_store.load(
+                RedisKeys.legacy_conversation_context(sender_id, instance)
+            )
+            if legacy_data:
+                Metrics.incr("context.tier.hot_hits")
+                logger.info(f"[{sender_id}] ✅ Contexto carregado da chave antiga do Redis")
+                return ConversationContext.from_dict(legacy_data)
+            
+            # Conversa ociosa: o contexto pode estar no armazenamento frio
+            if self.context_tiering:
+                cold = await self.context_tiering.rehydrate(key)
+                if cold:
+                    context_data, version = cold
+                    context = ConversationContext.from_dict(context_data)
+                    context.version = version
+                    return context
+            else:
+                Metrics.incr("context.tier.misses")
             return None
         except Exception as e:
             logger.error(f"[{sender_id}] ❌ Erro ao carregar do Redis: {e}")
             return None
 
-    async def _save_context_to_redis(self, context: ConversationContext, instance: str, ttl_seconds: int = 86400):
-        """Salva contexto no Redis com TTL"""
-        try:
-            key = self._get_redis_key(context.sender_id, instance)
-            context_dict = context.to_dict()
-            self.redis.set(key, context_dict, ttl_seconds=ttl_seconds)
-            logger.info(f"[{context.sender_id}] ✅ Contexto salvo no Redis (TTL: {ttl_seconds}s)")
-        except Exception as e:
-            logger.error(f"[{context.sender_id}] ❌ Erro ao salvar no Redis: {e}")
+    async def _save_context_to_redis(
+        self,
+        context: ConversationContext,
+        instance: str,
+        ttl_seconds: Optional[int] = None,
+        write_token: Optional[str] = None
+    ) -> ConversationContext:
+        """
+        Salva contexto no Redis com TTL usando compare-and-set.
+        Se outro turno salvou antes (versão diferente), recarrega o contexto
+        remoto, reaplica as mensagens/decisões deste turno e tenta de novo.
+        Erros (e conflitos esgotados) propagam: o PostTurnPipeline repete.
+
+        `write_token` identifica o turno: se uma tentativa anterior gravou mas
+        a resposta se perdeu (timeout), o retry é reconhecido pelo store em
+        vez de virar conflito e mesclar o turno uma segunda vez.
+        """
+        key = self._get_redis_key(context.sender_id, instance)
+        ttl_seconds = ttl_seconds or settings.CONTEXT_HOT_TTL_SECONDS
+        for attempt in range(self.CONTEXT_SAVE_MAX_RETRIES + 1):
+            saved, version = await self.context_store.compare_and_set(
+                key,
+                context.to_dict(),
+                expected_version=context.version,
+                ttl_seconds=ttl_seconds,
+                write_token=write_token
+            )
+            if saved and version != context.version + 1:
+                # Gravado por uma tentativa anterior deste turno, talvez já mesclado
+                # com outro: o contexto salvo é o do store, não este
+                Metrics.incr("context.save.replayed")
+                remote_data, version = await self.context_store.load(key)
+                context = ConversationContext.from_dict(remote_data)
+            if saved:
+                context.mark_synced(version)
+                logger.info(f"[{context.sender_id}] ✅ Contexto salvo no Redis (versão {version}, TTL: {ttl_seconds}s)")
+                try:
+                    if self.context_cache:
+                        self.context_cache.put(key, context)
+                        await self.context_cache.publish(key, version)
+                    if self.context_tiering:
+                        await self.context_tiering.touch(key)
+                except Exception as e:
+                    # O contexto já foi gravado: repetir o passo mesclaria o turno de novo.
+                    # Sem a invalidação, outro worker só perde um compare-and-set.
+                    logger.warning(f"[{context.sender_id}] ⚠️ Contexto salvo, mas cache/atividade não atualizados: {e}")
+                return context
+            
+            Metrics.incr("context.save.conflicts")
+            logger.warning(
+                f"[{context.sender_id}] ⚠️ Conflito ao salvar contexto "
+                f"(esperada {context.version}, atual {version}), mesclando"
+            )
+            
+            remote_data, remote_version = await self.context_store.load(key)
+            remote = (
+                ConversationContext.from_dict(remote_data)
+                if remote_data else ConversationContext(sender_id=context.sender_id)
+            )
+            remote.version = remote_version
+            context = context.merge_into(remote)
+            Metrics.incr("context.save.retries")
+        
+        Metrics.incr("context.save.failures")
+        raise RuntimeError(f"Contexto não salvo após {self.CONTEXT_SAVE_MAX_RETRIES} tentativas (conflitos)")
 
     async def _load_or_create_conversation(
         self, 
@@ -78,94 +217,136 @@ class ConversationService(IConversationService):
         instance: str, 
         channel: str
     ) -> ConversationEntity:
-        """Carrega conversa existente ou cria nova"""
-        conversation = await self.conversation_repo.get_active_conversation(
+        """Carrega conversa existente ou cria nova (um único upsert no banco)"""
+        conversation, created = await self.conversation_repo.upsert_active(
             sender_id=sender_id,
             instance=instance,
             channel=channel
         )
         
-        if not conversation:
-            conversation = await self.conversation_repo.create(
-                ConversationEntity(
-                    sender_id=sender_id,
-                    instance=instance,
-                    channel=channel
-                )
-            )
+        if created:
             logger.info(f"[{sender_id}] ✅ Nova conversa criada: {conversation.id}")
         else:
-            # Atualiza timestamp da última mensagem
-            await self.conversation_repo.touch(conversation.id)
             logger.info(f"[{sender_id}] ✅ Conversa existente carregada: {conversation.id}")
         
         return conversation
 
-    async def _load_historical_messages(
+    async def _sync_history(
         self, 
         context: ConversationContext, 
-        conversation_id
+        conversation: ConversationEntity,
+        is_new_context: bool
     ):
-        """Carrega mensagens históricas do PostgreSQL e adiciona ao contexto"""
+        """
+        Sincroniza mensagens do PostgreSQL para o contexto usando a marca d'água.
+        
+        - Contexto frio (não veio do Redis): carrega as 50 mensagens mais recentes.
+        - Contexto quente: só consulta o banco se a conversa recebeu mensagens
+          depois da marca d'água (outro writer avançou sem atualizar o Redis),
+          trazendo apenas as mais novas. No caminho comum não há leitura.
+        """
+        last_message_at = self._as_naive_utc(conversation.last_message_at)
+        if last_message_at is None:
+            return  # conversa nova, nada no banco
+        
+        if not is_new_context and context.history_watermark is None:
+            # Contexto anterior à marca d'água: assume que já está sincronizado
+            context.history_watermark = last_message_at
+            return
+        
+        if not is_new_context and last_message_at <= context.history_watermark:
+            return
+        
         try:
-            messages = await self.message_repo.list_by_conversation(
-                conversation_id=conversation_id,
-                limit=50  # Últimas 50 mensagens
-            )
-            
-            # Adiciona mensagens ao contexto (apenas se não estiverem já lá)
-            existing_count = len(context.messages)
-            for msg in messages:
-                # Verifica se já existe (evita duplicatas)
-                if not any(
-                    m.role == msg.role and m.content == msg.content 
-                    for m in context.messages
-                ):
-                    from src.Domain.entities.conversationContextEntity import Message
-                    context.messages.append(
-                        Message(
-                            role=msg.role,
-                            content=msg.content,
-                            timestamp=msg.created_at
-                        )
-                    )
+            if is_new_context:
+                messages = await self.message_repo.list_recent(
+                    conversation_id=conversation.id,
+                    limit=50  # Últimas 50 mensagens
+                )
+            else:
+                messages = await self.message_repo.list_after(
+                    conversation_id=conversation.id,
+                    after=context.history_watermark,
+                    limit=50
+                )
             
-            if len(context.messages) > existing_count:
-                logger.info(
-                    f"[{context.sender_id}] ✅ {len(context.messages) - existing_count} mensagens históricas carregadas"
+            # Dedup por id: uma linha já trazida por outro turno não entra duas vezes
+            added = context.add_history_messages([
+                Message(
+                    role=msg.role,
+                    content=msg.content,
+                    timestamp=self._as_naive_utc(msg.created_at),
+                    id=str(msg.id) if msg.id else None
                 )
+                for msg in messages
+            ])
+            
+            if added:
+                logger.info(f"[{context.sender_id}] ✅ {added} mensagens históricas carregadas")
         except Exception as e:
             logger.error(f"[{context.sender_id}] ❌ Erro ao carregar mensagens históricas: {e}")
 
-    async def _save_messages_to_db(
+    @staticmethod
+    def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+        """Normaliza datas do banco (timestamptz) para UTC sem fuso, como o resto do serviço"""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    async def _save_messages_to_db(self, conversation_id, messages: List[MessageEntity]):
+        """
+        Salva as mensagens do turno no PostgreSQL (um INSERT ou o buffer).
+        As entidades já trazem id: um retry depois de um commit não duplica.
+        """
+        if self.message_writer:
+            await self.message_writer.add(messages)
+            logger.info(f"[Conversation {conversation_id}] ✅ Mensagens enfileiradas para o PostgreSQL")
+        else:
+            await self.message_repo.create_many(messages)
+            logger.info(f"[Conversation {conversation_id}] ✅ Mensagens salvas no PostgreSQL")
+
+    async def _persist_turn(
         self,
+        context: ConversationContext,
+        instance: str,
         conversation_id,
-        user_message: str,
-        assistant_message: str
+        turn_messages: List[Message],
+        received_at: datetime,
+        replied_at: datetime
     ):
-        """Salva mensagens do usuário e assistente no PostgreSQL"""
-        try:
-            # Salva mensagem do usuário
-            await self.message_repo.create(
-                MessageEntity(
-                    conversation_id= conversation_id,
-                    role="user",
-                    content=user_message
-                )
-            )
-            
-            # Salva mensagem do assistente
-            await self.message_repo.create(
-                MessageEntity(
-                    conversation_id= conversation_id,
-                    role="assistant",
-                    content=assistant_message
-                )
+        """
+        Contexto (Redis), mensagens (PostgreSQL) e índice de atividade são
+        independentes: rodam em paralelo. Com o PostTurnPipeline, depois da
+        resposta e com retries (os passos propagam as falhas).
+        """
+        # Mesmos ids das mensagens no contexto: os retries regravam as mesmas
+        # linhas e o sync/merge reconhece o turno pelo id
+        messages = [
+            MessageEntity(
+                id=UUID(message.id),
+                conversation_id=conversation_id,
+                role=message.role,
+                content=message.content,
+                created_at=received_at if message.role == "user" else replied_at
             )
-            
-            logger.info(f"[Conversation {conversation_id}] ✅ Mensagens salvas no PostgreSQL")
-        except Exception as e:
-            logger.error(f"[Conversation {conversation_id}] ❌ Erro ao salvar mensagens: {e}")
+            for message in turn_messages
+        ]
+        write_token = uuid4().hex
+        steps = [
+            lambda: self._save_context_to_redis(context, instance, write_token=write_token),
+            lambda: self._save_messages_to_db(conversation_id, messages)
+        ]
+        if self.conversation_sweeper:
+            steps.append(lambda: self.conversation_sweeper.touch(instance, conversation_id, context.sender_id))
+
+        if self.post_turn:
+            await self.post_turn.submit(self._get_redis_key(context.sender_id, instance), *steps)
+            return
+
+        results = await asyncio.gather(*(step() for step in steps), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"[Conversation {conversation_id}] ❌ Erro ao persistir turno: {result}")
 
     async def process_message(
         self,
@@ -181,21 +362,21 @@ class ConversationService(IConversationService):
         3. Carrega/cria conversa no PostgreSQL
         4. Carrega mensagens históricas se necessário
         5. Processa com agente específico
-        6. Salva tudo (Redis + PostgreSQL)
+        6. Salva tudo (Redis + PostgreSQL), em background com o PostTurnPipeline
         """
         logger.info(f"[{sender_id}] 📨 Processando mensagem: {text[:100]}...")
         
         # ========== 1. RESOLVE QUAL AGENTE USAR ==========
-        agent_config = await self.agent_config_service.get_by_phone_number(instance)
+        agent_config = await self.agent_config_service.get_agent_for_phone(instance)
         logger.info(f"[{sender_id}] 🤖 Usando agente: {agent_config.name} (personalidade: {agent_config.personality})")
         
-        # ========== 2. CRIA ORCHESTRATOR COM CONFIG ESPECÍFICA ==========
-        agent = AgentOrchestrator(
-            llm_client=self.llm_client,
-            agent_config=agent_config
-        )
+        # ========== 2. ORCHESTRATOR DO AGENTE (CACHE POR VERSÃO DA CONFIG) ==========
+        agent = self.get_orchestrator(agent_config)
         
         # ========== 3. CARREGA CONTEXTO DO REDIS ==========
+        # Turno anterior desta conversa ainda persistindo: espera para não ler contexto velho
+        if self.post_turn:
+            await self.post_turn.wait(self._get_redis_key(sender_id, instance))
         context = await self._load_context_from_redis(sender_id, instance)
         
         # ========== 4. CARREGA/CRIA CONVERSA NO POSTGRESQL ==========
@@ -206,28 +387,37 @@ class ConversationService(IConversationService):
         )
         
         # ========== 5. INICIALIZA CONTEXTO SE NÃO EXISTIR ==========
-        if not context:
+        is_new_context = context is None
+        if is_new_context:
             context = ConversationContext(sender_id=sender_id)
             logger.info(f"[{sender_id}] ✅ Novo contexto criado")
-            
-            # Carrega mensagens históricas da conversa
-            await self._load_historical_messages(context, conversation.id)
-        else:
-            # Mesmo com contexto no Redis, pode haver mensagens novas no DB
-            # (em caso de múltiplas instâncias ou recuperação)
-            await self._load_historical_messages(context, conversation.id)
+        
+        # Base para o merge em caso de conflito ao salvar (antes do sync do
+        # histórico: as linhas trazidas do banco também entram no delta)
+        context.mark_synced(context.version)
+        
+        # Histórico do PostgreSQL: só quando o Redis estava frio ou outro
+        # writer avançou a conversa depois da marca d'água
+        await self._sync_history(context, conversation, is_new_context)
         
         # ========== 6. PROCESSA MENSAGEM COM AGENTE ESPECÍFICO ==========
+        received_at = datetime.utcnow()
+        turn_start = len(context.messages)
         response_package = await agent.process_message(context, text)
+        replied_at = datetime.utcnow()
+        turn_messages = context.messages[turn_start:]
         
-        # ========== 7. SALVA CONTEXTO NO REDIS ==========
-        await self._save_context_to_redis(context, instance, ttl_seconds=86400)
+        # As mensagens deste turno serão gravadas com estes timestamps
+        context.history_watermark = replied_at
         
-        # ========== 8. SALVA MENSAGENS NO POSTGRESQL ==========
-        await self._save_messages_to_db(
+        # ========== 7. SALVA CONTEXTO E MENSAGENS (fora do caminho da resposta) ==========
+        await self._persist_turn(
+            context=context,
+            instance=instance,
             conversation_id=conversation.id,
-            user_message=text,
-            assistant_message=response_package.text
+            turn_messages=turn_messages,
+            received_at=received_at,
+            replied_at=replied_at
         )
         
         logger.info(f"[{sender_id}] ✅ Processamento completo com agente '{agent_config.name}'")
@@ -1,2 +1,7 @@
 from .whatsAppOrchestratorService import WhatsAppOrchestratorService
-from .ConversationService import ConversationService
\ No newline at end of file
+from .ConversationService import ConversationService
+from .contextTieringService import ContextTieringService
+from .postTurnPipeline import PostTurnPipeline
+from .conversationSweeperService import ConversationSweeperService
+from .conversationArchiveService import ConversationArchiveService
+from .warmupService import WarmupService
@@ -1,23 +1,57 @@
+import json
 import logging
-from typing import Optional, Dict
+import time
+from uuid import UUID
+from typing import Optional, Dict, List, Tuple
+from src.config import settings
 from src.Domain import (
     IAgentConfigRepository,
+    IRedisRepository,
     AgentConfigEntity
 )
+from src.Infrastructure import Metrics, RedisKeys
 
 logger = logging.getLogger(__name__)
 
+Metrics.register_ratio("agent_config.l1.hit_ratio", "agent_config.l1.hits", "agent_config.l2.hits", "agent_config.misses")
+Metrics.register_ratio("agent_config.l2.hit_ratio", "agent_config.l2.hits", "agent_config.misses")
+
 
 class AgentConfigService:
     """
-    Serviço para gerenciar configurações de agentes.
-    Implementa cache em memória para performance.
+    Resolve o agente de cada número (instance) com cache em dois níveis:
+
+    - L1: dicionário em processo, com TTL (AGENT_CONFIG_CACHE_TTL_SECONDS).
+    - L2: Redis compartilhado pelos workers (AGENT_CONFIG_REDIS_TTL_SECONDS),
+      opcional; sem ele, cada worker vai ao banco uma vez por TTL.
+
+    Números sem mapeamento também ficam em cache (negativo, TTL menor) e
+    resolvem para o agente padrão, então um número desconhecido não faz
+    o JOIN a cada mensagem nem derruba o turno.
     """
 
-    def __init__(self, agent_config_repo: IAgentConfigRepository):
+    # Valor em cache para "número sem agente mapeado"
+    _UNMAPPED = {"unmapped": True}
+
+    # Canal do NOTIFY emitido pelos triggers de agent_configs/agent_phone_mappings
+    CHANNEL = "agent_config_changed"
+
+    def __init__(
+        self,
+        agent_config_repo: IAgentConfigRepository,
+        redis: Optional[IRedisRepository] = None,
+        ttl_seconds: int = 300,
+        negative_ttl_seconds: int = 60,
+        redis_ttl_seconds: int = 600
+    ):
         self.agent_config_repo = agent_config_repo
-        self._cache: Dict[str, AgentConfigEntity] = {}
-        self._default_agent: Optional[AgentConfigEntity] = None
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        # número → (agente ou None se não mapeado, expira em)
+        self._cache: Dict[str, Tuple[Optional[AgentConfigEntity], float]] = {}
+        self._default_agent: Optional[Tuple[AgentConfigEntity, float]] = None
 
     async def get_agent_for_phone(self, phone_number: str) -> AgentConfigEntity:
         """
@@ -30,28 +64,73 @@ class AgentConfigService:
         Returns:
             AgentConfigEntity configurado para o número ou agente padrão
         """
-        # Verifica cache primeiro
-        if phone_number in self._cache:
-            logger.info(f"[AgentConfig] ✅ Agente para '{phone_number}' encontrado no cache: {self._cache[phone_number].name}")
-            return self._cache[phone_number]
+        entry = self._cache.get(phone_number)
+        if entry and entry[1] > time.monotonic():
+            Metrics.incr("agent_config.l1.hits")
+            return entry[0] or await self._unmapped(phone_number)
 
-        # Busca no banco
         try:
-            agent = await self.agent_config_repo.get_by_phone_number(phone_number)
-            
-            if agent:
-                # Armazena no cache
-                self._cache[phone_number] = agent
-                logger.info(f"[AgentConfig] ✅ Agente para '{phone_number}' carregado do DB: {agent.name}")
-                return agent
+            found, agent = await self._get_from_redis(phone_number)
+            if found:
+                Metrics.incr("agent_config.l2.hits")
             else:
-                logger.warning(f"[AgentConfig] ⚠️ Nenhum agente mapeado para '{phone_number}', usando agente padrão")
-                return await self.get_default_agent()
-                
+                Metrics.incr("agent_config.misses")
+                agent = await self.agent_config_repo.get_by_phone_number(phone_number)
+                await self._set_in_redis(phone_number, agent)
+                if agent:
+                    logger.info(f"[AgentConfig] ✅ Agente para '{phone_number}' carregado do DB: {agent.name}")
+                else:
+                    logger.warning(f"[AgentConfig] ⚠️ Nenhum agente mapeado para '{phone_number}', usando agente padrão")
         except Exception as e:
             logger.error(f"[AgentConfig] ❌ Erro ao buscar agente para '{phone_number}': {e}")
             return await self.get_default_agent()
 
+        ttl = self.ttl_seconds if agent else self.negative_ttl_seconds
+        self._cache[phone_number] = (agent, time.monotonic() + ttl)
+        return agent or await self._unmapped(phone_number)
+
+    async def _unmapped(self, phone_number: str) -> AgentConfigEntity:
+        Metrics.incr("agent_config.unmapped")
+        return await self.get_default_agent()
+
+    def prime(self, agent: AgentConfigEntity, phone_numbers: List[str]):
+        """Coloca no L1 um agente já carregado (warm-up), sem ir ao banco"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        for phone_number in phone_numbers:
+            # Número mapeado para mais de um agente: fica o primeiro, como no LIMIT 1
+            self._cache.setdefault(phone_number, (agent, expires_at))
+
+    # ========== L2 (REDIS) ==========
+
+    async def _get_from_redis(self, phone_number: str) -> Tuple[bool, Optional[AgentConfigEntity]]:
+        """(encontrado?, agente); encontrado com agente None = número sem mapeamento"""
+        if not self.redis:
+            return False, None
+        try:
+            data = await self.redis.get(RedisKeys.agent_config(phone_number))
+        except Exception as e:
+            logger.error(f"[AgentConfig] ❌ Erro ao ler cache L2 de '{phone_number}': {e}")
+            return False, None
+
+        if data is None:
+            return False, None
+        if data == self._UNMAPPED:
+            return True, None
+        return True, AgentConfigEntity.from_dict(data)
+
+    async def _set_in_redis(self, phone_number: str, agent: Optional[AgentConfigEntity]):
+        if not self.redis:
+            return
+        try:
+            await self.redis.set(
+                RedisKeys.agent_config(phone_number),
+                agent.to_dict() if agent else self._UNMAPPED,
+                ttl_seconds=self.redis_ttl_seconds if agent else self.negative_ttl_seconds
+            )
+            await self.redis.sadd(RedisKeys.AGENT_CONFIG_CACHED_PHONES, phone_number)
+        except Exception as e:
+            logger.error(f"[AgentConfig] ❌ Erro ao gravar cache L2 de '{phone_number}': {e}")
+
     async def get_default_agent(self) -> AgentConfigEntity:
         """
         Retorna o agente padrão (fallback).
@@ -61,15 +140,15 @@ class AgentConfigService:
             AgentConfigEntity padrão
         """
         # Verifica cache
-        if self._default_agent:
-            return self._default_agent
+        if self._default_agent and self._default_agent[1] > time.monotonic():
+            return self._default_agent[0]
 
         # Busca no banco
         try:
             agent = await self.agent_config_repo.get_default_agent()
             
             if agent:
-                self._default_agent = agent
+                self._default_agent = (agent, time.monotonic() + self.ttl_seconds)
                 logger.info(f"[AgentConfig] ✅ Agente padrão carregado: {agent.name}")
                 return agent
             else:
@@ -100,19 +179,71 @@ class AgentConfigService:
             is_active=True
         )
         
-        self._default_agent = fallback_agent
+        self._default_agent = (fallback_agent, time.monotonic() + self.ttl_seconds)
         logger.info("[AgentConfig] ✅ Agente fallback criado em memória")
         
         return fallback_agent
 
-    def clear_cache(self):
-        """Limpa o cache de agentes (útil para recarregar configurações)"""
+    async def clear_cache(self):
+        """Limpa o cache de agentes (L1 deste worker e L2 compartilhado)"""
+        self.clear_local()
+        if self.redis:
+            try:
+                for phone_number in await self.redis.smembers(RedisKeys.AGENT_CONFIG_CACHED_PHONES):
+                    await self.redis.delete(RedisKeys.agent_config(phone_number))
+                await self.redis.delete(RedisKeys.AGENT_CONFIG_CACHED_PHONES)
+            except Exception as e:
+                logger.error(f"[AgentConfig] ❌ Erro ao limpar cache L2: {e}")
+        logger.info("[AgentConfig] 🔄 Cache de agentes limpo")
+
+    # ========== INVALIDAÇÃO (LISTEN/NOTIFY) ==========
+
+    def clear_local(self):
+        """Limpa só o L1 deste worker"""
         self._cache.clear()
         self._default_agent = None
-        logger.info("[AgentConfig] 🔄 Cache de agentes limpo")
+
+    async def on_listener_connect(self):
+        """
+        (Re)conexão do LISTEN: avisos perdidos enquanto esteve desconectado
+        podem ter deixado o L2 compartilhado velho, então limpa os dois níveis
+        """
+        await self.clear_cache()
+
+    async def handle_notification(self, payload: str):
+        """
+        Aplica um NOTIFY de agent_config_changed:
+        {"table", "op", "agent_id", "phone_numbers"}.
+
+        Remove do L1 os números citados e os que apontam para o agente; todos
+        os workers recebem o mesmo aviso, então cada um apaga também o L2
+        (idempotente). O agente padrão é recarregado em qualquer mudança.
+        """
+        change = json.loads(payload)
+        agent_id = UUID(change["agent_id"]) if change.get("agent_id") else None
+        phone_numbers = set(change.get("phone_numbers") or [])
+
+        phone_numbers |= {
+            phone for phone, (agent, _) in self._cache.items()
+            if agent is not None and agent.id == agent_id
+        }
+        for phone_number in phone_numbers:
+            self._cache.pop(phone_number, None)
+        self._default_agent = None
+
+        if self.redis:
+            for phone_number in phone_numbers:
+                await self.redis.delete(RedisKeys.agent_config(phone_number))
+
+        Metrics.incr("agent_config.invalidations")
+        logger.info(
+            f"[AgentConfig] 🔔 {change.get('table')} {change.get('op')}: "
+            f"cache invalidado para {sorted(phone_numbers) or 'agente padrão'}"
+        )
 
     async def reload_agent(self, phone_number: str):
         """Recarrega um agente específico do banco"""
-        if phone_number in self._cache:
-            del self._cache[phone_number]
+        self._cache.pop(phone_number, None)
+        if self.redis:
+            await self.redis.delete(RedisKeys.agent_config(phone_number))
         await self.get_agent_for_phone(phone_number)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import settings
+from src.Domain import IRedisRepository, IContextSnapshotRepository
+from src.Infrastructure import ContextCache, ContextCodec, Metrics, RedisKeys
+
+logger = logging.getLogger(__name__)
+
+Metrics.register_ratio("context.tier.hot_ratio", "context.tier.hot_hits", "context.tier.cold_hits", "context.tier.misses")
+Metrics.register_ratio("context.tier.cold_ratio", "context.tier.cold_hits", "context.tier.hot_hits", "context.tier.misses")
+
+
+class ContextTieringService:
+    """
+    Política de camadas para contextos de conversa:
+
+    - Quente: Redis, com TTL curto (CONTEXT_HOT_TTL_SECONDS).
+    - Frio: snapshot no PostgreSQL para conversas ociosas há mais de
+      CONTEXT_IDLE_OFFLOAD_SECONDS, removidas do Redis pelo `offload_idle`.
+
+    A atividade de cada contexto fica em sorted sets (score = último uso),
+    divididos em shards por RedisKeys.context_activity_index, assim o offload
+    encontra os ociosos sem varrer o keyspace. O contexto volta ao Redis
+    (`rehydrate`) na próxima mensagem do usuário.
+
+    Cada contexto movido também sai do ContextCache de todos os workers:
+    sem isso, um pod continuaria servindo (e tentando salvar por CAS) a
+    versão que já não existe no Redis.
+    """
+
+    def __init__(
+        self,
+        redis: IRedisRepository,
+        snapshot_repo: IContextSnapshotRepository,
+        context_cache: Optional[ContextCache] = None
+    ):
+        self.redis = redis
+        self.snapshot_repo = snapshot_repo
+        self.context_cache = context_cache
+        self.codec = ContextCodec()
+        self.hot_ttl_seconds = settings.CONTEXT_HOT_TTL_SECONDS
+        self.idle_seconds = settings.CONTEXT_IDLE_OFFLOAD_SECONDS
+
+    async def touch(self, key: str):
+        """Registra atividade do contexto (adia o offload)"""
+        await self.redis.zadd(RedisKeys.context_activity_index(key), key, time.time())
+
+    async def forget(self, key: str):
+        """Tira o contexto do índice de atividade e da camada fria (conversa encerrada)"""
+        await self.redis.zrem(RedisKeys.context_activity_index(key), key)
+        await self.snapshot_repo.delete(key)
+
+    async def rehydrate(self, key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Traz um contexto do armazenamento frio de volta para o Redis.
+        Retorna (dados, versão no Redis) ou None se não houver snapshot.
+        """
+        snapshot = await self.snapshot_repo.get(key)
+        if not snapshot:
+            Metrics.incr("context.tier.misses")
+            return None
+
+        payload, snapshot_version = snapshot
+        data = self.codec.decode(payload)
+
+        # A versão continua depois da do snapshot (e não volta a 1): um worker
+        # que ainda tenha o contexto de antes do offload não grava por cima (ABA)
+        saved, version = await self.redis.set_versioned_if_absent(
+            key, data, snapshot_version + 1, ttl_seconds=self.hot_ttl_seconds
+        )
+        if not saved:
+            # Outro worker reidratou primeiro: usa a versão dele
+            data, version = await self.redis.get_versioned(key)
+
+        await self.touch(key)
+        await self.snapshot_repo.delete(key)
+        Metrics.incr("context.tier.cold_hits")
+        logger.info(f"[ContextTiering] ❄️ → 🔥 Contexto {key} reidratado do PostgreSQL")
+        return data, version
+
+    async def offload_idle(self, batch_size: int = 200) -> int:
+        """Move para o PostgreSQL os contextos ociosos e os remove do Redis"""
+        cutoff = time.time() - self.idle_seconds
+        keys = []
+        for index in RedisKeys.context_activity_indexes():
+            if len(keys) >= batch_size:
+                break
+            keys += await self.redis.zrange_by_score(index, cutoff, batch_size - len(keys))
+        moved = 0
+
+        for key in keys:
+            index = RedisKeys.context_activity_index(key)
+            try:
+                data, version = await self.redis.get_versioned(key)
+                if data is None:
+                    # Expirou pelo TTL antes do offload
+                    await self.redis.zrem(index, key)
+                    Metrics.incr("context.tier.expired")
+                    continue
+
+                await self.snapshot_repo.save(key, self.codec.encode(data), version)
+
+                # Só remove se nenhum turno gravou nesse meio tempo
+                if await self.redis.delete_if_version(key, version):
+                    await self.redis.zrem(index, key)
+                    if self.context_cache:
+                        await self.context_cache.evict(key)
+                    moved += 1
+                else:
+                    # Voltou a ficar ativo: o snapshot já nasce desatualizado
+                    await self.snapshot_repo.delete(key)
+            except Exception as e:
+                logger.error(f"[ContextTiering] ❌ Erro ao mover {key} para o PostgreSQL: {e}")
+
+        if moved:
+            Metrics.incr("context.tier.offloaded", moved)
+            logger.info(f"[ContextTiering] 🔥 → ❄️ {moved} contextos ociosos movidos para o PostgreSQL")
+        return moved
+
+    async def run(self, interval_seconds: int, batch_size: int):
+        """Loop de offload; um único worker por intervalo (lock no Redis)"""
+        while True:
+            try:
+                if await self.redis.set_if_absent(RedisKeys.CONTEXT_OFFLOAD_LOCK, 1, ttl_seconds=interval_seconds):
+                    while await self.offload_idle(batch_size) == batch_size:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ContextTiering] ❌ Erro no ciclo de offload: {e}")
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from src.Domain import IConversationArchiveRepository
+from src.Infrastructure import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationArchiveService:
+    """
+    Retenção: conversas encerradas há mais de `retention_days` vão para o
+    arquivo comprimido em lotes de `batch_size` (ver ConversationArchiveRepository),
+    mantendo `conversations` e `messages` do tamanho do período ativo.
+    """
+
+    def __init__(self, archive_repo: IConversationArchiveRepository, retention_days: int):
+        self.archive_repo = archive_repo
+        self.retention_days = retention_days
+
+    async def archive_closed(self, batch_size: int = 200) -> int:
+        """Arquiva tudo o que passou da retenção; retorna o total de conversas movidas"""
+        started = time.perf_counter()
+        closed_before = datetime.utcnow() - timedelta(days=self.retention_days)
+        archived = 0
+
+        while True:
+            moved = await self.archive_repo.archive_batch(closed_before, batch_size)
+            archived += moved
+            if moved:
+                Metrics.incr("conversations.archive.archived", moved)
+                Metrics.incr("conversations.archive.batches")
+            if moved < batch_size:
+                break
+
+        if archived:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"[ConversationArchive] 📦 {archived} conversas arquivadas "
+                f"em {elapsed:.1f}s ({archived / elapsed:.0f}/s)"
+            )
+        return archived
+
+    async def run(self, interval_seconds: int, batch_size: int):
+        """Loop de arquivamento (o advisory lock do repositório garante um job por vez)"""
+        while True:
+            try:
+                await self.archive_closed(batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ConversationArchive] ❌ Erro no ciclo de arquivamento: {e}")
+            await asyncio.sleep(interval_seconds)
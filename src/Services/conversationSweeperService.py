@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from src.config import settings
+from src.Domain import IRedisRepository, IConversationRepository, IAgentConfigRepository, IContextStore
+from src.Infrastructure import ContextCache, Metrics, RedisKeys
+from src.Services.contextTieringService import ContextTieringService
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSweeperService:
+    """
+    Encerra conversas ociosas há mais que o limite do agente da instance
+    (agent_configs.idle_close_minutes, ou CONVERSATION_IDLE_CLOSE_MINUTES).
+
+    Cada turno registra a conversa no sorted set da sua instance
+    (RedisKeys.conversation_activity_index, score = última mensagem); o
+    sweep lê os candidatos por score, sem varrer a tabela, e os encerra em
+    lotes com um UPDATE por lote. O banco continua sendo a fonte da verdade:
+    o UPDATE confere status e last_message_at de novo.
+
+    Cada lote sai do índice com remoção condicionada ao score (script Lua):
+    candidatos tocados depois da leitura continuam lá com o score novo; os
+    demais que o banco não encerrou (já fechados) saem, e a próxima
+    mensagem da conversa os registra de novo.
+    """
+
+    def __init__(
+        self,
+        redis: IRedisRepository,
+        conversation_repo: IConversationRepository,
+        agent_config_repo: IAgentConfigRepository,
+        context_store: IContextStore,
+        context_cache: Optional[ContextCache] = None,
+        context_tiering: Optional[ContextTieringService] = None
+    ):
+        self.redis = redis
+        self.conversation_repo = conversation_repo
+        self.agent_config_repo = agent_config_repo
+        self.context_store = context_store
+        self.context_cache = context_cache
+        self.context_tiering = context_tiering
+        self.default_idle_minutes = settings.CONVERSATION_IDLE_CLOSE_MINUTES
+
+    async def touch(self, instance: str, conversation_id: UUID, sender_id: str):
+        """Registra atividade da conversa (adia o encerramento)"""
+        await self.redis.zadd(
+            RedisKeys.conversation_activity_index(instance),
+            f"{conversation_id}|{sender_id}",
+            time.time()
+        )
+        await self.redis.sadd(RedisKeys.CONVERSATION_ACTIVITY_INSTANCES, instance)
+
+    async def sweep(self, batch_size: int = 500) -> int:
+        """Encerra todas as conversas ociosas; retorna quantas foram encerradas"""
+        started = time.perf_counter()
+        thresholds = await self.agent_config_repo.get_idle_thresholds()
+        closed = 0
+
+        for instance in await self.redis.smembers(RedisKeys.CONVERSATION_ACTIVITY_INSTANCES):
+            idle_minutes = thresholds.get(instance) or self.default_idle_minutes
+            try:
+                closed += await self._sweep_instance(instance, idle_minutes, batch_size)
+            except Exception as e:
+                logger.error(f"[ConversationSweeper] ❌ Erro ao encerrar conversas de {instance}: {e}")
+
+        elapsed = time.perf_counter() - started
+        Metrics.observe("conversations.sweep.duration_ms", elapsed * 1000)
+        if closed:
+            Metrics.incr("conversations.sweep.closed", closed)
+            Metrics.observe("conversations.sweep.closed_per_second", closed / elapsed)
+            logger.info(
+                f"[ConversationSweeper] 💤 {closed} conversas ociosas encerradas "
+                f"em {elapsed:.2f}s ({closed / elapsed:.0f}/s)"
+            )
+        return closed
+
+    async def _sweep_instance(self, instance: str, idle_minutes: int, batch_size: int) -> int:
+        index = RedisKeys.conversation_activity_index(instance)
+        cutoff = time.time() - idle_minutes * 60
+        idle_before = datetime.utcnow() - timedelta(minutes=idle_minutes)
+        closed = 0
+
+        while True:
+            members = await self.redis.zrange_by_score(index, cutoff, batch_size)
+            if not members:
+                return closed
+
+            ids = self._parse_ids(members)
+            conversations = await self.conversation_repo.close_idle(ids, idle_before)
+            for conversation in conversations:
+                await self._clear_context(conversation.sender_id, instance)
+
+            # Só sai do índice quem não foi tocado desde a leitura: uma conversa
+            # que recebeu mensagem agora tem score novo e continua no índice
+            await self.redis.zrem_if_score_at_most(index, cutoff, *members)
+            closed += len(conversations)
+            Metrics.incr("conversations.sweep.batches")
+
+            if len(members) < batch_size:
+                return closed
+
+    @staticmethod
+    def _parse_ids(members: List[str]) -> List[UUID]:
+        ids = []
+        for member in members:
+            try:
+                ids.append(UUID(member.split("|", 1)[0]))
+            except ValueError:
+                logger.warning(f"[ConversationSweeper] ⚠️ Membro inválido no índice: {member}")
+        return ids
+
+    async def _clear_context(self, sender_id: str, instance: str):
+        """A próxima mensagem começa uma conversa nova: o contexto antigo sai de todas as camadas"""
+        key = RedisKeys.conversation_context(sender_id, instance)
+        await self.context_store.delete(key)
+        if self.context_tiering:
+            await self.context_tiering.forget(key)
+        if self.context_cache:
+            await self.context_cache.evict(key)
+
+    async def run(self, interval_seconds: int, batch_size: int):
+        """Loop de encerramento; um único worker por intervalo (lock no Redis)"""
+        while True:
+            try:
+                if await self.redis.set_if_absent(RedisKeys.CONVERSATION_SWEEP_LOCK, 1, ttl_seconds=interval_seconds):
+                    await self.sweep(batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ConversationSweeper] ❌ Erro no ciclo de encerramento: {e}")
+            await asyncio.sleep(interval_seconds)
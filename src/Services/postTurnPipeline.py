@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.Infrastructure import Metrics
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[], Awaitable]
+
+
+class PostTurnPipeline:
+    """
+    Persistência pós-turno fora do caminho da resposta.
+
+    Cada turno vira um job com passos independentes (contexto, mensagens)
+    executados em paralelo, cada um com retries e backoff exponencial.
+    Jobs da mesma conversa rodam em ordem (encadeados por chave); conversas
+    diferentes seguem em paralelo. `wait(key)` deixa o próximo turno da
+    conversa esperar a persistência do anterior antes de ler o contexto.
+
+    A ordem vale dentro do worker; entre workers, o compare-and-set do
+    contexto continua resolvendo conflitos.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_backoff_ms: int = 200,
+        max_pending: int = 1000
+    ):
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.max_pending = max_pending
+        self._tails: Dict[str, asyncio.Task] = {}
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def submit(self, key: str, *steps: Step):
+        if self._pending >= self.max_pending:
+            # Fila cheia: persiste no caminho do turno em vez de acumular
+            Metrics.incr("post_turn.backpressure")
+            await self._run(key, self._tails.get(key), steps, time.perf_counter())
+            return
+
+        task = asyncio.create_task(
+            self._run(key, self._tails.get(key), steps, time.perf_counter())
+        )
+        self._tails[key] = task
+        self._pending += 1
+        Metrics.incr("post_turn.submitted")
+        task.add_done_callback(lambda done: self._on_done(key, done))
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        self._pending -= 1
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def wait(self, key: str):
+        """Espera a persistência pendente de uma conversa"""
+        tail = self._tails.get(key)
+        if tail:
+            Metrics.incr("post_turn.waits")
+            with suppress(Exception):
+                await asyncio.shield(tail)
+
+    async def _run(self, key: str, previous: Optional[asyncio.Task], steps, enqueued_at: float):
+        if previous:
+            with suppress(Exception):
+                await previous
+
+        results = await asyncio.gather(
+            *(self._run_step(key, step) for step in steps),
+            return_exceptions=True
+        )
+        Metrics.observe("post_turn.lag_ms", (time.perf_counter() - enqueued_at) * 1000)
+        if any(isinstance(result, BaseException) for result in results):
+            Metrics.incr("post_turn.failures")
+        else:
+            Metrics.incr("post_turn.completed")
+
+    async def _run_step(self, key: str, step: Step):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"[PostTurn] ❌ {key}: passo falhou após {attempt + 1} tentativas: {e}")
+                    raise
+                Metrics.incr("post_turn.retries")
+                logger.warning(f"[PostTurn] ⚠️ {key}: tentativa {attempt + 1} falhou, repetindo: {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def close(self, timeout_seconds: float = 10):
+        """Drena os jobs pendentes no shutdown"""
+        tails = list(self._tails.values())
+        if not tails:
+            return
+        done, pending = await asyncio.wait(tails, timeout=timeout_seconds)
+        if pending:
+            logger.error(f"[PostTurn] ❌ {len(pending)} conversas com persistência pendente no shutdown")
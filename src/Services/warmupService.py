@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.config import settings
+from src.Domain import IAgentConfigRepository
+from src.Infrastructure import PostgresContext, RedisContext, Metrics
+from src.Services.agentConfigService import AgentConfigService
+from src.Services.ConversationService import ConversationService
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Prepara o worker antes de receber tráfego: abre os pools (PostgreSQL,
+    Redis, OpenAI), carrega agentes e mapeamentos em uma única consulta para
+    o cache do AgentConfigService e monta o orchestrator de cada agente.
+
+    Roda em background no lifespan; GET /health/ready só responde 200
+    depois que termina (até lá o balanceador não manda mensagens).
+    """
+
+    def __init__(
+        self,
+        agent_config_repo: IAgentConfigRepository,
+        agent_config_service: AgentConfigService,
+        conversation_service: ConversationService
+    ):
+        self.agent_config_repo = agent_config_repo
+        self.agent_config_service = agent_config_service
+        self.conversation_service = conversation_service
+        self.ready = False
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.finished_at: Optional[datetime] = None
+        self.stats: Dict[str, Any] = {}
+
+    async def warm_up(self):
+        started = time.perf_counter()
+
+        # ========== POOLS ==========
+        await PostgresContext.warm_up()
+        await RedisContext.warm_up()
+        if settings.WARMUP_LLM_CONNECTION:
+            try:
+                await asyncio.wait_for(self.conversation_service.llm_client.warm_up(), timeout=10)
+            except Exception as e:
+                # Sem a conexão pronta a primeira chamada só fica mais lenta
+                logger.warning(f"[Warmup] ⚠️ Conexão com a OpenAI não aquecida: {e}")
+
+        # ========== AGENTES E MAPEAMENTOS ==========
+        agents = await self.agent_config_repo.list_active_with_phones()
+        for agent, phone_numbers in agents:
+            self.agent_config_service.prime(agent, phone_numbers)
+        default_agent = await self.agent_config_service.get_default_agent()
+
+        # ========== ORCHESTRATORS ==========
+        for agent in [default_agent] + [agent for agent, _ in agents]:
+            self.conversation_service.get_orchestrator(agent)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats = {
+            "agents": len(agents),
+            "phone_numbers": sum(len(phones) for _, phones in agents),
+            "duration_ms": round(elapsed_ms, 1)
+        }
+        Metrics.observe("warmup.duration_ms", elapsed_ms)
+        logger.info(
+            f"[Warmup] 🔥 {self.stats['agents']} agentes, {self.stats['phone_numbers']} números "
+            f"e orchestrators prontos em {elapsed_ms:.0f}ms"
+        )
+
+    async def run(self, retry_seconds: float = 5):
+        """Tenta até conseguir (ex.: banco ainda subindo); só então marca o worker como pronto"""
+        while not self.ready:
+            self.attempts += 1
+            try:
+                await self.warm_up()
+                self.ready = True
+                self.last_error = None
+                self.finished_at = datetime.utcnow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"[Warmup] ❌ Tentativa {self.attempts} falhou: {e}")
+                await asyncio.sleep(retry_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "finished_at": self.finished_at,
+            **self.stats
+        }
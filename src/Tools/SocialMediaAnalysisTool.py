@@ -18,11 +18,17 @@ class SocialMediaAnalysisTool(BaseTool):
     """
     
     def __init__(self):
-        """Inicializa o cliente OpenAI"""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY não encontrada nas variáveis de ambiente")
-        self.client = OpenAI(api_key=api_key)
+        self._client = None
+
+    @property
+    def client(self) -> OpenAI:
+        """Cliente OpenAI, criado na primeira extração (montar o schema não precisa dele)"""
+        if self._client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY não encontrada nas variáveis de ambiente")
+            self._client = OpenAI(api_key=api_key)
+        return self._client
     
     @property
     def name(self) -> str:
@@ -1,4 +1,5 @@
 from .baseTool import BaseTool
+from .toolRegistry import ToolRegistry
 from .executorTool import ExecutorTool
 from .searchTool import SearchTool
 from .IpvaTools import IpvaTool
\ No newline at end of file
@@ -1,8 +1,5 @@
 from typing import List, Dict, Any, Optional
-from .baseTool import BaseTool
-from .searchTool import SearchTool
-from .IpvaTools  import IpvaTool
-from .SocialMediaAnalysisTool import SocialMediaAnalysisTool
+from .toolRegistry import ToolRegistry
 
 from src.Domain import IToolExecutorService
 import logging
@@ -18,30 +15,21 @@ class ExecutorTool:
             allowed_tools: Lista de nomes de tools permitidas para este agente.
                           Se None, todas as tools estarão disponíveis.
         """
-        # Registro completo de TODAS as tools disponíveis no sistema
-        self._all_tools: Dict[str, BaseTool] = {
-            "buscar_informacao": SearchTool(),
-            "consultar_ipva": IpvaTool(),
-            "extrair_dados_relatorio_redes_sociais": SocialMediaAnalysisTool()
-            # Adicione outras tools aqui conforme necessário
-        }
-        
-        # Filtra apenas as tools permitidas para este agente
-        if allowed_tools is not None:
-            self.tools: Dict[str, BaseTool] = {
-                name: tool 
-                for name, tool in self._all_tools.items() 
-                if name in allowed_tools
-            }
-            logger.info(f"[ExecutorTool] ✅ Tools filtradas: {list(self.tools.keys())}")
-        else:
-            # Se não especificado, disponibiliza todas
-            self.tools = self._all_tools
-            logger.info(f"[ExecutorTool] ✅ Todas as tools disponíveis: {list(self.tools.keys())}")
+        # As tools vêm do ToolRegistry (uma instância por processo, criada no
+        # primeiro uso); aqui fica só a lista do que este agente pode usar
+        self.tool_names: List[str] = [
+            name
+            for name in ToolRegistry.names()
+            if allowed_tools is None or name in allowed_tools
+        ]
+        # Schemas montados uma vez: o executor é refeito junto com o orchestrator
+        # quando a configuração do agente ou o ToolRegistry muda
+        self._schemas: List[dict] = [ToolRegistry.get(name).get_schema() for name in self.tool_names]
+        logger.info(f"[ExecutorTool] ✅ Tools disponíveis: {self.tool_names}")
     
     def get_available_tools(self) -> List[dict]:
-        """Retorna schema de todas as tools disponíveis para este agente"""
-        return [tool.get_schema() for tool in self.tools.values()]
+        """Retorna schema de todas as tools disponíveis para este agente (lista compartilhada, não alterar)"""
+        return self._schemas
     
     async def execute_tools(self, tool_calls: List[dict]) -> List[Dict[str, Any]]:
         """Executa as tools chamadas pelo LLM"""
@@ -51,16 +39,16 @@ class ExecutorTool:
             tool_name = call["name"]
             parameters = call.get("parameters", {})
             
-            if tool_name not in self.tools:
-                logger.error(f"Tool '{tool_name}' não está disponível para este agente. Tools permitidas: {list(self.tools.keys())}")
+            if tool_name not in self.tool_names:
+                logger.error(f"Tool '{tool_name}' não está disponível para este agente. Tools permitidas: {self.tool_names}")
                 results.append({
                     "tool": tool_name,
-                    "error": f"Tool não disponível para este agente. Tools permitidas: {', '.join(self.tools.keys())}"
+                    "error": f"Tool não disponível para este agente. Tools permitidas: {', '.join(self.tool_names)}"
                 })
                 continue
             
             try:
-                result = await self.tools[tool_name].execute(**parameters)
+                result = await ToolRegistry.get(tool_name).execute(**parameters)
                 results.append({
                     "tool": tool_name,
                     "result": result
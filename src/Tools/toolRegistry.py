@@ -0,0 +1,61 @@
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+from .baseTool import BaseTool
+from .searchTool import SearchTool
+from .IpvaTools import IpvaTool
+from .SocialMediaAnalysisTool import SocialMediaAnalysisTool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRegistry:
+    """
+    Registro único por processo das tools do sistema.
+
+    Cada tool é criada só no primeiro uso e depois reaproveitada por todos os
+    agentes e mensagens (recriada se o processo for forkado, como o
+    RedisContext). As tools não guardam estado de conversa.
+
+    `version` muda a cada register(): quem guarda algo derivado das tools
+    (schemas, catálogos) compara a versão para saber se precisa refazer.
+    """
+
+    # nome da tool → construtor
+    _factories: Dict[str, Callable[[], BaseTool]] = {
+        "buscar_informacao": SearchTool,
+        "consultar_ipva": IpvaTool,
+        "extrair_dados_relatorio_redes_sociais": SocialMediaAnalysisTool
+        # Adicione outras tools aqui conforme necessário
+    }
+    _instances: Dict[str, BaseTool] = {}
+    _pid: Optional[int] = None
+    version = 0
+
+    @classmethod
+    def register(cls, name: str, factory: Callable[[], BaseTool]):
+        """Adiciona (ou substitui) uma tool; a instância anterior é descartada"""
+        cls._factories[name] = factory
+        cls._instances.pop(name, None)
+        cls.version += 1
+        logger.info(f"[ToolRegistry] 🔧 Tool registrada: {name}")
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls._factories)
+
+    @classmethod
+    def get(cls, name: str) -> BaseTool:
+        if cls._pid != os.getpid():
+            cls._instances = {}
+            cls._pid = os.getpid()
+
+        tool = cls._instances.get(name)
+        if tool is None:
+            factory = cls._factories.get(name)
+            if factory is None:
+                raise KeyError(f"Tool '{name}' não registrada")
+            tool = cls._instances[name] = factory()
+            logger.info(f"[ToolRegistry] ✅ Tool criada: {name}")
+        return tool
@@ -1,20 +1,117 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from src.config import settings
-from src.Application import agentRoute, agentConfigRoute
+from src.Application import agentRoute, agentConfigRoute, metricsRoute, conversationRoute, healthRoute
+from src.Application.dependecie import dependencies
+from src.Infrastructure import RedisContext, PostgresContext, MigrationRunner, PgNotificationListener
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+
+    # Schema e partições mensais de messages
+    if settings.DB_MIGRATE_ON_STARTUP:
+        await MigrationRunner().upgrade()
+
+    # Partições dos próximos meses sem depender de um novo deploy
+    if settings.MESSAGE_PARTITION_CHECK_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            MigrationRunner().run_partitions(settings.MESSAGE_PARTITION_CHECK_INTERVAL_SECONDS)
+        ))
+
+    # Pools, agentes e orchestrators prontos antes do tráfego (GET /health/ready)
+    if settings.STARTUP_WARMUP:
+        background_tasks.append(asyncio.create_task(dependencies.warmupService().run()))
+
+    # Invalidação do cache de agentes quando agent_configs/mapeamentos mudam
+    if settings.AGENT_CONFIG_LISTEN:
+        agent_config_service = dependencies.agentConfigService()
+        background_tasks.append(asyncio.create_task(
+            PgNotificationListener(
+                channel=agent_config_service.CHANNEL,
+                handler=agent_config_service.handle_notification,
+                on_connect=agent_config_service.on_listener_connect
+            ).run()
+        ))
+
+    # Offload de contextos ociosos do Redis para o PostgreSQL
+    if settings.context_store_backend == "redis":
+        background_tasks.append(asyncio.create_task(
+            dependencies.contextTieringService().run(
+                interval_seconds=settings.CONTEXT_OFFLOAD_INTERVAL_SECONDS,
+                batch_size=settings.CONTEXT_OFFLOAD_BATCH_SIZE
+            )
+        ))
+
+    # Limpeza dos contextos expirados (no Redis o próprio TTL remove)
+    if settings.context_store_backend == "postgres":
+        background_tasks.append(asyncio.create_task(
+            dependencies.contextStore().run_purge(
+                interval_seconds=settings.CONTEXT_PURGE_INTERVAL_SECONDS,
+                batch_size=settings.CONTEXT_PURGE_BATCH_SIZE
+            )
+        ))
+
+    # Encerramento de conversas ociosas (limite por agente)
+    if settings.context_store_backend == "redis":
+        background_tasks.append(asyncio.create_task(
+            dependencies.conversationSweeperService().run(
+                interval_seconds=settings.CONVERSATION_SWEEP_INTERVAL_SECONDS,
+                batch_size=settings.CONVERSATION_SWEEP_BATCH_SIZE
+            )
+        ))
+
+    # Arquivamento de conversas encerradas além da retenção
+    if settings.CONVERSATION_ARCHIVE_AFTER_DAYS > 0:
+        background_tasks.append(asyncio.create_task(
+            dependencies.conversationArchiveService().run(
+                interval_seconds=settings.CONVERSATION_ARCHIVE_INTERVAL_SECONDS,
+                batch_size=settings.CONVERSATION_ARCHIVE_BATCH_SIZE
+            )
+        ))
+
+    # Flush periódico do write-behind de mensagens
+    if settings.MESSAGE_WRITE_BEHIND:
+        background_tasks.append(asyncio.create_task(dependencies.messageWriteBuffer().run()))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    # Termina a persistência dos turnos já respondidos
+    if settings.POST_TURN_PIPELINE:
+        await dependencies.postTurnPipeline().close(settings.POST_TURN_DRAIN_TIMEOUT_SECONDS)
+
+    # Grava as mensagens ainda no buffer antes de fechar os pools
+    if settings.MESSAGE_WRITE_BEHIND:
+        await dependencies.messageWriteBuffer().close()
+
+    # Fecha os pools de conexões (Redis e PostgreSQL) deste processo
+    await RedisContext.close()
+    await PostgresContext.close()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Registrar Rotas
 app.include_router(agentRoute, prefix=settings.API_V1_STR)
 app.include_router(agentConfigRoute, prefix=settings.API_V1_STR)
+app.include_router(metricsRoute, prefix=settings.API_V1_STR)
+app.include_router(conversationRoute, prefix=settings.API_V1_STR)
+app.include_router(healthRoute, prefix=settings.API_V1_STR)
 
 
 import uvicorn
 
 if __name__ == '__main__':
-    uvicorn.run(app=app, host="0.0.0.0", port=9005)
\ No newline at end of file
+    uvicorn.run(app=app, host="0.0.0.0", port=9005)
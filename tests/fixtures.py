@@ -0,0 +1,27 @@
+"""
+Dados de teste compartilhados pelos testes e pelos benchmarks.
+"""
+from src.Domain import ConversationContext
+
+
+def build_context(turns: int) -> ConversationContext:
+    """Conversa de consulta de IPVA com `turns` turnos (mensagens, decisões e resultados de tool)"""
+    context = ConversationContext(sender_id="5585999999999@s.whatsapp.net")
+    context.start_flow("consultar_ipva", pending_params=["placa", "renavam"])
+
+    for turn in range(turns):
+        context.add_message("user", f"Quero consultar o IPVA da placa ABC{turn:04d}, renavam 0123456789{turn % 10}")
+        context.add_decision(
+            decision="call_tool",
+            tool_name="consultar_ipva",
+            tool_params={"placa": f"ABC{turn:04d}", "renavam": "01234567890", "action": "consultar"},
+            reason="Usuário forneceu placa e renavam",
+            user_message=f"Quero consultar o IPVA da placa ABC{turn:04d}"
+        )
+        context.tool_results.append({
+            "tool": "consultar_ipva",
+            "result": {"success": True, "total_parcelado": 1234.56, "quantidade_parcelas": 3}
+        })
+        context.add_message("assistant", "Encontrei 3 parcelas em aberto para o seu veículo. Deseja emitir o boleto?")
+
+    return context
@@ -0,0 +1,44 @@
+"""
+ContextCodec: ida e volta do contexto e leitura dos formatos anteriores.
+
+    python -m pytest tests/test_context_codec.py
+"""
+import json
+
+import msgpack
+
+from src.Domain import ConversationContext
+from src.Infrastructure import ContextCodec
+from tests.fixtures import build_context
+
+
+def materialized(data: dict) -> dict:
+    context = ConversationContext.from_dict(data)
+    list(context.messages)
+    list(context.decision_history)
+    return context.to_dict()
+
+
+def test_round_trip_keeps_unaccessed_records_packed():
+    codec = ContextCodec()
+    data = build_context(20).to_dict()
+
+    decoded = codec.decode(codec.encode(data))
+
+    assert all(isinstance(m, bytes) for m in decoded["messages"])
+    assert materialized(decoded) == data
+    # Registros não acessados voltam para o encode sem mudar
+    context = ConversationContext.from_dict(decoded)
+    assert codec.decode(codec.encode(context.to_dict())) == decoded
+
+
+def test_decodes_version_1_and_json():
+    codec = ContextCodec()
+    data = build_context(3).to_dict()
+    body = codec._pack_context(data)
+    body[1] = [msgpack.unpackb(m) for m in body[1]]
+    body[5] = [msgpack.unpackb(d) for d in body[5]]
+    version_1 = codec.MAGIC + bytes((1, 0)) + msgpack.packb([codec.KIND_CONTEXT, *body], use_bin_type=True)
+
+    assert materialized(codec.decode(version_1)) == data
+    assert codec.decode(json.dumps(data).encode()) == data
@@ -0,0 +1,127 @@
+"""
+Merge do contexto após conflito no compare-and-set (ConversationService).
+
+Dois workers compartilhando o mesmo store: um turno já sincronizado do
+PostgreSQL por outro worker não pode voltar duplicado no merge.
+
+    python -m pytest tests/test_context_merge.py
+"""
+import asyncio
+
+import pytest
+
+from src.Domain import ConversationContext
+from src.Domain.entities.conversationContextEntity import Message
+from src.Infrastructure import InMemoryContextStore, RedisKeys
+from src.Services.ConversationService import ConversationService
+
+SENDER = "5511999999999"
+INSTANCE = "5511888888888"
+
+
+def worker(store: InMemoryContextStore) -> ConversationService:
+    return ConversationService(
+        conversation_repo=None,
+        message_repo=None,
+        context_store=store,
+        agent_config_service=None
+    )
+
+
+async def load(store: InMemoryContextStore) -> ConversationContext:
+    data, version = await store.load(RedisKeys.conversation_context(SENDER, INSTANCE))
+    context = ConversationContext.from_dict(data)
+    context.mark_synced(version)
+    return context
+
+
+def contents(context: ConversationContext) -> list:
+    return [message.content for message in context.messages]
+
+
+def test_merge_skips_turn_already_synced_from_postgres():
+    async def run():
+        store = InMemoryContextStore()
+        worker_a, worker_b = worker(store), worker(store)
+
+        seed = ConversationContext(sender_id=SENDER)
+        seed.add_message("user", "a")
+        seed.add_message("assistant", "b")
+        await worker_a._save_context_to_redis(seed, INSTANCE)
+
+        # Worker A responde, mas ainda não salvou o contexto
+        context_a = await load(store)
+        turn_a = [context_a.add_message("user", "A-q"), context_a.add_message("assistant", "A-a")]
+
+        # Worker B traz do PostgreSQL as linhas do turno de A (mesmos ids) e salva antes
+        context_b = await load(store)
+        context_b.add_history_messages([
+            Message(role=m.role, content=m.content, timestamp=m.timestamp, id=m.id) for m in turn_a
+        ])
+        context_b.add_message("user", "B-q")
+        context_b.add_message("assistant", "B-a")
+        await worker_b._save_context_to_redis(context_b, INSTANCE)
+
+        # A conflita, mescla sobre o contexto de B e salva
+        saved = await worker_a._save_context_to_redis(context_a, INSTANCE)
+
+        assert contents(saved) == ["a", "b", "A-q", "A-a", "B-q", "B-a"]
+        assert contents(await load(store)) == contents(saved)
+
+    asyncio.run(run())
+
+
+def test_merge_keeps_concurrent_turns():
+    async def run():
+        store = InMemoryContextStore()
+        worker_a, worker_b = worker(store), worker(store)
+        await worker_a._save_context_to_redis(ConversationContext(sender_id=SENDER), INSTANCE)
+
+        context_a, context_b = await load(store), await load(store)
+        context_a.add_message("user", "A-q")
+        context_b.add_message("user", "B-q")
+        await worker_b._save_context_to_redis(context_b, INSTANCE)
+        saved = await worker_a._save_context_to_redis(context_a, INSTANCE)
+
+        assert contents(saved) == ["B-q", "A-q"]
+
+    asyncio.run(run())
+
+
+class LostReplyStore(InMemoryContextStore):
+    """Grava, mas a primeira resposta do compare-and-set se perde (timeout)"""
+
+    def __init__(self):
+        super().__init__()
+        self.lose_next_reply = False
+
+    async def compare_and_set(self, *args, **kwargs):
+        result = await super().compare_and_set(*args, **kwargs)
+        if self.lose_next_reply:
+            self.lose_next_reply = False
+            raise TimeoutError("resposta perdida")
+        return result
+
+
+def test_retry_after_lost_reply_does_not_merge_turn_twice():
+    async def run():
+        store = LostReplyStore()
+        service = worker(store)
+        await service._save_context_to_redis(ConversationContext(sender_id=SENDER), INSTANCE)
+
+        context = await load(store)
+        context.add_message("user", "q")
+        context.add_decision("reply")
+        store.lose_next_reply = True
+        with pytest.raises(TimeoutError):
+            await service._save_context_to_redis(context, INSTANCE, write_token="turno-1")
+
+        # Retry do PostTurnPipeline com o mesmo contexto e token
+        saved = await service._save_context_to_redis(context, INSTANCE, write_token="turno-1")
+
+        assert saved.version == 2
+        stored = await load(store)
+        assert contents(stored) == ["q"]
+        assert len(stored.decision_history) == 1
+
+    asyncio.run(run())
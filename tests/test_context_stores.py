@@ -0,0 +1,131 @@
+"""
+Contrato do IContextStore: o mesmo roteiro contra cada backend.
+
+memory roda sempre; redis usa REDIS_URL (ou fakeredis, se instalado);
+postgres usa DATABASE_URL e é pulado se o banco não responder.
+
+    python -m pytest tests/test_context_stores.py
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from src.config import settings
+from src.Domain import ConversationContext, IContextStore
+from src.Infrastructure import (
+    InMemoryContextStore,
+    RedisContext,
+    RedisContextStore,
+    RedisRepository,
+    PostgresContext,
+    PostgresContextStore
+)
+from tests.fixtures import build_context
+
+
+def normalized(data: dict) -> dict:
+    """Registros reconstruídos: o codec devolve mensagens/decisões posicionais"""
+    context = ConversationContext.from_dict(data)
+    list(context.messages)
+    list(context.decision_history)
+    return context.to_dict()
+
+
+def memory_store(monkeypatch) -> IContextStore:
+    return InMemoryContextStore()
+
+
+def redis_store(monkeypatch) -> IContextStore:
+    if not settings.REDIS_URL:
+        fakeredis = pytest.importorskip("fakeredis.aioredis")
+        client = fakeredis.FakeRedis()
+        monkeypatch.setattr(RedisContext, "get_client", classmethod(lambda cls: client))
+    return RedisContextStore(RedisRepository())
+
+
+def postgres_store(monkeypatch) -> IContextStore:
+    async def reachable():
+        try:
+            await asyncio.wait_for(PostgresContext.get_pool(), timeout=3)
+            return True
+        except Exception:
+            return False
+        finally:
+            await PostgresContext.close()
+
+    if not asyncio.run(reachable()):
+        pytest.skip("PostgreSQL indisponível (DATABASE_URL)")
+    return PostgresContextStore()
+
+
+STORES = {
+    "memory": memory_store,
+    "redis": redis_store,
+    "postgres": postgres_store,
+}
+
+
+@pytest.fixture(params=list(STORES))
+def store(request, monkeypatch):
+    return STORES[request.param](monkeypatch)
+
+
+async def _contract(store: IContextStore):
+    key = f"test:{uuid.uuid4().hex}"
+    data = build_context(3).to_dict()
+
+    assert await store.load(key) == (None, 0), "chave inexistente deve ter versão 0"
+    assert await store.compare_and_set(key, data, 1) == (False, 0), "CAS com versão errada deve falhar"
+    assert await store.compare_and_set(key, data, 0, ttl_seconds=60) == (True, 1)
+    loaded, version = await store.load(key)
+    assert normalized(loaded) == data and version == 1, "load deve devolver o que foi gravado"
+    assert await store.compare_and_set(key, data, 0) == (False, 1), "criação concorrente deve conflitar"
+    assert await store.compare_and_set(key, loaded, 1, ttl_seconds=60) == (True, 2)
+    loaded, version = await store.load(key)
+    assert normalized(loaded) == data and version == 2, "regravar o que foi lido não altera o contexto"
+
+    assert await store.compare_and_set(key, data, 2, ttl_seconds=60, write_token="turno-1") == (True, 3)
+    assert await store.compare_and_set(key, data, 2, ttl_seconds=60, write_token="turno-1") == (True, 3), \
+        "repetir a escrita com o mesmo token (retry após timeout) conta como gravada"
+    assert await store.compare_and_set(key, data, 2, write_token="turno-2") == (False, 3), \
+        "token diferente continua sendo conflito"
+
+    await store.delete(key)
+    assert await store.load(key) == (None, 0), "delete deve remover a chave"
+
+    await store.compare_and_set(key, data, 0, ttl_seconds=1)
+    await asyncio.sleep(1.5)
+    assert await store.load(key) == (None, 0), "TTL deve expirar a chave"
+    assert await store.compare_and_set(key, data, 0, ttl_seconds=60) == (True, 1), \
+        "chave expirada equivale a inexistente"
+    await store.delete(key)
+
+
+def test_context_store_contract(store):
+    async def run():
+        try:
+            await _contract(store)
+        finally:
+            await PostgresContext.close()
+
+    asyncio.run(run())
+
+
+def test_postgres_purge_expired(monkeypatch):
+    store = postgres_store(monkeypatch)
+
+    async def run():
+        key = f"test:{uuid.uuid4().hex}"
+        try:
+            await store.compare_and_set(key, build_context(1).to_dict(), 0, ttl_seconds=1)
+            await asyncio.sleep(1.5)
+            assert await store.purge_expired(batch_size=1000) >= 1
+            assert await store.db.fetchval(
+                "SELECT count(*) FROM conversation_contexts WHERE context_key = $1", key
+            ) == 0
+        finally:
+            await store.delete(key)
+            await PostgresContext.close()
+
+    asyncio.run(run())
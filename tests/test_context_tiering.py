@@ -0,0 +1,64 @@
+"""
+ContextTieringService: offload para o PostgreSQL e volta para o Redis.
+
+Usa REDIS_URL (ou fakeredis, se instalado); o armazenamento frio fica em memória.
+
+    python -m pytest tests/test_context_tiering.py
+"""
+import asyncio
+import uuid
+from typing import Dict, Optional, Tuple
+
+import pytest
+
+from src.config import settings
+from src.Domain import IContextSnapshotRepository
+from src.Infrastructure import RedisContext, RedisRepository
+from src.Services.contextTieringService import ContextTieringService
+
+
+class InMemorySnapshotRepository(IContextSnapshotRepository):
+    def __init__(self):
+        self.snapshots: Dict[str, Tuple[bytes, int]] = {}
+
+    async def save(self, context_key: str, payload: bytes, version: int) -> None:
+        self.snapshots[context_key] = (payload, version)
+
+    async def get(self, context_key: str) -> Optional[Tuple[bytes, int]]:
+        return self.snapshots.get(context_key)
+
+    async def delete(self, context_key: str) -> None:
+        self.snapshots.pop(context_key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch) -> RedisRepository:
+    if not settings.REDIS_URL:
+        fakeredis = pytest.importorskip("fakeredis.aioredis")
+        client = fakeredis.FakeRedis()
+        monkeypatch.setattr(RedisContext, "get_client", classmethod(lambda cls: client))
+    return RedisRepository()
+
+
+def test_rehydrate_keeps_version_after_snapshot(redis):
+    async def run():
+        key = f"conversation:{{{uuid.uuid4().hex}:x}}:context"
+        tiering = ContextTieringService(redis, InMemorySnapshotRepository())
+        tiering.idle_seconds = -1
+
+        for turn in range(3):
+            await redis.compare_and_set(key, {"turn": turn}, expected_version=turn)
+        await tiering.touch(key)
+        assert await tiering.offload_idle() == 1
+
+        data, version = await tiering.rehydrate(key)
+
+        assert data == {"turn": 2}
+        assert version == 4
+        # Quem ainda tinha a versão de antes do offload não grava por cima
+        assert await redis.compare_and_set(key, {"turn": "velho"}, expected_version=3) == (False, 4)
+        assert await redis.compare_and_set(key, {"turn": 3}, expected_version=4) == (True, 5)
+        # Outro worker reidrata depois: usa a versão já no Redis
+        assert await redis.set_versioned_if_absent(key, {"turn": 2}, 4) == (False, 5)
+
+    asyncio.run(run())
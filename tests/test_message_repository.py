@@ -0,0 +1,86 @@
+"""
+MessageRepository: leituras `readonly` e o fallback para conversas arquivadas.
+
+Usa DATABASE_URL com as migrations aplicadas e é pulado se o banco não
+responder.
+
+    python -m pytest tests/test_message_repository.py
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.Domain import MessageEntity
+from src.Infrastructure import PostgresContext
+from src.Infrastructure.data.postgres.repository.ConversationRepository import ConversationRepository
+from src.Infrastructure.data.postgres.repository.MessageRepository import MessageRepository
+
+
+@pytest.fixture
+def repo(monkeypatch) -> MessageRepository:
+    async def reachable():
+        try:
+            await asyncio.wait_for(PostgresContext.get_pool(), timeout=3)
+            return True
+        except Exception:
+            return False
+        finally:
+            await PostgresContext.close()
+
+    if not asyncio.run(reachable()):
+        pytest.skip("PostgreSQL indisponível (DATABASE_URL)")
+
+    repo = MessageRepository()
+    transcripts = {}
+
+    async def get_transcript(conversation_id):
+        return transcripts.get(conversation_id)
+
+    monkeypatch.setattr(repo.archive, "get_transcript", get_transcript)
+    repo.transcripts = transcripts
+    return repo
+
+
+def test_empty_page_of_active_conversation_does_not_read_archive(repo):
+    async def run():
+        try:
+            conversation, _ = await ConversationRepository().upsert_active(uuid.uuid4().hex, "teste", "whatsapp")
+            message = MessageEntity(conversation_id=conversation.id, role="user", content="oi")
+            await repo.create(message)
+            # Um transcript que não deveria ser lido (a conversa segue ativa)
+            repo.transcripts[conversation.id] = [
+                MessageEntity(id=uuid.uuid4(), conversation_id=conversation.id, role="user", content="x",
+                              created_at=datetime(year, 1, 1))
+                for year in (2000, 2999)
+            ]
+
+            after = await repo.list_after(conversation.id, message.created_at, after_id=message.id, readonly=True)
+            before = await repo.list_before(conversation.id, message.created_at, message.id, readonly=True)
+            return after, before
+        finally:
+            await PostgresContext.close()
+
+    assert asyncio.run(run()) == ([], [])
+
+
+def test_archived_conversation_reads_transcript(repo):
+    conversation_id = uuid.uuid4()
+    messages = [
+        MessageEntity(id=uuid.uuid4(), conversation_id=conversation_id, role=role, content=role,
+                      created_at=datetime(2024, 1, 1, 12, minute))
+        for minute, role in enumerate(("user", "assistant", "user"))
+    ]
+    repo.transcripts[conversation_id] = messages
+
+    async def run():
+        try:
+            return (
+                await repo.list_recent(conversation_id, limit=2, readonly=True),
+                await repo.list_after(conversation_id, messages[0].created_at, readonly=True)
+            )
+        finally:
+            await PostgresContext.close()
+
+    assert asyncio.run(run()) == (messages[1:], messages[1:])
@@ -0,0 +1,40 @@
+"""
+Planos das queries quentes dos repositórios (migrations/planCheck.py).
+
+Usa DATABASE_URL com as migrations aplicadas e é pulado se o banco não
+responder.
+
+    python -m pytest tests/test_query_plans.py
+"""
+import asyncio
+
+import pytest
+
+from src.Infrastructure import PostgresContext
+from src.Infrastructure.data.postgres.migrations.planCheck import PLAN_CHECKS, PlanCheck, check_plans
+
+
+@pytest.fixture(scope="module")
+def database():
+    async def reachable():
+        try:
+            await asyncio.wait_for(PostgresContext.get_pool(), timeout=3)
+            return True
+        except Exception:
+            return False
+        finally:
+            await PostgresContext.close()
+
+    if not asyncio.run(reachable()):
+        pytest.skip("PostgreSQL indisponível (DATABASE_URL)")
+
+
+@pytest.mark.parametrize("check", PLAN_CHECKS, ids=[check.name for check in PLAN_CHECKS])
+def test_query_plan_uses_index(database, check: PlanCheck):
+    async def run():
+        try:
+            return await check_plans([check])
+        finally:
+            await PostgresContext.close()
+
+    assert asyncio.run(run()) == []